@@ -5,6 +5,7 @@ Script principal para iniciar la interfaz gráfica desde la raíz del proyecto
 """
 
 import sys
+import logging
 import os
 from pathlib import Path
 
@@ -15,6 +16,12 @@ sys.path.insert(0, str(src_dir))
 def main():
     """Función principal para ejecutar la GUI"""
     
+    # Mensajes de depuración de la GUI solo con HP150_DEBUG=1
+    logging.basicConfig(
+        level=logging.DEBUG if os.environ.get('HP150_DEBUG') == '1' else logging.INFO,
+        format='%(levelname)s: %(message)s'
+    )
+    
     try:
         import tkinter as tk
         from tkinter import messagebox
@@ -32,6 +39,8 @@ def main():
         
         root = tk.Tk()
         app = HP150ImageManagerExtendedMuseum(root)
+        # --batch: sin la confirmación de extraer todo ni avisos de éxito
+        app.batch_mode = "--batch" in sys.argv[2:]
         print("🚀 Iniciando HP-150 GUI (Modo Experimental - Con Catálogo del Museo)...")
         
     else:
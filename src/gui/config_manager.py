@@ -45,6 +45,7 @@ class ConfigManager:
         }
         
         self.config = self.load_config()
+        self._cached_gw_path = None  # Ver get_greasewazle_path / invalidate_gw_path
         
         # Re-validar configuración existente si es necesario
         self._revalidate_existing_config()
@@ -77,10 +78,21 @@ class ConfigManager:
     
     def get_greasewazle_path(self) -> Optional[str]:
         """Obtiene la ruta configurada de GreaseWeazle"""
-        return self.config.get("greasewazle_path", "") or None
+        if self._cached_gw_path is not None:
+            return self._cached_gw_path
+        
+        path = self.config.get("greasewazle_path", "") or None
+        if path:
+            self._cached_gw_path = path
+        return path
+    
+    def invalidate_gw_path(self):
+        """Olvida la ruta de GreaseWeazle resuelta (tras cambiar la configuración)"""
+        self._cached_gw_path = None
     
     def set_greasewazle_path(self, path: str) -> bool:
         """Establece la ruta de GreaseWeazle"""
+        self.invalidate_gw_path()
         self.config["greasewazle_path"] = path
         self.config["greasewazle_configured"] = bool(path and self.verify_greasewazle_path(path))
         return self.save_config()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+HP-150 Image Manager - Utilidades compartidas por las GUIs extendidas
+Salida de procesos, pasos reconocidos, dump hexadecimal y nombres de archivo
+"""
+
+import os
+import io
+import re
+import codecs
+import selectors
+import shlex
+import struct
+import binascii
+import subprocess
+import tkinter as tk
+
+# Pasos reconocidos en la salida de los scripts y de GreaseWeazle: (nombre, regex, etiqueta)
+STEP_PATTERNS = [
+    # Lectura
+    ("read_scp_step1", r"Paso 1: Leyendo disco en formato SCP", "📀 Paso 1: Leyendo disco a SCP..."),
+    ("read_start", r"Iniciando lectura del floppy", "🔄 Ejecutando GreaseWeazle..."),
+    ("reading_tracks", r"Reading (?:cylinder|track)", "📀 Leyendo pistas del disco..."),
+    ("gw_track", r"\bT\d+\.\d", "📀 Leyendo pistas del disco..."),  # Formato típico de GreaseWeazle: T0.0
+    ("convert_img_step2", r"Paso 2: Convirtiendo de SCP a IMG", "🔄 Paso 2: Convirtiendo SCP a IMG..."),
+    ("convert_done", r"Conversión completada exitosamente", "✅ Conversión completada!"),
+    ("file_created", r"Archivo creado:", "✅ Archivo creado exitosamente!"),
+    ("size_ok", r"Tamaño correcto:", "✅ Proceso completado - Imagen válida!"),
+    # Escritura
+    ("convert_scp_step1", r"Paso 1: Convirtiendo IMG a formato SCP", "🔄 Paso 1: Convirtiendo IMG a SCP..."),
+    ("convert_scp_done", r"Conversión completada:", "✅ Conversión a SCP completada!"),
+    ("write_scp_step2", r"Paso 2: Escribiendo formato SCP al disco", "💾 Paso 2: Escribiendo SCP al disco..."),
+    ("write_start", r"Iniciando escritura del floppy", "🔄 Ejecutando GreaseWeazle..."),
+    ("write_done", r"Escritura completada exitosamente", "✅ Escritura completada!"),
+]
+STEP_RE = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern, _ in STEP_PATTERNS))
+STEP_LABELS = {name: label for name, _, label in STEP_PATTERNS}
+
+# Etiqueta de las pistas de GreaseWeazle (T0.0...) durante una escritura
+WRITE_TRACK_LABEL = "💾 Escribiendo pistas al disco..."
+
+def match_step_name(text):
+    """Devolver el nombre del último paso reconocido en el texto, o None"""
+    m = None
+    for m in STEP_RE.finditer(text):
+        pass
+    return m.lastgroup if m else None
+
+def match_step(text):
+    """Devolver la etiqueta del último paso reconocido en el texto, o None"""
+    name = match_step_name(text)
+    return STEP_LABELS[name] if name else None
+
+def match_write_step(text):
+    """Como match_step, pero las pistas de GreaseWeazle cuentan como escritura"""
+    name = match_step_name(text)
+    if name == 'gw_track':
+        return WRITE_TRACK_LABEL
+    return STEP_LABELS[name] if name else None
+
+def text_decoder():
+    """Decodificador incremental para la salida de los procesos
+
+    Respeta los caracteres UTF-8 partidos entre lecturas y convierte \r y \r\n
+    en \n, así el progreso que GreaseWeazle reescribe con \r se ve en cuanto llega.
+    """
+    return io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')(errors='replace'), translate=True)
+
+def pump_text(out, put, size=65536):
+    """Pasar la salida de un pipe binario (bufsize=0) a put() como texto, por bloques
+
+    os.read devuelve lo que haya disponible sin esperar a llenar el bloque.
+    Cierra el pipe al llegar a EOF.
+    """
+    decoder = text_decoder()
+    fd = out.fileno()
+    for chunk in iter(lambda: os.read(fd, size), b''):
+        text = decoder.decode(chunk)
+        if text:
+            put(text)
+    text = decoder.decode(b'', final=True)
+    if text:
+        put(text)
+    out.close()
+
+def iter_pipe_text(fd, size=io.DEFAULT_BUFFER_SIZE, should_stop=None, timeout=0.25):
+    """Leer un pipe (bloqueante) con os.read y devolver bloques de líneas completas
+
+    Si se indica should_stop, en Unix se espera con selectors en tramos de
+    timeout segundos y se deja de leer en cuanto devuelva True, aunque el
+    proceso no escriba nada. En Windows los pipes no admiten select y la
+    lectura sigue siendo bloqueante.
+    """
+    decoder = text_decoder()
+    partial = ''
+    selector = None
+    if should_stop is not None and os.name != 'nt':
+        selector = selectors.DefaultSelector()
+        selector.register(fd, selectors.EVENT_READ)
+    try:
+        while True:
+            if should_stop is not None and should_stop():
+                return
+            if selector is not None and not selector.select(timeout):
+                continue  # Sin datos todavía: volver a comprobar la cancelación
+            try:
+                data = os.read(fd, size)
+            except OSError:
+                data = b''
+            text = partial + decoder.decode(data, final=not data)
+            if not data:
+                if text:
+                    yield text
+                return
+            head, sep, partial = text.rpartition('\n')
+            if sep:
+                yield head + sep
+    finally:
+        if selector is not None:
+            selector.close()
+
+def append_to_console(console_text, text):
+    """Insertar text al final de la consola siguiendo la cola solo si hace falta
+
+    Si el usuario subió a leer la salida anterior no se lo mueve ni se paga el
+    see(); al volver al final el desplazamiento automático se reanuda.
+    """
+    following = console_text.yview()[1] > 0.98  # (Casi) al final antes de insertar
+    console_text.insert(tk.END, text)
+    if following:
+        console_text.see(tk.END)
+
+def format_command(cmd):
+    """Línea de comando citada como la escribiría el usuario en su shell"""
+    if os.name == 'nt':
+        return subprocess.list2cmdline(cmd)
+    return ' '.join(map(shlex.quote, cmd))  # shlex.join es de 3.8
+
+# Tabla de traducción byte -> carácter para la columna ASCII del dump hexadecimal
+_HEX_DUMP_ASCII = bytes(b if 32 <= b <= 126 else ord('.') for b in range(256))
+
+# Byte -> dos dígitos hex para la columna de bytes (bytes.hex(sep) es de 3.8)
+_HEX_DUMP_BYTES = ['%02x' % b for b in range(256)]
+
+# Offset de 32 bits big-endian; hexlify lo pasa a 8 dígitos hex en C
+_HEX_DUMP_OFFSET = struct.Struct('>I')
+
+def hex_dump(data, base_offset=0):
+    """Dump hexadecimal de 16 bytes por línea (base_offset: offset del primer byte)"""
+    lines = []
+    pack_offset = _HEX_DUMP_OFFSET.pack
+    hexlify = binascii.hexlify
+    for i in range(0, len(data), 16):
+        chunk = data[i:i+16]
+
+        # Offset (sin mini-lenguaje de formato por línea)
+        offset = hexlify(pack_offset(base_offset + i)).decode('ascii')
+
+        # Bytes en hex
+        hex_bytes = ' '.join(map(_HEX_DUMP_BYTES.__getitem__, chunk)).ljust(47)  # Pad para alinear
+
+        # ASCII representation
+        ascii_repr = chunk.translate(_HEX_DUMP_ASCII).decode('ascii')
+
+        lines.append(f"{offset}  {hex_bytes}  |{ascii_repr}|")
+
+    return '\n'.join(lines)
+
+# Tabla de str.translate: caracteres no válidos en nombres de archivo (Windows) -> '_'
+_INVALID_NAME_CHARS = str.maketrans(dict.fromkeys('<>:"/\\|?*', '_'))
+
+def sanitize_filename(name):
+    """Reemplazar caracteres no válidos en nombres de archivo (Windows)"""
+    return name.translate(_INVALID_NAME_CHARS)
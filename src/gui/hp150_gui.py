@@ -8,6 +8,8 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
 import os
 import sys
+import shutil
+import subprocess
 import threading
 from pathlib import Path
 
@@ -239,7 +241,6 @@ class HP150ImageManager:
         """Detectar si macOS está en modo oscuro"""
         if sys.platform == "darwin":
             try:
-                import subprocess
                 result = subprocess.run(
                     ['defaults', 'read', '-g', 'AppleInterfaceStyle'],
                     capture_output=True,
@@ -256,6 +257,7 @@ class HP150ImageManager:
         # Frame principal
         main_frame = ttk.Frame(self.root, padding="10")
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.main_frame = main_frame  # Referencia para las versiones extendidas
         
         # Configurar expansión
         self.root.columnconfigure(0, weight=1)
@@ -664,7 +666,6 @@ class HP150ImageManager:
                 self.update_status("Guardando imagen como...")
                 
                 # Copiar archivo actual al nuevo destino
-                import shutil
                 shutil.copy2(self.current_image, filename)
                 
                 # Actualizar imagen actual y marcar como no modificada
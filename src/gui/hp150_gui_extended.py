@@ -6,13 +6,28 @@ Implementaciones completas para manipulación de archivos
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog, scrolledtext
+import tkinter.font as tkfont
 from .hp150_gui import HP150ImageManager
 from .config_manager import ConfigManager
 from .greasewazle_config_dialog import show_greasewazle_config
+from .gui_utils import (
+    format_command, hex_dump, iter_pipe_text, match_step, match_write_step,
+    sanitize_filename, text_decoder,
+)
 import os
+import re
 import sys
+import queue
+import mmap
+import bisect
+import logging
+import importlib.util
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 import shutil
+import subprocess
 import tempfile
+import threading
 from pathlib import Path
 from datetime import datetime
 
@@ -24,21 +39,152 @@ from src.tools.hp150_fat import HP150FAT
 from src.gui.hp150_gui import HP150ImageManager
 from src.gui.app_icon import APP_ICON, SPLASH_ART, get_dialog_title, get_app_banner
 
+logger = logging.getLogger(__name__)
+
+# Máximo de líneas que conserva la consola de GreaseWeazle
+CONSOLE_MAX_LINES = 2000
+
+# Formatos de escritura por tamaño de imagen: (formato diskdef, pistas) - igual que write_hp150_floppy.sh
+_WRITE_FORMATS = {
+    270336: ('hp150', 'c=0-76:h=0-1'),      # Estándar (77 cil, 7 sec/pista)
+    348160: ('hp150ext', 'c=0-84:h=0-1'),   # Extendido (85 cil, 8 sec/pista)
+    368640: ('hp150hd', 'c=0-79:h=0-1'),    # Alta densidad (80 cil, 9 sec/pista)
+    394240: ('hp150dd', 'c=0-76:h=0-1'),    # Doble densidad (77 cil, 10 sec/pista)
+}
+
+# Formatos HP-150 por tamaño de imagen (detección tras la lectura)
+_FORMAT_BY_SIZE = {
+    270336: ('hp150', 'Estándar (77 cyl, 7 sec/track)'),
+    348160: ('hp150ext', 'Extendido (85 cyl, 8 sec/track)'),
+    368640: ('hp150hd', 'Alta densidad (80 cyl, 9 sec/track)'),
+    394240: ('hp150dd', 'Doble densidad (77 cyl, 10 sec/track)')
+}
+_FORMAT_SIZES_SORTED = sorted(_FORMAT_BY_SIZE)
+
+# Firma del BPB (bytes/sector, sectores/pista, sectores totales) → tamaño del formato
+_FORMAT_SIZE_BY_BPB = {
+    (256, 7, 1056): 270336,
+    (256, 8, 1360): 348160,
+    (256, 9, 1440): 368640,
+    (256, 10, 1540): 394240,
+}
+
+def _format_size_from_bpb(img_file):
+    """Tamaño del formato según el BPB del sector de arranque, o None si no es concluyente
+    
+    Se mapea la imagen en solo lectura: solo se tocan los primeros bytes.
+    """
+    try:
+        with open(img_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            if len(m) < 32:
+                return None
+            bps = int.from_bytes(m[11:13], 'little')
+            total_sectors = int.from_bytes(m[19:21], 'little')
+            spt = int.from_bytes(m[24:26], 'little')
+    except (OSError, ValueError):
+        return None  # Archivo vacío o ilegible
+    return _FORMAT_SIZE_BY_BPB.get((bps, spt, total_sectors))
+
+def _closest_format_size(img_size):
+    """Tamaño de formato conocido más cercano a img_size (búsqueda binaria)"""
+    i = bisect.bisect_left(_FORMAT_SIZES_SORTED, img_size)
+    if i == 0:
+        return _FORMAT_SIZES_SORTED[0]
+    if i == len(_FORMAT_SIZES_SORTED):
+        return _FORMAT_SIZES_SORTED[-1]
+    lower, upper = _FORMAT_SIZES_SORTED[i - 1], _FORMAT_SIZES_SORTED[i]
+    return lower if img_size - lower <= upper - img_size else upper
+
+class _CancelEvent(threading.Event):
+    """Evento de cancelación que termina directamente el proceso gw asociado"""
+    
+    def __init__(self):
+        super().__init__()
+        self._process = None
+    
+    def attach(self, process):
+        """Asociar el proceso en curso (si ya se canceló, terminarlo en el acto)"""
+        self._process = process
+        if self.is_set():
+            self._terminate()
+    
+    def set(self):
+        super().set()
+        self._terminate()
+    
+    def _terminate(self):
+        process = self._process
+        if process is None or process.poll() is not None:
+            return
+        try:
+            process.terminate()
+        except OSError:
+            return
+        # Si no termina en 2 segundos, forzar el cierre sin bloquear la GUI
+        timer = threading.Timer(2.0, lambda: process.poll() is None and process.kill())
+        timer.daemon = True
+        timer.start()
+
+# Programa que ejecuta el intérprete actual para escribir con el paquete
+# greaseweazle instalado (sys.argv hace de ['gw', 'write', ...])
+_GW_WRITE_MAIN = "import sys; from greaseweazle.tools.write import main; sys.exit(main(sys.argv))"
+
+def _stat_or_none(path):
+    """os.stat de path, o None si no existe (una sola llamada al sistema)"""
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+# Caracteres no permitidos en nombres de proyecto de floppy
+_PROJECT_NAME_RE = re.compile(r'[^\w\-_]')
+
 class HP150ImageManagerExtended(HP150ImageManager):
     """Versión extendida del administrador con funcionalidades completas"""
     
     def __init__(self, root):
+        # El modo oscuro se consulta una sola vez (la base lo usa en setup_styles)
+        self._dark_mode_cache = None
+        
         super().__init__(root)
         
+        # Fuentes con nombre compartidas por los diálogos (Tk no re-parsea la tupla)
+        self._fonts = {
+            'title': tkfont.Font(family='Arial', size=14, weight='bold'),
+            'title16': tkfont.Font(family='Arial', size=16, weight='bold'),
+            'bold10': tkfont.Font(family='Arial', size=10, weight='bold'),
+            'step': tkfont.Font(family='Arial', size=11, weight='bold'),
+            'text10': tkfont.Font(family='Arial', size=10),
+            'text9': tkfont.Font(family='Arial', size=9),
+            'mono9': tkfont.Font(family='Monaco', size=9),
+        }
+        
         # Inicializar sistema de configuración
         self.config_manager = ConfigManager()
+        self._gw_initialized = False  # Delays + reset ya aplicados en esta sesión
+        
+        # Si el paquete greaseweazle está instalado, escribir con este mismo
+        # intérprete sin script ni gw en el PATH (find_spec no importa el paquete).
+        # En la app empaquetada sys.executable no es un intérprete de Python.
+        self._gw_package = (not getattr(sys, 'frozen', False)
+                            and importlib.util.find_spec("greaseweazle") is not None)
         
         # Variables adicionales para funcionalidades extendidas
         self.temp_dir = tempfile.mkdtemp(prefix="hp150_gui_")
         self.file_editors = {}  # Ventanas de edición abiertas
         self.has_temp_files = False  # Indica si hay archivos temporales pendientes
         self.temp_scp_file = None  # Archivo SCP temporal
+        self._scp_source = None  # (scp, img, mtime de la img) si la IMG se generó desde ese SCP
         self.temp_img_file = None  # Archivo IMG temporal
+        self._console_buffers = {}  # Texto pendiente por consola (ver _console_append)
+        self._console_lock = threading.Lock()
+        self._script_paths = {}  # Rutas de scripts ya resueltas (ver _resolve_script_path)
+        
+        # Hilos reutilizables para las operaciones con GreaseWeazle (lectura de pipes, pasos)
+        self._io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hp150-io")
+        self._io_futures = set()  # Tareas del pool sin terminar (ver _submit_io)
+        self._child_processes = weakref.WeakSet()  # Procesos gw/scripts lanzados
+        self._progress_window = None  # Ventana de progreso de escritura (ver _ensure_progress_window)
         
         # Configurar cierre para limpiar archivos temporales
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing_extended)
@@ -147,16 +293,16 @@ class HP150ImageManagerExtended(HP150ImageManager):
     
     def add_floppy_buttons(self):
         """Agregar sección de Floppy a la columna derecha del panel de botones"""
-        print("[DEBUG] Ejecutando add_floppy_buttons()")
+        logger.debug("Ejecutando add_floppy_buttons()")
         
         # Buscar el panel de botones principal
         def find_button_frame(widget, depth=0):
-            print(f"[DEBUG] Buscando en widget: {type(widget).__name__}, depth: {depth}")
+            logger.debug("Buscando en widget: %s, depth: %s", type(widget).__name__, depth)
             if isinstance(widget, ttk.LabelFrame):
                 text = widget.cget('text')
-                print(f"[DEBUG] LabelFrame encontrado con texto: '{text}'")
+                logger.debug("LabelFrame encontrado con texto: '%s'", text)
                 if text == 'Acciones':
-                    print(f"[DEBUG] ¡Panel de Acciones encontrado!")
+                    logger.debug("¡Panel de Acciones encontrado!")
                     return widget
             
             for child in widget.winfo_children():
@@ -166,17 +312,17 @@ class HP150ImageManagerExtended(HP150ImageManager):
             return None
         
         button_frame = find_button_frame(self.root)
-        print(f"[DEBUG] button_frame encontrado: {button_frame}")
+        logger.debug("button_frame encontrado: %s", button_frame)
         
         if button_frame:
-            print(f"[DEBUG] Agregando sección de Floppy a la columna derecha")
+            logger.debug("Agregando sección de Floppy a la columna derecha")
             
             # Crear sección de Floppy en la columna izquierda (row=0, column=0) - arriba de archivos
             floppy_section = ttk.LabelFrame(button_frame, text="Floppy", padding="5")
             floppy_section.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N), padx=(0, 5), pady=(0, 10))
             floppy_section.columnconfigure(0, weight=1)
             
-            print(f"[DEBUG] Sección Floppy creada en columna derecha")
+            logger.debug("Sección Floppy creada en columna derecha")
             
             # Agregar los botones de floppy
             self.read_floppy_btn = ttk.Button(
@@ -186,7 +332,7 @@ class HP150ImageManagerExtended(HP150ImageManager):
                 width=14
             )
             self.read_floppy_btn.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=2)
-            print(f"[DEBUG] Botón Leer Floppy creado")
+            logger.debug("Botón Leer Floppy creado")
             
             self.write_floppy_btn = ttk.Button(
                 floppy_section, 
@@ -196,7 +342,7 @@ class HP150ImageManagerExtended(HP150ImageManager):
                 width=14
             )
             self.write_floppy_btn.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=2)
-            print(f"[DEBUG] Botón Escribir Floppy creado")
+            logger.debug("Botón Escribir Floppy creado")
             
             # Botón de configuración de GreaseWeazle
             self.config_gw_btn = ttk.Button(
@@ -206,30 +352,24 @@ class HP150ImageManagerExtended(HP150ImageManager):
                 width=14
             )
             self.config_gw_btn.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=2)
-            print(f"[DEBUG] Botón Configurar GreaseWeazle creado")
+            logger.debug("Botón Configurar GreaseWeazle creado")
             
-            print(f"[DEBUG] ✅ Botones de floppy agregados exitosamente a la columna derecha!")
+            # Reset manual (si se reconecta GreaseWeazle durante la sesión)
+            self.reset_gw_btn = ttk.Button(
+                floppy_section, 
+                text="🔄 Reset GW", 
+                command=self.manual_reset_greaseweazle,
+                width=14
+            )
+            self.reset_gw_btn.grid(row=3, column=0, sticky=(tk.W, tk.E), pady=2)
+            
+            logger.debug("✅ Botones de floppy agregados exitosamente a la columna derecha!")
         else:
-            print(f"[DEBUG] ERROR: No se encontró el panel de botones 'Acciones'")
+            logger.debug("ERROR: No se encontró el panel de botones 'Acciones'")
             # Como fallback, vamos a agregarlo directamente al frame principal
-            main_frame = None
-            
-            def find_main_frame(widget):
-                if isinstance(widget, ttk.Frame):
-                    # Buscar el frame que contiene otros LabelFrames
-                    has_labelframes = any(isinstance(child, ttk.LabelFrame) for child in widget.winfo_children())
-                    if has_labelframes:
-                        return widget
-                
-                for child in widget.winfo_children():
-                    result = find_main_frame(child)
-                    if result:
-                        return result
-                return None
-            
-            main_frame = find_main_frame(self.root)
+            main_frame = self.main_frame
             if main_frame:
-                print(f"[DEBUG] Usando main_frame como fallback")
+                logger.debug("Usando main_frame como fallback")
                 
                 # Crear panel de botones de floppy independiente
                 floppy_frame = ttk.LabelFrame(main_frame, text="Floppy", padding="10")
@@ -253,7 +393,7 @@ class HP150ImageManagerExtended(HP150ImageManager):
                 )
                 self.write_floppy_btn.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=2)
                 
-                print(f"[DEBUG] Panel independiente de floppy creado")
+                logger.debug("Panel independiente de floppy creado")
     
     def disable_unimplemented_buttons(self):
         """Deshabilitar permanentemente botones de funciones no implementadas"""
@@ -291,9 +431,6 @@ class HP150ImageManagerExtended(HP150ImageManager):
             print("⚠️ GreaseWeazle no configurado. Configure desde el menú de configuración.")
             return
         
-        import subprocess
-        import threading
-        
         def do_reset():
             try:
                 # Paso 1: Configurar delays
@@ -302,6 +439,7 @@ class HP150ImageManagerExtended(HP150ImageManager):
                 delays_result = subprocess.run(
                     [gw_path, 'delays', '--step', '20000'],
                     capture_output=True,
+                    stdin=subprocess.DEVNULL,
                     text=True,
                     timeout=10
                 )
@@ -316,6 +454,7 @@ class HP150ImageManagerExtended(HP150ImageManager):
                 reset_result = subprocess.run(
                     [gw_path, 'reset'],
                     capture_output=True,
+                    stdin=subprocess.DEVNULL,
                     text=True,
                     timeout=10
                 )
@@ -324,6 +463,9 @@ class HP150ImageManagerExtended(HP150ImageManager):
                     print("✅ GreaseWeazle reseteado exitosamente")
                 else:
                     print(f"⚠️ Warning en reset de GreaseWeazle: {reset_result.stderr}")
+                
+                # Delays y reset persisten en el dispositivo: no repetirlos en cada lectura
+                self._gw_initialized = delays_result.returncode == 0 and reset_result.returncode == 0
                     
             except subprocess.TimeoutExpired:
                 print("⚠️ Timeout en configuración de GreaseWeazle - continuando de todos modos")
@@ -335,8 +477,13 @@ class HP150ImageManagerExtended(HP150ImageManager):
                 print(f"⚠️ Error inesperado en configuración de GreaseWeazle: {e}")
         
         # Ejecutar reset en hilo separado para no bloquear la GUI
-        threading.Thread(target=do_reset, daemon=True).start()
+        self._submit_io(do_reset)
     
+    def manual_reset_greaseweazle(self):
+        """Forzar delays + reset de GreaseWeazle (p. ej. tras reconectar el dispositivo)"""
+        self._gw_initialized = False
+        self.reset_greaseweazle()
+        self.update_status("Reseteando GreaseWeazle...")
     
     def update_button_states(self):
         """Actualizar estado de los botones según el contexto - Versión extendida"""
@@ -683,23 +830,7 @@ class HP150ImageManagerExtended(HP150ImageManager):
     
     def generate_hex_dump(self, data):
         """Generar dump hexadecimal de los datos"""
-        lines = []
-        for i in range(0, len(data), 16):
-            chunk = data[i:i+16]
-            
-            # Offset
-            offset = f"{i:08x}"
-            
-            # Bytes en hex
-            hex_bytes = ' '.join(f"{b:02x}" for b in chunk)
-            hex_bytes = hex_bytes.ljust(47)  # Pad para alinear
-            
-            # ASCII representation
-            ascii_repr = ''.join(chr(b) if 32 <= b <= 126 else '.' for b in chunk)
-            
-            lines.append(f"{offset}  {hex_bytes}  |{ascii_repr}|")
-        
-        return '\\n'.join(lines)
+        return hex_dump(data)
     
     # Implementación completa de eliminar archivo
     def delete_file(self):
@@ -839,7 +970,7 @@ class HP150ImageManagerExtended(HP150ImageManager):
             main_frame = ttk.Frame(progress_window, padding="20")
             main_frame.pack(fill=tk.BOTH, expand=True)
             
-            ttk.Label(main_frame, text="📤 Extrayendo todos los archivos", font=('Arial', 14, 'bold')).pack(pady=(0, 20))
+            ttk.Label(main_frame, text="📤 Extrayendo todos los archivos", font=self._fonts['title']).pack(pady=(0, 20))
             
             # Información
             info_label = ttk.Label(main_frame, text=f"Destino: {extraction_dir}")
@@ -852,9 +983,18 @@ class HP150ImageManagerExtended(HP150ImageManager):
             current_file_label = ttk.Label(progress_frame, text="Iniciando...")
             current_file_label.pack(anchor=tk.W)
             
+            # Preparar nombres de salida una sola vez, fuera del bucle de extracción
+            # (full_name se arma en cada acceso; join(dir, '') deja el separador
+            # final y cada ruta es una simple concatenación)
+            prefix = os.path.join(extraction_dir, '')
+            tasks = [
+                (filename, prefix + sanitize_filename(filename.lower()))
+                for filename in (entry.full_name for entry in extractable_files)
+            ]
+            
             progress_bar = ttk.Progressbar(progress_frame, length=400, mode='determinate')
             progress_bar.pack(fill=tk.X, pady=(5, 0))
-            progress_bar['maximum'] = len(extractable_files)
+            progress_bar['maximum'] = len(tasks)
             
             # Lista de archivos procesados
             list_frame = ttk.LabelFrame(main_frame, text="Archivos extraídos", padding="5")
@@ -871,36 +1011,66 @@ class HP150ImageManagerExtended(HP150ImageManager):
             close_btn = ttk.Button(main_frame, text="Cerrar", command=progress_window.destroy, state='disabled')
             close_btn.pack()
             
+            # El hilo solo lee y escribe archivos; los resultados vuelven a Tk
+            # por una cola (nombre, bytes escritos, error), None al final
+            result_queue = queue.Queue()
+            
             # Función para extraer archivos
             def extract_files():
-                extracted = 0
-                errors = []
-                
-                for i, file_entry in enumerate(extractable_files):
+                for filename, output_path in tasks:
                     try:
-                        current_file_label.config(text=f"Extrayendo: {file_entry.full_name}")
-                        progress_window.update_idletasks()
-                        
-                        file_data = self.fat_handler.read_file(file_entry.full_name)
-                        output_path = os.path.join(extraction_dir, file_entry.full_name.lower())
+                        file_data = self.fat_handler.read_file(filename)
                         
                         with open(output_path, 'wb') as f:
                             f.write(file_data)
                         
-                        extracted += 1
-                        file_listbox.insert(tk.END, f"✅ {file_entry.full_name} ({len(file_data):,} bytes)")
-                        file_listbox.see(tk.END)
-                        
+                        result_queue.put((filename, len(file_data), None))
                     except Exception as e:
-                        errors.append(f"{file_entry.full_name}: {e}")
-                        file_listbox.insert(tk.END, f"❌ {file_entry.full_name} (ERROR)")
-                        file_listbox.see(tk.END)
+                        result_queue.put((filename, None, e))
+                result_queue.put(None)
+            
+            progress = {'done': 0, 'extracted': 0, 'errors': []}
+            
+            def drain_results():
+                """Volcar en la ventana los resultados disponibles (hilo de Tk)"""
+                batch = []
+                finished = False
+                while True:
+                    try:
+                        item = result_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        finished = True
+                        break
                     
-                    progress_bar['value'] = i + 1
-                    progress_window.update_idletasks()
+                    filename, size, error = item
+                    if error is None:
+                        progress['extracted'] += 1
+                        batch.append(f"✅ {filename} ({size:,} bytes)")
+                    else:
+                        progress['errors'].append(f"{filename}: {error}")
+                        batch.append(f"❌ {filename} (ERROR)")
+                
+                try:
+                    if batch:
+                        progress['done'] += len(batch)
+                        current_file_label.config(text=f"Extrayendo: {filename}")
+                        file_listbox.insert(tk.END, *batch)
+                        file_listbox.see(tk.END)
+                        progress_bar['value'] = progress['done']
+                except tk.TclError:
+                    return  # Ventana cerrada
+                
+                if not finished:
+                    self.root.after(50, drain_results)
+                    return
+                
+                extracted = progress['extracted']
+                errors = progress['errors']
                 
                 # Completado
-                current_file_label.config(text=f"Completado: {extracted}/{len(extractable_files)} archivos")
+                current_file_label.config(text=f"Completado: {extracted}/{len(tasks)} archivos")
                 close_btn.config(state='normal')
                 
                 # Mostrar resumen
@@ -917,37 +1087,20 @@ class HP150ImageManagerExtended(HP150ImageManager):
                 self.update_status(f"Extraídos {extracted} archivos a {extraction_dir}")
                 messagebox.showinfo("Extracción completada", summary)
             
-            # Ejecutar extracción en hilo separado
-            import threading
-            threading.Thread(target=extract_files, daemon=True).start()
+            # Ejecutar extracción en el pool de E/S
+            self._submit_io(extract_files)
+            self.root.after(50, drain_results)
             
         except Exception as e:
             messagebox.showerror("Error", f"Error durante la extracción: {e}")
     
     # Sobrescribir funciones NO implementadas para deshabilitarlas
-    def verify_integrity(self):
-        """Función no implementada - deshabilitada"""
-        messagebox.showwarning("No Implementado", "Esta función no está implementada en esta versión")
-    
-    def repair_image(self):
+    def _not_implemented(self, *_args, **_kwargs):
         """Función no implementada - deshabilitada"""
         messagebox.showwarning("No Implementado", "Esta función no está implementada en esta versión")
     
-    def create_backup(self):
-        """Función no implementada - deshabilitada"""
-        messagebox.showwarning("No Implementado", "Esta función no está implementada en esta versión")
-    
-    def restore_backup(self):
-        """Función no implementada - deshabilitada"""
-        messagebox.showwarning("No Implementado", "Esta función no está implementada en esta versión")
-    
-    def analyze_image(self):
-        """Función no implementada - deshabilitada"""
-        messagebox.showwarning("No Implementado", "Esta función no está implementada en esta versión")
-    
-    def show_disk_info(self):
-        """Función no implementada - deshabilitada"""
-        messagebox.showwarning("No Implementado", "Esta función no está implementada en esta versión")
+    verify_integrity = repair_image = create_backup = _not_implemented
+    restore_backup = analyze_image = show_disk_info = _not_implemented
     
     def save_action(self):
         """Acción de guardar basada en contexto (CMD+S en macOS)"""
@@ -1003,7 +1156,6 @@ class HP150ImageManagerExtended(HP150ImageManager):
                         filename = os.path.splitext(filename)[0] + '.img'
                     
                     # Copiar archivo actual al nuevo destino
-                    import shutil
                     shutil.copy2(self.current_image, filename)
                     
                     # Actualizar imagen actual y marcar como no modificada
@@ -1072,6 +1224,18 @@ class HP150ImageManagerExtended(HP150ImageManager):
             else:  # No - guardar solo archivo
                 self.save_image()
         
+        # Detener procesos de GreaseWeazle pendientes para no bloquear la salida
+        # (cancel_futures de shutdown es de 3.9: se cancela lo encolado a mano)
+        for future in list(self._io_futures):
+            future.cancel()
+        self._io_pool.shutdown(wait=False)
+        for process in list(self._child_processes):
+            if process.poll() is None:
+                try:
+                    process.terminate()
+                except OSError:
+                    pass
+        
         # Limpiar archivos temporales
         if os.path.exists(self.temp_dir):
             shutil.rmtree(self.temp_dir, ignore_errors=True)
@@ -1123,15 +1287,10 @@ class HP150ImageManagerExtended(HP150ImageManager):
         if not self.check_temp_files_before_action("leer un nuevo floppy"):
             return
             
-        print("[DEBUG] Iniciando read_from_floppy()")
-        import subprocess
-        from datetime import datetime
-        import tempfile
-        
-        print("[DEBUG] Imports completados")
+        logger.debug("Iniciando read_from_floppy()")
         
         # Diálogo simple solo para seleccionar drive - MÁS GRANDE
-        print("[DEBUG] Creando diálogo...")
+        logger.debug("Creando diálogo...")
         dialog = tk.Toplevel(self.root)
         dialog.title("Leer Floppy HP-150")
         dialog.geometry("500x400")
@@ -1143,11 +1302,11 @@ class HP150ImageManagerExtended(HP150ImageManager):
         dialog.grid_columnconfigure(0, weight=1)
         dialog.grid_rowconfigure(0, weight=1)
         
-        print("[DEBUG] Diálogo creado exitosamente")
+        logger.debug("Diálogo creado exitosamente")
         
         # Variables
         drive_var = tk.IntVar(value=0)
-        print("[DEBUG] Variables creadas")
+        logger.debug("Variables creadas")
         
         # Frame principal con grid
         main_frame = ttk.Frame(dialog, padding="25")
@@ -1165,8 +1324,8 @@ class HP150ImageManagerExtended(HP150ImageManager):
         title_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 25))
         title_frame.grid_columnconfigure(0, weight=1)
         
-        ttk.Label(title_frame, text="📀 Leer Floppy HP-150", font=('Arial', 16, 'bold')).grid(row=0, column=0)
-        ttk.Label(title_frame, text="Seleccionar drive y configuración", font=('Arial', 10), foreground='gray').grid(row=1, column=0, pady=(5, 0))
+        ttk.Label(title_frame, text="📀 Leer Floppy HP-150", font=self._fonts['title16']).grid(row=0, column=0)
+        ttk.Label(title_frame, text="Seleccionar drive y configuración", font=self._fonts['text10'], foreground='gray').grid(row=1, column=0, pady=(5, 0))
         
         # Selección de drive
         drive_frame = ttk.LabelFrame(main_frame, text="Seleccionar Drive", padding="15")
@@ -1189,7 +1348,7 @@ class HP150ImageManagerExtended(HP150ImageManager):
             wrap=tk.WORD,
             relief=tk.FLAT,
             bg=dialog.cget('bg'),
-            font=('Arial', 10),
+            font=self._fonts['text10'],
             state=tk.DISABLED,
             cursor='arrow'
         )
@@ -1233,12 +1392,11 @@ class HP150ImageManagerExtended(HP150ImageManager):
         def start_read():
             drive = drive_var.get()
             
-            # Crear archivos temporales
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            temp_name = f"floppy_drive_{drive}_{timestamp}"
-            
-            scp_file = os.path.join(self.temp_dir, f"{temp_name}.scp")
-            img_file = os.path.join(self.temp_dir, f"{temp_name}.img")
+            # Crear archivos temporales: mkstemp reserva un nombre único aunque se
+            # lancen dos lecturas en el mismo segundo; la IMG comparte su raíz
+            scp_fd, scp_file = tempfile.mkstemp(suffix='.scp', prefix=f"floppy_drive_{drive}_", dir=self.temp_dir)
+            os.close(scp_fd)
+            img_file = os.path.splitext(scp_file)[0] + '.img'
             
             # Cerrar diálogo y mostrar progreso
             dialog.destroy()
@@ -1258,15 +1416,15 @@ class HP150ImageManagerExtended(HP150ImageManager):
             header_frame = ttk.Frame(main_frame)
             header_frame.pack(fill=tk.X, pady=(0, 15))
             
-            ttk.Label(header_frame, text="📀 Lectura de Floppy HP-150", font=('Arial', 14, 'bold')).pack()
-            ttk.Label(header_frame, text=f"Drive: {drive} → Temporal: {temp_name}", font=('Arial', 10)).pack(pady=(5, 0))
-            ttk.Label(header_frame, text="Los archivos se cargarán automáticamente en la GUI", font=('Arial', 9), foreground='blue').pack(pady=(0, 0))
+            ttk.Label(header_frame, text="📀 Lectura de Floppy HP-150", font=self._fonts['title']).pack()
+            ttk.Label(header_frame, text=f"Drive: {drive} → Temporal: {os.path.basename(scp_file)}", font=self._fonts['text10']).pack(pady=(5, 0))
+            ttk.Label(header_frame, text="Los archivos se cargarán automáticamente en la GUI", font=self._fonts['text9'], foreground='blue').pack(pady=(0, 0))
             
             # Proceso actual
             status_frame = ttk.LabelFrame(main_frame, text="Estado Actual", padding="10")
             status_frame.pack(fill=tk.X, pady=(0, 10))
             
-            current_step = ttk.Label(status_frame, text="Iniciando lectura...", font=('Arial', 11, 'bold'))
+            current_step = ttk.Label(status_frame, text="Iniciando lectura...", font=self._fonts['step'])
             current_step.pack(anchor=tk.W)
             
             progress_bar = ttk.Progressbar(status_frame, mode='indeterminate')
@@ -1280,8 +1438,11 @@ class HP150ImageManagerExtended(HP150ImageManager):
             console_text = scrolledtext.ScrolledText(
                 console_frame,
                 height=10,  # Altura fija más pequeña
-                font=('Monaco', 9),
-                wrap=tk.WORD
+                font=self._fonts['mono9'],
+                wrap=tk.WORD,
+                undo=False,
+                maxundo=0,
+                autoseparators=False  # Consola de solo agregar: sin registros de deshacer
             )
             console_text.pack(fill=tk.BOTH, expand=True)
             
@@ -1293,26 +1454,23 @@ class HP150ImageManagerExtended(HP150ImageManager):
             separator = ttk.Separator(button_frame, orient='horizontal')
             separator.pack(fill=tk.X, pady=(0, 15))
             
-            # Variable para controlar cancelación
-            cancel_requested = {'value': False}
-            current_process = {'process': None}
+            # Evento de cancelación (termina el proceso gw en curso al activarse)
+            cancel_event = _CancelEvent()
             
             def cancel_read():
-                cancel_requested['value'] = True
-                if current_process['process']:
-                    try:
-                        current_process['process'].terminate()
-                        console_text.insert(tk.END, "\n❌ Lectura cancelada por el usuario\n")
-                        console_text.see(tk.END)
-                    except:
-                        pass
+                cancel_event.set()
+                try:
+                    console_text.insert(tk.END, "\n❌ Lectura cancelada por el usuario\n")
+                    console_text.see(tk.END)
+                except:
+                    pass
                 progress_window.destroy()
             
             # Información adicional
             info_label = ttk.Label(
                 button_frame, 
                 text="Puedes cancelar la operación en cualquier momento",
-                font=('Arial', 10),
+                font=self._fonts['text10'],
                 foreground='gray'
             )
             info_label.pack(side=tk.LEFT, pady=5)
@@ -1337,8 +1495,10 @@ class HP150ImageManagerExtended(HP150ImageManager):
                 
                 if return_code == 0:
                     # Éxito - mostrar resumen y cargar imagen
-                    scp_size = os.path.getsize(scp_file) if os.path.exists(scp_file) else 0
-                    img_size = os.path.getsize(img_file) if os.path.exists(img_file) else 0
+                    scp_st = _stat_or_none(scp_file)
+                    img_st = _stat_or_none(img_file)
+                    scp_size = scp_st.st_size if scp_st else 0
+                    img_size = img_st.st_size if img_st else 0
                     
                     success_message = (
                         f"Lectura completada exitosamente\n\n"
@@ -1352,13 +1512,14 @@ class HP150ImageManagerExtended(HP150ImageManager):
                     messagebox.showinfo("Lectura completada", success_message)
                     
                     # Cargar automáticamente la imagen sin preguntar nada
-                    if os.path.exists(img_file):
+                    if img_st is not None:
                         self.load_image_file(img_file)
                         
                         # Marcar que tenemos archivos temporales pendientes
                         self.temp_scp_file = scp_file
                         self.temp_img_file = img_file
                         self.has_temp_files = True
+                        self._remember_scp_source(scp_file, img_file, img_st)
                 else:
                     messagebox.showerror(
                         "Error de Lectura", 
@@ -1367,7 +1528,7 @@ class HP150ImageManagerExtended(HP150ImageManager):
                     )
             
             # Ejecutar secuencia de lectura personalizada
-            self.run_floppy_read_sequence(drive, scp_file, img_file, console_text, current_step, progress_bar, on_read_complete, cancel_requested, current_process)
+            self.run_floppy_read_sequence(drive, scp_file, img_file, console_text, current_step, progress_bar, on_read_complete, cancel_event)
         
     
     def write_to_floppy(self):
@@ -1385,24 +1546,27 @@ class HP150ImageManagerExtended(HP150ImageManager):
             else:
                 return
         
-        import subprocess
-        
-        print("[DEBUG] Iniciando write_to_floppy()")
-        print(f"[DEBUG] current_image: {self.current_image}")
+        logger.debug("Iniciando write_to_floppy()")
+        logger.debug("current_image: %s", self.current_image)
         
         if not self.current_image:
-            print("[DEBUG] ERROR: No hay imagen cargada")
+            logger.debug("ERROR: No hay imagen cargada")
             messagebox.showwarning("Advertencia", "No hay imagen cargada para escribir")
             return
         
-        print(f"[DEBUG] Verificando si el archivo existe: {self.current_image}")
-        if not os.path.exists(self.current_image):
-            print(f"[DEBUG] ERROR: Archivo no existe: {self.current_image}")
+        logger.debug("Verificando si el archivo existe: %s", self.current_image)
+        try:
+            st = os.stat(self.current_image)
+        except FileNotFoundError:
+            logger.debug("ERROR: Archivo no existe: %s", self.current_image)
             messagebox.showerror("Error", f"El archivo de imagen no existe: {self.current_image}")
             return
+        except OSError as e:
+            messagebox.showerror("Error", f"No se puede acceder a la imagen {self.current_image}: {e}")
+            return
         
-        file_size = os.path.getsize(self.current_image)
-        print(f"[DEBUG] Tamaño del archivo: {file_size} bytes")
+        file_size = st.st_size
+        logger.debug("Tamaño del archivo: %s bytes", file_size)
         
         # Diálogo para seleccionar drive y confirmación
         dialog = tk.Toplevel(self.root)
@@ -1429,7 +1593,7 @@ class HP150ImageManagerExtended(HP150ImageManager):
         main_frame.rowconfigure(6, weight=1)  # Row de botones puede expandirse
         
         # Título y advertencia
-        ttk.Label(main_frame, text="💾 Escribir a Floppy", font=('Arial', 14, 'bold')).pack(pady=(0, 10))
+        ttk.Label(main_frame, text="💾 Escribir a Floppy", font=self._fonts['title']).pack(pady=(0, 10))
         
         warning_frame = ttk.Frame(main_frame)
         warning_frame.pack(fill=tk.X, pady=(0, 20))
@@ -1439,16 +1603,14 @@ class HP150ImageManagerExtended(HP150ImageManager):
             "completamente el contenido del floppy.\n"
             "¡Esta acción no se puede deshacer!"
         )
-        ttk.Label(warning_frame, text=warning_text, foreground='red', font=('Arial', 10, 'bold')).pack()
+        ttk.Label(warning_frame, text=warning_text, foreground='red', font=self._fonts['bold10']).pack()
         
         # Información de la imagen
         info_frame = ttk.LabelFrame(main_frame, text="Imagen a Escribir", padding="10")
         info_frame.pack(fill=tk.X, pady=(0, 10))
         
         ttk.Label(info_frame, text=f"Archivo: {os.path.basename(self.current_image)}").pack(anchor=tk.W)
-        if os.path.exists(self.current_image):
-            size = os.path.getsize(self.current_image)
-            ttk.Label(info_frame, text=f"Tamaño: {size:,} bytes").pack(anchor=tk.W)
+        ttk.Label(info_frame, text=f"Tamaño: {file_size:,} bytes").pack(anchor=tk.W)
         
         # Selección de drive
         drive_frame = ttk.LabelFrame(main_frame, text="Seleccionar Drive", padding="10")
@@ -1486,51 +1648,12 @@ class HP150ImageManagerExtended(HP150ImageManager):
             # Cerrar diálogo y mostrar progreso
             dialog.destroy()
             
-            # Crear ventana de progreso con consola
-            progress_window = tk.Toplevel(self.root)
-            progress_window.title("💾 Escribiendo Floppy a Drive " + str(drive))
-            progress_window.geometry("600x500")
-            progress_window.transient(self.root)
-            progress_window.grab_set()
-            
-            main_frame = ttk.Frame(progress_window, padding="15")
-            main_frame.pack(fill=tk.BOTH, expand=True)
-            
-            # Header con información
-            header_frame = ttk.Frame(main_frame)
-            header_frame.pack(fill=tk.X, pady=(0, 15))
-            
-            ttk.Label(header_frame, text="💾 Escritura de Floppy HP-150", font=('Arial', 14, 'bold')).pack()
-            ttk.Label(header_frame, text=f"Imagen: {os.path.basename(self.current_image)} → Drive: {drive}", font=('Arial', 10)).pack(pady=(5, 0))
-            
-            # Proceso actual
-            status_frame = ttk.LabelFrame(main_frame, text="Estado Actual", padding="10")
-            status_frame.pack(fill=tk.X, pady=(0, 10))
-            
-            current_step = ttk.Label(status_frame, text="Paso 1: Convirtiendo IMG a SCP...", font=('Arial', 11, 'bold'))
-            current_step.pack(anchor=tk.W)
-            
-            progress_bar = ttk.Progressbar(status_frame, mode='indeterminate')
-            progress_bar.pack(fill=tk.X, pady=(10, 0))
-            progress_bar.start()
-            
-            # Consola de salida
-            console_frame = ttk.LabelFrame(main_frame, text="Salida de GreaseWeazle", padding="10")
-            console_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
-            
-            console_text = scrolledtext.ScrolledText(
-                console_frame,
-                height=15,
-                font=('Monaco', 9),
-                bg='#1e1e1e' if self.is_dark_mode() else '#ffffff',
-                fg='#00ff00' if self.is_dark_mode() else '#000000',
-                insertbackground='#00ff00' if self.is_dark_mode() else '#000000'
+            # Mostrar ventana de progreso con consola (se reutiliza entre escrituras)
+            progress_window, console_text, current_step, progress_bar, cancel_btn = self._ensure_progress_window(
+                "💾 Escribiendo Floppy a Drive " + str(drive),
+                f"Imagen: {os.path.basename(self.current_image)} → Drive: {drive}",
+                "Paso 1: Convirtiendo IMG a SCP..."
             )
-            console_text.pack(fill=tk.BOTH, expand=True)
-            
-            # Botón cancelar
-            cancel_frame = ttk.Frame(main_frame)
-            cancel_frame.pack(fill=tk.X)
             
             # Variable para controlar cancelación
             cancel_requested = {'value': False}
@@ -1541,27 +1664,28 @@ class HP150ImageManagerExtended(HP150ImageManager):
                 if current_process['process']:
                     try:
                         current_process['process'].terminate()
-                        console_text.insert(tk.END, "\n❌ Escritura cancelada por el usuario\n")
-                        console_text.see(tk.END)
-                    except:
+                    except OSError:
                         pass
-                progress_window.destroy()
+                # Por el buffer de la consola: al reutilizar la ventana se descarta
+                self._console_append(console_text, "\n❌ Escritura cancelada por el usuario\n")
+                self._hide_progress_window()
             
-            cancel_btn = ttk.Button(cancel_frame, text="❌ Cancelar", command=cancel_write)
-            cancel_btn.pack(side=tk.RIGHT)
+            cancel_btn.config(text="❌ Cancelar", command=cancel_write)
+            progress_window.protocol("WM_DELETE_WINDOW", cancel_write)
             
             def on_write_complete(return_code):
                 """Callback cuando termina la escritura"""
-                print(f"[DEBUG] on_write_complete llamado con return_code: {return_code}")
+                logger.debug("on_write_complete llamado con return_code: %s", return_code)
                 
                 # NO destruir la ventana automáticamente - dejar que el usuario la cierre
                 progress_bar.stop()
                 
                 # Cambiar el botón cancelar por cerrar
-                cancel_btn.config(text="✅ Cerrar", command=progress_window.destroy)
+                cancel_btn.config(text="✅ Cerrar", command=self._hide_progress_window)
+                progress_window.protocol("WM_DELETE_WINDOW", self._hide_progress_window)
                 
                 if return_code == 0:
-                    print(f"[DEBUG] Escritura exitosa")
+                    logger.debug("Escritura exitosa")
                     # Éxito
                     self.set_modified(False)  # Marcar como guardado
                     messagebox.showinfo(
@@ -1570,59 +1694,35 @@ class HP150ImageManagerExtended(HP150ImageManager):
                         f"El floppy está listo para usar en el HP-150"
                     )
                 else:
-                    print(f"[DEBUG] Error en escritura, código: {return_code}")
+                    logger.debug("Error en escritura, código: %s", return_code)
                     messagebox.showerror(
                         "Error de Escritura", 
                         f"Error escribiendo al floppy (código: {return_code})\n"
                         f"Revisa la consola para más detalles."
                     )
             
+            if self._gw_package:
+                self._write_with_gw_package(drive, verify, file_size, console_text, current_step, on_write_complete, cancel_requested, current_process)
+                return
+            
             # Ejecutar comando con consola en tiempo real
             # Obtener ruta del script - compatible con PyInstaller bundle
-            def get_script_path():
-                """Obtener ruta del script compatible con bundle y desarrollo"""
-                script_name = 'write_hp150_floppy.sh'
-                
-                # En aplicación bundleada con PyInstaller
-                if hasattr(sys, '_MEIPASS'):
-                    bundle_script_path = os.path.join(sys._MEIPASS, 'scripts', script_name)
-                    if os.path.exists(bundle_script_path):
-                        return bundle_script_path
-                
-                # En desarrollo - relativo al directorio del proyecto
-                current_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-                dev_script_path = os.path.join(current_dir, 'scripts', script_name)
-                if os.path.exists(dev_script_path):
-                    return dev_script_path
-                
-                # Búsqueda adicional en directorios comunes
-                possible_paths = [
-                    os.path.join(os.getcwd(), 'scripts', script_name),
-                    os.path.join(os.path.dirname(sys.executable), 'scripts', script_name),
-                    script_name  # En PATH
-                ]
-                
-                for path in possible_paths:
-                    if os.path.exists(path):
-                        return path
-                
-                return None
+            script_path = self._resolve_script_path()
             
-            script_path = get_script_path()
+            logger.debug("Construyendo comando de escritura...")
+            logger.debug("script_path: %s", script_path)
+            logger.debug("¿Existe script?: %s", script_path is not None)
+            logger.debug("current_image: %s", self.current_image)
+            logger.debug("drive: %s", drive)
+            logger.debug("verify: %s", verify)
             
-            print(f"[DEBUG] Construyendo comando de escritura...")
-            print(f"[DEBUG] script_path: {script_path}")
-            print(f"[DEBUG] ¿Existe script?: {script_path and os.path.exists(script_path)}")
-            print(f"[DEBUG] current_image: {self.current_image}")
-            print(f"[DEBUG] drive: {drive}")
-            print(f"[DEBUG] verify: {verify}")
-            
-            console_text.insert(tk.END, f"[DEBUG] Script path: {script_path}\n")
-            console_text.insert(tk.END, f"[DEBUG] ¿Script existe?: {script_path and os.path.exists(script_path)}\n")
-            console_text.insert(tk.END, f"[DEBUG] Directorio actual: {os.getcwd()}\n")
+            if logger.isEnabledFor(logging.DEBUG):
+                console_text.insert(tk.END, f"[DEBUG] Script path: {script_path}\n")
+                console_text.insert(tk.END, f"[DEBUG] ¿Script existe?: {script_path is not None}\n")
+                console_text.insert(tk.END, f"[DEBUG] Directorio actual: {os.getcwd()}\n")
             
             # Si el script no existe, usar directamente GreaseWeazle
-            if not script_path or not os.path.exists(script_path):
+            if not script_path:
                 console_text.insert(tk.END, f"⚠️ Script no encontrado, usando GreaseWeazle directamente\n")
                 console_text.see(tk.END)
                 self.write_directly_with_greasewazle(drive, verify, console_text, current_step, progress_bar, on_write_complete, cancel_requested, current_process)
@@ -1633,17 +1733,16 @@ class HP150ImageManagerExtended(HP150ImageManager):
             if verify:
                 cmd.append('--verify')
             
-            print(f"[DEBUG] Comando final: {cmd}")
+            logger.debug("Comando final: %s", cmd)
             
-            console_text.insert(tk.END, f"Ejecutando: {' '.join(cmd)}\n")
-            console_text.see(tk.END)
+            self._echo_command(console_text, cmd, "Ejecutando")
             
             try:
-                print(f"[DEBUG] Iniciando run_command_with_console...")
+                logger.debug("Iniciando run_command_with_console...")
                 self.run_command_with_console(cmd, console_text, current_step, progress_bar, on_write_complete, cancel_requested, current_process)
-                print(f"[DEBUG] run_command_with_console iniciado")
+                logger.debug("run_command_with_console iniciado")
             except Exception as e:
-                print(f"[DEBUG] ERROR en run_command_with_console: {e}")
+                logger.debug("ERROR en run_command_with_console: %s", e)
                 console_text.insert(tk.END, f"ERROR iniciando comando: {e}\n")
                 console_text.see(tk.END)
                 on_write_complete(1)
@@ -1656,14 +1755,164 @@ class HP150ImageManagerExtended(HP150ImageManager):
         
         return True  # Para indicar que se intentó la escritura
     
+    def _run_gw_subprocess(self, cmd, on_line, cancel_event):
+        """Ejecutar un comando gw en el hilo actual hasta que termine.
+        
+        La salida (stdout y stderr combinados) se lee por bloques de líneas y
+        se pasa a on_line, que debe poder llamarse desde otro hilo; no se
+        acumula en memoria. No hace falta un hilo lector aparte: el mismo hilo
+        espera en el pipe con selectors y, al llegar al final, recoge el código
+        con wait(). La cancelación la hace cancel_event terminando el proceso.
+        
+        Devuelve el código de salida o None si se canceló.
+        """
+        if cancel_event.is_set():
+            return None
+        
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            close_fds=True,
+            bufsize=0
+        )
+        self._child_processes.add(process)
+        cancel_event.attach(process)
+        
+        try:
+            for text in iter_pipe_text(process.stdout.fileno(), should_stop=cancel_event.is_set):
+                on_line(text)
+        finally:
+            process.stdout.close()
+        
+        if cancel_event.is_set():
+            return None
+        return process.wait()
+    
+    def _ensure_progress_window(self, title, header_text, first_step):
+        """Mostrar la ventana de progreso de escritura, creándola solo la primera vez.
+        
+        Devuelve (ventana, consola, etiqueta de paso, barra de progreso, botón cancelar)
+        ya reiniciados para una nueva operación.
+        """
+        if self._progress_window is None or not self._progress_window.winfo_exists():
+            progress_window = tk.Toplevel(self.root)
+            progress_window.geometry("600x500")
+            progress_window.transient(self.root)
+            
+            main_frame = ttk.Frame(progress_window, padding="15")
+            main_frame.pack(fill=tk.BOTH, expand=True)
+            
+            # Header con información
+            header_frame = ttk.Frame(main_frame)
+            header_frame.pack(fill=tk.X, pady=(0, 15))
+            
+            ttk.Label(header_frame, text="💾 Escritura de Floppy HP-150", font=self._fonts['title']).pack()
+            self._progress_header = ttk.Label(header_frame, font=self._fonts['text10'])
+            self._progress_header.pack(pady=(5, 0))
+            
+            # Proceso actual
+            status_frame = ttk.LabelFrame(main_frame, text="Estado Actual", padding="10")
+            status_frame.pack(fill=tk.X, pady=(0, 10))
+            
+            self._progress_step = ttk.Label(status_frame, font=self._fonts['step'])
+            self._progress_step.pack(anchor=tk.W)
+            
+            self._progress_bar = ttk.Progressbar(status_frame, mode='indeterminate')
+            self._progress_bar.pack(fill=tk.X, pady=(10, 0))
+            
+            # Consola de salida
+            console_frame = ttk.LabelFrame(main_frame, text="Salida de GreaseWeazle", padding="10")
+            console_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+            
+            dark = self.is_dark_mode()
+            self._progress_console = scrolledtext.ScrolledText(
+                console_frame,
+                height=15,
+                font=self._fonts['mono9'],
+                bg='#1e1e1e' if dark else '#ffffff',
+                fg='#00ff00' if dark else '#000000',
+                insertbackground='#00ff00' if dark else '#000000',
+                undo=False,
+                maxundo=0,
+                autoseparators=False  # Consola de solo agregar: sin registros de deshacer
+            )
+            self._progress_console.pack(fill=tk.BOTH, expand=True)
+            
+            # Botón cancelar (el comando lo asigna cada operación)
+            cancel_frame = ttk.Frame(main_frame)
+            cancel_frame.pack(fill=tk.X)
+            
+            self._progress_cancel_btn = ttk.Button(cancel_frame, text="❌ Cancelar")
+            self._progress_cancel_btn.pack(side=tk.RIGHT)
+            
+            self._progress_window = progress_window
+        else:
+            # Reutilizar: descartar texto pendiente y vaciar la consola
+            with self._console_lock:
+                self._console_buffers.pop(self._progress_console, None)
+            self._progress_console.delete("1.0", tk.END)
+            self._progress_window.deiconify()
+        
+        self._progress_window.title(title)
+        self._progress_header.config(text=header_text)
+        self._progress_step.config(text=first_step)
+        self._progress_bar.start()
+        self._progress_window.grab_set()
+        
+        return (self._progress_window, self._progress_console, self._progress_step,
+                self._progress_bar, self._progress_cancel_btn)
+    
+    def _hide_progress_window(self):
+        """Ocultar la ventana de progreso para reutilizarla en la próxima escritura"""
+        if self._progress_window is not None and self._progress_window.winfo_exists():
+            self._progress_bar.stop()
+            self._progress_window.grab_release()
+            self._progress_window.withdraw()
+    
+    def _resolve_script_path(self, script_name='write_hp150_floppy.sh'):
+        """Obtener ruta del script compatible con bundle y desarrollo (se busca una sola vez)"""
+        if self._script_paths.get(script_name) is not None:
+            return self._script_paths[script_name]
+        
+        # En aplicación bundleada con PyInstaller
+        candidates = []
+        if hasattr(sys, '_MEIPASS'):
+            candidates.append(os.path.join(sys._MEIPASS, 'scripts', script_name))
+        
+        # En desarrollo - relativo al directorio del proyecto
+        current_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        candidates.append(os.path.join(current_dir, 'scripts', script_name))
+        
+        # Búsqueda adicional en directorios comunes
+        candidates += [
+            os.path.join(os.getcwd(), 'scripts', script_name),
+            os.path.join(os.path.dirname(sys.executable), 'scripts', script_name),
+            script_name  # En PATH
+        ]
+        
+        for path in candidates:
+            if os.path.exists(path):
+                self._script_paths[script_name] = path
+                return path
+        
+        return None
+    
     def is_dark_mode(self):
-        """Detectar si macOS está en modo oscuro"""
+        """Detectar si macOS está en modo oscuro (se consulta una vez por sesión)"""
+        if self._dark_mode_cache is None:
+            self._dark_mode_cache = self._probe_dark_mode()
+        return self._dark_mode_cache
+    
+    def _probe_dark_mode(self):
+        """Consultar a macOS si el modo oscuro está activo"""
         if sys.platform == "darwin":
             try:
-                import subprocess
                 result = subprocess.run(
                     ['defaults', 'read', '-g', 'AppleInterfaceStyle'],
                     capture_output=True,
+                    stdin=subprocess.DEVNULL,
                     text=True
                 )
                 return result.returncode == 0 and 'Dark' in result.stdout
@@ -1671,16 +1920,171 @@ class HP150ImageManagerExtended(HP150ImageManager):
                 return False
         return False
     
+    def _echo_command(self, console_text, cmd, prefix="Comando"):
+        """Mostrar en la consola el comando a ejecutar (solo si la consola sigue abierta)"""
+        try:
+            if not console_text.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        self._console_append(console_text, f"{prefix}: {format_command(cmd)}\n")
+    
+    def _submit_io(self, fn, *args):
+        """Encolar fn en el pool de E/S recordando el future hasta que termine"""
+        future = self._io_pool.submit(fn, *args)
+        self._io_futures.add(future)
+        future.add_done_callback(self._io_futures.discard)
+        return future
+    
+    def _console_append(self, console_text, text):
+        """Agregar texto a la consola agrupando las inserciones en bloques de 50 ms"""
+        with self._console_lock:
+            buf = self._console_buffers.setdefault(console_text, [])
+            buf.append(text)
+            if len(buf) > 1:
+                return  # Ya hay un volcado programado
+        self._schedule_console_flush(console_text)
+    
+    def _schedule_console_flush(self, console_text):
+        """Programar el volcado del buffer de la consola"""
+        try:
+            console_text.after(50, self._flush_console, console_text)
+        except tk.TclError:
+            with self._console_lock:
+                self._console_buffers.pop(console_text, None)
+    
+    def _flush_console(self, console_text):
+        """Insertar de una vez todo el texto pendiente de la consola"""
+        with self._console_lock:
+            buf = self._console_buffers.pop(console_text, None)
+        if not buf:
+            return
+        try:
+            console_text.insert(tk.END, "".join(buf))
+            
+            # Descartar las líneas más antiguas para mantener la consola acotada
+            line_count = int(console_text.index('end-1c').split('.')[0])
+            excess = line_count - CONSOLE_MAX_LINES
+            if excess > 0:
+                console_text.delete("1.0", f"{excess + 1}.0")
+            
+            console_text.see(tk.END)
+        except tk.TclError:
+            pass  # Ventana de progreso ya cerrada
+    
+    def _filehandler_available(self):
+        """createfilehandler solo existe en Tk para Unix (no en Windows)"""
+        return sys.platform != 'win32' and hasattr(self.root.tk, 'createfilehandler')
+    
+    def _watch_process_output(self, process, on_output, on_exit, cancel_requested=None):
+        """Leer la salida de un proceso desde el bucle de eventos de Tk.
+        
+        El proceso debe crearse en modo binario con bufsize=0 (y stderr=STDOUT si
+        interesa su salida de error) y esta función debe llamarse desde el hilo
+        principal. on_output recibe bloques de líneas completas; on_exit recibe el
+        código de salida cuando el pipe llega a EOF.
+        """
+        streams = {}
+        
+        def close_streams():
+            for fd in list(streams):
+                try:
+                    self.root.tk.deletefilehandler(fd)
+                except tk.TclError:
+                    pass
+                streams.pop(fd)['pipe'].close()
+        
+        def wait_for_exit():
+            # Ambos pipes cerrados: esperar a que el proceso termine
+            if process.poll() is None:
+                self.root.after(50, wait_for_exit)
+                return
+            on_exit(process.returncode)
+        
+        def drain(fd):
+            state = streams.get(fd)
+            if state is None:
+                return
+            
+            # Verificar si fue cancelado
+            if cancel_requested and cancel_requested['value']:
+                close_streams()
+                try:
+                    process.terminate()
+                except:
+                    pass
+                return
+            
+            try:
+                try:
+                    chunk = os.read(fd, 8192)
+                except BlockingIOError:
+                    return
+                except OSError:
+                    chunk = b''
+                
+                text = state['partial'] + state['decoder'].decode(chunk, final=not chunk)
+                *lines, state['partial'] = text.split('\n')
+                if lines:
+                    on_output("".join(line + '\n' for line in lines))
+                
+                if not chunk:
+                    # EOF: vaciar resto y dejar de vigilar este descriptor
+                    if state['partial']:
+                        on_output(state['partial'])
+                    self.root.tk.deletefilehandler(fd)
+                    streams.pop(fd)['pipe'].close()
+                    if not streams:
+                        wait_for_exit()
+            except Exception as e:
+                close_streams()
+                on_output(f"Error en consola: {e}\n")
+        
+        def watch(pipe):
+            fd = pipe.fileno()
+            os.set_blocking(fd, False)
+            streams[fd] = {
+                'pipe': pipe,
+                'partial': '',
+                'decoder': text_decoder(),
+            }
+            self.root.tk.createfilehandler(fd, tk.READABLE, lambda f, m: drain(fd))
+        
+        # Tk despierta a drain() solo cuando hay datos en el pipe
+        watch(process.stdout)
+    
     def run_command_with_console(self, cmd, console_text, current_step, progress_bar, on_complete, cancel_requested=None, current_process=None):
         """Ejecutar comando mostrando salida en tiempo real en la consola"""
-        import subprocess
-        import queue
-        import threading
         
+        def complete(return_code):
+            # Volcar la salida pendiente antes de notificar el resultado
+            self._flush_console(console_text)
+            on_complete(return_code)
+        
+        # createfilehandler no existe en Windows: ahí se mantiene la lectura con hilos
+        use_filehandler = self._filehandler_available()
+        
+        def process_output(text):
+            """Mostrar texto en la consola y actualizar el paso actual"""
+            self._console_append(console_text, text)
+            
+            # Actualizar step según la salida específica del script
+            label = match_step(text)
+            if label:
+                current_step.config(text=label)
+        
+        def on_exit(return_code):
+            progress_bar.stop()
+            complete(return_code)
+        
+        # --- Lectura con hilos (Windows) ---
         def enqueue_output(out, queue):
-            for line in iter(out.readline, ''):
-                queue.put(line)
+            for text in iter_pipe_text(out.fileno()):
+                queue.put(text)
             out.close()
+            queue.put(None)  # EOF
+        
+        output_done = {'value': False}
         
         def update_console():
             try:
@@ -1694,182 +2098,165 @@ class HP150ImageManagerExtended(HP150ImageManager):
                         return
                         
                     try:
-                        line = q.get_nowait()
+                        text = q.get_nowait()
                     except queue.Empty:
-                        # Verificar si el proceso ha terminado
-                        if process.poll() is not None:
-                            # Proceso terminado, leer cualquier salida restante con cuidado
-                            try:
-                                remaining_output = process.stdout.read()
-                                if remaining_output:
-                                    console_text.insert(tk.END, remaining_output)
-                            except (ValueError, OSError):
-                                pass  # El pipe ya está cerrado
-                            
-                            try:
-                                remaining_error = process.stderr.read()
-                                if remaining_error:
-                                    console_text.insert(tk.END, "ERROR: " + remaining_error)
-                            except (ValueError, OSError):
-                                pass  # El pipe ya está cerrado
-                            
-                            console_text.see(tk.END)
+                        # Verificar si el proceso ha terminado y la salida llegó a EOF
+                        if output_done['value'] and process.poll() is not None:
                             progress_bar.stop()
                             
                             # Llamar callback de completación
-                            on_complete(process.returncode)
+                            complete(process.returncode)
                             return
                         
                         # Programar siguiente verificación
                         console_text.after(100, update_console)
                         return
+                    
+                    if text is None:
+                        output_done['value'] = True
                     else:
-                        # Agregar línea a la consola
-                        line_text = line  # Ya es string en modo texto
-                        console_text.insert(tk.END, line_text)
-                        console_text.see(tk.END)
-                        
-                        # Actualizar step según la salida específica del script
-                        if "Paso 1: Leyendo disco en formato SCP" in line_text:
-                            current_step.config(text="📀 Paso 1: Leyendo disco a SCP...")
-                        elif "Iniciando lectura del floppy" in line_text:
-                            current_step.config(text="🔄 Ejecutando GreaseWeazle...")
-                        elif "Reading cylinder" in line_text or "Reading track" in line_text:
-                            current_step.config(text="📀 Leyendo pistas del disco...")
-                        elif "Paso 2: Convirtiendo de SCP a IMG" in line_text:
-                            current_step.config(text="🔄 Paso 2: Convirtiendo SCP a IMG...")
-                        elif "Conversión completada exitosamente" in line_text:
-                            current_step.config(text="✅ Conversión completada!")
-                        elif "Archivo creado:" in line_text:
-                            current_step.config(text="✅ Archivo creado exitosamente!")
-                        elif "Tamaño correcto:" in line_text:
-                            current_step.config(text="✅ Proceso completado - Imagen válida!")
-                        
-                        # Para escritura
-                        elif "Paso 1: Convirtiendo IMG a formato SCP" in line_text:
-                            current_step.config(text="🔄 Paso 1: Convirtiendo IMG a SCP...")
-                        elif "Conversión completada:" in line_text:
-                            current_step.config(text="✅ Conversión a SCP completada!")
-                        elif "Paso 2: Escribiendo formato SCP al disco" in line_text:
-                            current_step.config(text="💾 Paso 2: Escribiendo SCP al disco...")
-                        elif "Iniciando escritura del floppy" in line_text:
-                            current_step.config(text="🔄 Ejecutando GreaseWeazle...")
-                        elif "Escritura completada exitosamente" in line_text:
-                            current_step.config(text="✅ Escritura completada!")
+                        # Agregar bloque de líneas a la consola
+                        process_output(text)
             except Exception as e:
-                console_text.insert(tk.END, f"Error en consola: {e}\n")
-                console_text.see(tk.END)
+                self._console_append(console_text, f"Error en consola: {e}\n")
         
-        print(f"[DEBUG] run_command_with_console iniciando...")
-        print(f"[DEBUG] cmd: {cmd}")
-        print(f"[DEBUG] cwd: {os.getcwd()}")
+        logger.debug("run_command_with_console iniciando...")
+        logger.debug("cmd: %s", cmd)
+        logger.debug("cwd: %s", os.getcwd())
         
         try:
             # Iniciar proceso
-            print(f"[DEBUG] Creando subprocess.Popen...")
+            logger.debug("Creando subprocess.Popen...")
+            # Modo binario sin buffer: se lee con os.read y se decodifica por bloques.
+            # stderr va al mismo pipe (GreaseWeazle escribe su progreso en stderr)
             process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                close_fds=True,
                 cwd=os.getcwd(),
-                universal_newlines=True,  # Use text mode
-                encoding='utf-8',
-                errors='replace',  # Replace invalid UTF-8 with replacement characters
-                bufsize=1
+                bufsize=0
             )
-            print(f"[DEBUG] Proceso creado con PID: {process.pid}")
+            logger.debug("Proceso creado con PID: %s", process.pid)
             
             # Guardar proceso para cancelación
             if current_process:
                 current_process['process'] = process
+                self._child_processes.add(process)
             
-            # Cola para la salida
-            q = queue.Queue()
-            
-            # Hilos para leer stdout y stderr
-            threading.Thread(target=enqueue_output, args=(process.stdout, q), daemon=True).start()
-            threading.Thread(target=enqueue_output, args=(process.stderr, q), daemon=True).start()
-            
-            # Iniciar actualización de consola
-            update_console()
+            if use_filehandler:
+                self._watch_process_output(process, process_output, on_exit, cancel_requested)
+            else:
+                # Cola para la salida
+                q = queue.Queue()
+                
+                # Hilo para leer la salida combinada
+                self._submit_io(enqueue_output, process.stdout, q)
+                
+                # Iniciar actualización de consola
+                update_console()
             
         except Exception as e:
-            print(f"[DEBUG] EXCEPCIÓN en run_command_with_console: {e}")
-            print(f"[DEBUG] Tipo de excepción: {type(e)}")
-            import traceback
-            print(f"[DEBUG] Traceback: {traceback.format_exc()}")
+            logger.debug("EXCEPCIÓN en run_command_with_console: %s", e)
+            logger.debug("Tipo de excepción: %s", type(e), exc_info=True)
             
-            console_text.insert(tk.END, f"Error iniciando proceso: {e}\n")
-            console_text.insert(tk.END, f"Tipo: {type(e)}\n")
-            console_text.see(tk.END)
+            self._console_append(console_text, f"Error iniciando proceso: {e}\n")
+            self._console_append(console_text, f"Tipo: {type(e)}\n")
             
             try:
                 progress_bar.stop()
             except:
                 pass
-            on_complete(1)  # Código de error
+            complete(1)  # Código de error
     
-    def run_floppy_read_sequence(self, drive, scp_file, img_file, console_text, current_step, progress_bar, on_complete, cancel_requested, current_process):
-        """Ejecutar secuencia de lectura: SCP + conversión a IMG"""
-        import subprocess
-        import threading
+    def run_floppy_read_sequence(self, drive, scp_file, img_file, console_text, current_step, progress_bar, on_complete, cancel_event):
+        """Ejecutar secuencia de lectura: SCP + conversión a IMG
+        
+        cancel_event es un _CancelEvent: al activarse termina el proceso gw en curso.
+        """
+        # Ruta de gw resuelta una vez para toda la secuencia
+        gw_path = self.config_manager.get_greasewazle_path()
+        
+        # La secuencia corre en un hilo del pool: solo hace E/S de subprocesos y
+        # todo lo que toca widgets vuelve al hilo de Tk con root.after
+        def on_tk(func, *args):
+            def run():
+                try:
+                    func(*args)
+                except tk.TclError:
+                    pass  # Ventana de progreso ya cerrada
+            self.root.after(0, run)
+        
+        def set_step(text):
+            on_tk(current_step.config, {'text': text})
+        
+        def stop_progress():
+            on_tk(progress_bar.stop)
+        
+        def finish(return_code):
+            # Volcar la salida pendiente antes de notificar el resultado
+            self._flush_console(console_text)
+            on_complete(return_code)
+        
+        def complete(return_code):
+            self.root.after(0, finish, return_code)
         
         def step1_read_scp():
-            """Paso 1: Leer a formato SCP"""
-            if cancel_requested['value']:
-                return
-                
-            # Primero hacer reset de GreaseWeazle
-            current_step.config(text="🔄 Reseteando GreaseWeazle...")
-            console_text.insert(tk.END, f"Reseteando GreaseWeazle antes de lectura...\n")
-            console_text.see(tk.END)
+            """Paso 1: Leer a formato SCP (devuelve el código de salida o None si se canceló)"""
+            if cancel_event.is_set():
+                return None
             
-            try:
-                # Paso 1: Configurar delays
-                gw_path = self.config_manager.get_greasewazle_path()
-                delays_process = subprocess.run(
-                    [gw_path, 'delays', '--step', '20000'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
+            # Primero hacer reset de GreaseWeazle (solo la primera vez en la sesión)
+            if not self._gw_initialized:
+                set_step("🔄 Reseteando GreaseWeazle...")
+                self._console_append(console_text, f"Reseteando GreaseWeazle antes de lectura...\n")
                 
-                if delays_process.returncode == 0:
-                    console_text.insert(tk.END, "\u2705 Delays configurados (--step 20000)\n")
-                else:
-                    console_text.insert(tk.END, f"\u26a0\ufe0f Warning configurando delays: {delays_process.stderr}\n")
-                
-                # Paso 2: Reset
-                reset_process = subprocess.run(
-                    [gw_path, 'reset'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                
-                if reset_process.returncode == 0:
-                    console_text.insert(tk.END, "\u2705 GreaseWeazle reseteado exitosamente\n")
-                else:
-                    console_text.insert(tk.END, f"\u26a0\ufe0f Warning en reset: {reset_process.stderr}\n")
-                
-                console_text.see(tk.END)
-                
-            except subprocess.TimeoutExpired:
-                console_text.insert(tk.END, "⚠️ Timeout en reset - continuando...\n")
-                console_text.see(tk.END)
-            except Exception as e:
-                console_text.insert(tk.END, f"⚠️ Error en reset: {e} - continuando...\n")
-                console_text.see(tk.END)
+                try:
+                    # Paso 1: Configurar delays
+                    delays_process = subprocess.run(
+                        [gw_path, 'delays', '--step', '20000'],
+                        capture_output=True,
+                        stdin=subprocess.DEVNULL,
+                        text=True,
+                        timeout=10
+                    )
+                    
+                    if delays_process.returncode == 0:
+                        self._console_append(console_text, "\u2705 Delays configurados (--step 20000)\n")
+                    else:
+                        self._console_append(console_text, f"\u26a0\ufe0f Warning configurando delays: {delays_process.stderr}\n")
+                    
+                    # Paso 2: Reset
+                    reset_process = subprocess.run(
+                        [gw_path, 'reset'],
+                        capture_output=True,
+                        stdin=subprocess.DEVNULL,
+                        text=True,
+                        timeout=10
+                    )
+                    
+                    if reset_process.returncode == 0:
+                        self._console_append(console_text, "\u2705 GreaseWeazle reseteado exitosamente\n")
+                    else:
+                        self._console_append(console_text, f"\u26a0\ufe0f Warning en reset: {reset_process.stderr}\n")
+                    
+                    self._gw_initialized = delays_process.returncode == 0 and reset_process.returncode == 0
+                    
+                except subprocess.TimeoutExpired:
+                    self._console_append(console_text, "⚠️ Timeout en reset - continuando...\n")
+                except Exception as e:
+                    self._console_append(console_text, f"⚠️ Error en reset: {e} - continuando...\n")
+            else:
+                self._console_append(console_text, "✅ GreaseWeazle ya inicializado en esta sesión\n")
             
             # Verificar si fue cancelado después del reset
-            if cancel_requested['value']:
-                return
+            if cancel_event.is_set():
+                return None
                 
-            current_step.config(text="📀 Paso 1: Leyendo flujo magnético...")
-            console_text.insert(tk.END, f"\nPaso 1: Leyendo desde drive {drive} a SCP...\n")
-            console_text.see(tk.END)
+            set_step("📀 Paso 1: Leyendo flujo magnético...")
+            self._console_append(console_text, f"\nPaso 1: Leyendo desde drive {drive} a SCP...\n")
             
-            gw_path = self.config_manager.get_greasewazle_path()
             cmd = [
                 gw_path, "read", 
                 f"--drive={drive}", 
@@ -1878,198 +2265,60 @@ class HP150ImageManagerExtended(HP150ImageManager):
                 scp_file
             ]
             
-            console_text.insert(tk.END, f"Comando: {' '.join(cmd)}\n")
-            console_text.see(tk.END)
+            self._echo_command(console_text, cmd)
+            
+            def show_output(output):
+                self._console_append(console_text, output)
+                
+                # Actualizar progreso basado en la salida
+                label = match_step(output)
+                if label:
+                    set_step(label)
             
             try:
-                # Usar subprocess.Popen para salida en tiempo real
+                # Usar subprocess.Popen para salida en tiempo real (stderr mezclado con stdout)
                 process = subprocess.Popen(
                     cmd,
                     stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    encoding='utf-8',
-                    errors='replace',
-                    bufsize=1,
-                    universal_newlines=True
+                    stderr=subprocess.STDOUT,
+                    stdin=subprocess.DEVNULL,
+                    close_fds=True,
+                    bufsize=0
                 )
                 
-                # Guardar proceso para cancelación
-                current_process['process'] = process
-                
-                # Leer salida línea por línea en tiempo real (stdout y stderr)
-                import select
-                import os
-                
-                # Configurar descriptores para select
-                stdout_fd = process.stdout.fileno()
-                stderr_fd = process.stderr.fileno()
-                
-                # Hacer los pipes no bloqueantes (compatibilidad Windows/Unix)
-                try:
-                    # En Unix/Linux/macOS
-                    os.set_blocking(stdout_fd, False)
-                    os.set_blocking(stderr_fd, False)
-                except AttributeError:
-                    # En Windows, os.set_blocking no existe
-                    # Usar fcntl si está disponible, sino continuar sin modo no bloqueante
-                    try:
-                        import fcntl
-                        fcntl.fcntl(stdout_fd, fcntl.F_SETFL, os.O_NONBLOCK)
-                        fcntl.fcntl(stderr_fd, fcntl.F_SETFL, os.O_NONBLOCK)
-                    except (ImportError, OSError):
-                        # En Windows sin fcntl, usar un enfoque alternativo
-                        pass
-                
-                while True:
-                    if cancel_requested['value']:
-                        try:
-                            process.terminate()
-                        except:
-                            pass
-                        return
-                    
-                    # Verificar si el proceso terminó
-                    if process.poll() is not None:
-                        # Leer cualquier salida restante
-                        try:
-                            remaining_stdout = process.stdout.read()
-                            if remaining_stdout:
-                                console_text.insert(tk.END, remaining_stdout)
-                                console_text.see(tk.END)
-                        except:
-                            pass
-                        
-                        try:
-                            remaining_stderr = process.stderr.read()
-                            if remaining_stderr:
-                                console_text.insert(tk.END, remaining_stderr)
-                                console_text.see(tk.END)
-                        except:
-                            pass
-                        break
-                    
-                    # Usar select para verificar si hay datos disponibles
-                    try:
-                        ready, _, _ = select.select([stdout_fd, stderr_fd], [], [], 0.1)
-                        
-                        for fd in ready:
-                            if fd == stdout_fd:
-                                try:
-                                    output = process.stdout.readline()
-                                    if output:
-                                        console_text.insert(tk.END, output)
-                                        console_text.see(tk.END)
-                                        console_text.update_idletasks()
-                                        
-                                        # Actualizar progreso basado en la salida
-                                        if "Reading cylinder" in output or "Reading track" in output:
-                                            current_step.config(text="📀 Leyendo pistas del disco...")
-                                        elif "T" in output and "H" in output and "R" in output:
-                                            # Formato típico de GreaseWeazle: T0.0 R0
-                                            current_step.config(text="📀 Leyendo pistas del disco...")
-                                except:
-                                    pass
-                            
-                            elif fd == stderr_fd:
-                                try:
-                                    error_output = process.stderr.readline()
-                                    if error_output:
-                                        console_text.insert(tk.END, error_output)
-                                        console_text.see(tk.END)
-                                        console_text.update_idletasks()
-                                        
-                                        # También buscar progreso en stderr
-                                        if "Reading cylinder" in error_output or "Reading track" in error_output:
-                                            current_step.config(text="📀 Leyendo pistas del disco...")
-                                        elif "T" in error_output and "H" in error_output:
-                                            current_step.config(text="📀 Leyendo pistas del disco...")
-                                except:
-                                    pass
-                        
-                        # Si no hay datos listos, dar una pequeña pausa
-                        if not ready:
-                            import time
-                            time.sleep(0.05)
-                            
-                    except (select.error, OSError):
-                        # Si select falla, volver al método anterior
-                        try:
-                            output = process.stdout.readline()
-                            if output:
-                                console_text.insert(tk.END, output)
-                                console_text.see(tk.END)
-                                console_text.update_idletasks()
-                            elif process.poll() is not None:
-                                break
-                        except tk.TclError:
-                            break  # Widget destruido
-                        except:
-                            pass
+                # Asociar el proceso al evento: cancelar lo termina directamente
+                self._child_processes.add(process)
+                cancel_event.attach(process)
                 
-                # Verificar si fue cancelado antes de continuar
-                if cancel_requested['value']:
-                    return
-                    
-                # Obtener código de salida
-                return_code = process.wait()
+                # Lectura en este mismo hilo (selectors en Unix para atender la cancelación)
+                for output in iter_pipe_text(process.stdout.fileno(), should_stop=cancel_event.is_set):
+                    show_output(output)
                 
-                # Leer stderr si hay
-                stderr_output = process.stderr.read()
-                if stderr_output:
-                    try:
-                        console_text.insert(tk.END, f"STDERR: {stderr_output}")
-                        console_text.see(tk.END)
-                    except tk.TclError:
-                        pass
+                if cancel_event.is_set():
+                    return None
                 
-                if return_code == 0:
-                    try:
-                        console_text.insert(tk.END, "✅ Lectura SCP completada\n")
-                        console_text.see(tk.END)
-                    except tk.TclError:
-                        pass
-                    # Continuar con detección de formato y conversión si no fue cancelado
-                    if not cancel_requested['value']:
-                        threading.Thread(target=step1_5_detect_format, daemon=True).start()
-                else:
-                    try:
-                        console_text.insert(tk.END, f"❌ Error en lectura SCP (código: {return_code})\n")
-                        console_text.see(tk.END)
-                    except tk.TclError:
-                        pass
-                    try:
-                        progress_bar.stop()
-                    except tk.TclError:
-                        pass
-                    on_complete(return_code)
+                return process.wait()
                     
             except Exception as e:
                 try:
-                    console_text.insert(tk.END, f"❌ Error ejecutando GreaseWeazle: {e}\n")
-                    console_text.see(tk.END)
+                    self._console_append(console_text, f"❌ Error ejecutando GreaseWeazle: {e}\n")
                 except tk.TclError:
                     # Widget ya fue destruido, no hacer nada
                     pass
-                
-                try:
-                    progress_bar.stop()
-                except tk.TclError:
-                    pass
-                    
-                on_complete(1)
+                return 1
         
         def step1_5_detect_format():
-            """Paso 1.5: Convertir y detectar formato HP-150 automáticamente"""
-            if cancel_requested['value']:
-                return
+            """Paso 1.5: Convertir y detectar formato HP-150 automáticamente
             
-            current_step.config(text="🔄 Convirtiendo y detectando formato...")
-            console_text.insert(tk.END, f"\nPaso 1.5: Convirtiendo SCP a IMG con ibm.scan...\n")
-            console_text.see(tk.END)
+            Devuelve (formato, descripción) o None si se canceló o falló.
+            """
+            if cancel_event.is_set():
+                return None
+            
+            set_step("🔄 Convirtiendo y detectando formato...")
+            self._console_append(console_text, f"\nPaso 1.5: Convirtiendo SCP a IMG con ibm.scan...\n")
             
             # Usar directamente ibm.scan que sabemos que funciona
-            gw_path = self.config_manager.get_greasewazle_path()
             cmd = [
                 gw_path, "convert", 
                 "--format=ibm.scan",
@@ -2077,133 +2326,94 @@ class HP150ImageManagerExtended(HP150ImageManager):
                 img_file
             ]
             
-            console_text.insert(tk.END, f"Comando: {' '.join(cmd)}\n")
-            console_text.see(tk.END)
+            self._echo_command(console_text, cmd)
             
             try:
-                # Usar Popen para poder cancelar el proceso
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    encoding='utf-8',
-                    errors='replace'
-                )
-                
-                # Guardar proceso para cancelación
-                current_process['process'] = process
-                
-                # Esperar a que termine o se cancele
-                while process.poll() is None:
-                    if cancel_requested['value']:
-                        try:
-                            process.terminate()
-                            console_text.insert(tk.END, "\n❌ Conversión cancelada\n")
-                            console_text.see(tk.END)
-                        except:
-                            pass
-                        return
-                    # Pequeña pausa para no consumir mucha CPU
-                    import time
-                    time.sleep(0.1)
-                
-                # Verificar si fue cancelado
-                if cancel_requested['value']:
-                    return
-                
-                # Leer salida
-                stdout, stderr = process.communicate()
-                
-                console_text.insert(tk.END, stdout)
-                if stderr:
-                    console_text.insert(tk.END, f"STDERR: {stderr}")
-                console_text.see(tk.END)
+                # La salida se muestra en la consola a medida que llega
+                returncode = self._run_gw_subprocess(cmd, lambda text: self._console_append(console_text, text), cancel_event)
+                if returncode is None:
+                    self._console_append(console_text, "\n❌ Conversión cancelada\n")
+                    return None
                 
                 # Verificar si la conversión fue exitosa
-                if process.returncode == 0 and os.path.exists(img_file):
+                img_st = _stat_or_none(img_file) if returncode == 0 else None
+                if img_st is not None:
                     # Analizar el tamaño del archivo para detectar formato
-                    img_size = os.path.getsize(img_file)
-                    
-                    # Definiciones de formatos HP-150 por tamaño
-                    format_by_size = {
-                        270336: ('hp150', 'Estándar (77 cyl, 7 sec/track)'),
-                        348160: ('hp150ext', 'Extendido (85 cyl, 8 sec/track)'),
-                        368640: ('hp150hd', 'Alta densidad (80 cyl, 9 sec/track)'),
-                        394240: ('hp150dd', 'Doble densidad (77 cyl, 10 sec/track)')
-                    }
+                    img_size = img_st.st_size
                     
                     detected_format = 'hp150'  # Por defecto
                     format_description = 'Estándar (77 cyl, 7 sec/track)'
                     
+                    # Si el tamaño no coincide con ningún formato, consultar el BPB
+                    bpb_size = None if img_size in _FORMAT_BY_SIZE else _format_size_from_bpb(img_file)
+                    
                     # Buscar coincidencia exacta
-                    if img_size in format_by_size:
-                        detected_format, format_description = format_by_size[img_size]
-                        console_text.insert(tk.END, f"\n🎯 Formato detectado: {detected_format}\n")
-                        console_text.insert(tk.END, f"   Descripción: {format_description}\n")
-                        console_text.insert(tk.END, f"   Tamaño: {img_size:,} bytes (coincidencia exacta)\n")
+                    if img_size in _FORMAT_BY_SIZE:
+                        detected_format, format_description = _FORMAT_BY_SIZE[img_size]
+                        self._console_append(console_text, f"\n🎯 Formato detectado: {detected_format}\n")
+                        self._console_append(console_text, f"   Descripción: {format_description}\n")
+                        self._console_append(console_text, f"   Tamaño: {img_size:,} bytes (coincidencia exacta)\n")
+                    elif bpb_size is not None:
+                        # Tamaño inesperado (p. ej. lectura parcial): el BPB identifica el formato
+                        detected_format, format_description = _FORMAT_BY_SIZE[bpb_size]
+                        self._console_append(console_text, f"\n🎯 Formato detectado: {detected_format} (por BPB)\n")
+                        self._console_append(console_text, f"   Descripción: {format_description}\n")
+                        self._console_append(console_text, f"   Tamaño real: {img_size:,} bytes\n")
+                        self._console_append(console_text, f"   Tamaño esperado: {bpb_size:,} bytes\n")
                     else:
                         # Buscar el más cercano
-                        closest_size = min(format_by_size.keys(), key=lambda x: abs(x - img_size))
-                        detected_format, format_description = format_by_size[closest_size]
+                        closest_size = _closest_format_size(img_size)
+                        detected_format, format_description = _FORMAT_BY_SIZE[closest_size]
                         
-                        console_text.insert(tk.END, f"\n🎯 Formato detectado: {detected_format} (aproximado)\n")
-                        console_text.insert(tk.END, f"   Descripción: {format_description}\n")
-                        console_text.insert(tk.END, f"   Tamaño real: {img_size:,} bytes\n")
-                        console_text.insert(tk.END, f"   Tamaño esperado: {closest_size:,} bytes\n")
-                        console_text.insert(tk.END, f"   Diferencia: {abs(img_size - closest_size):,} bytes\n")
+                        self._console_append(console_text, f"\n🎯 Formato detectado: {detected_format} (aproximado)\n")
+                        self._console_append(console_text, f"   Descripción: {format_description}\n")
+                        self._console_append(console_text, f"   Tamaño real: {img_size:,} bytes\n")
+                        self._console_append(console_text, f"   Tamaño esperado: {closest_size:,} bytes\n")
+                        self._console_append(console_text, f"   Diferencia: {abs(img_size - closest_size):,} bytes\n")
                     
-                    console_text.see(tk.END)
                     
                     # La conversión ya está hecha, continuar al paso final
-                    if not cancel_requested['value']:
-                        threading.Thread(target=lambda: step2_finalize_conversion(detected_format, format_description), daemon=True).start()
+                    return detected_format, format_description
                 
-                else:
-                    console_text.insert(tk.END, f"❌ Error en conversión (código: {process.returncode})\n")
-                    progress_bar.stop()
-                    on_complete(process.returncode)
+                self._console_append(console_text, f"❌ Error en conversión (código: {returncode})\n")
+                stop_progress()
+                complete(returncode)
+                return None
                 
             except Exception as e:
                 try:
-                    console_text.insert(tk.END, f"❌ Error en conversión: {e}\n")
-                    console_text.see(tk.END)
+                    self._console_append(console_text, f"❌ Error en conversión: {e}\n")
                 except tk.TclError:
                     pass
                 
-                try:
-                    progress_bar.stop()
-                except tk.TclError:
-                    pass
+                stop_progress()
                     
-                on_complete(1)
+                complete(1)
+                return None
         
         def step2_finalize_conversion(detected_format, format_description):
             """Paso 2: Finalizar conversión exitosa"""
-            if cancel_requested['value']:
+            if cancel_event.is_set():
                 return
             
-            current_step.config(text="✅ Finalización exitosa!")
-            console_text.insert(tk.END, f"\n✅ Conversión finalizada exitosamente\n")
-            console_text.insert(tk.END, f"   Formato HP-150: {detected_format}\n")
-            console_text.insert(tk.END, f"   Descripción: {format_description}\n")
-            console_text.see(tk.END)
+            set_step("✅ Finalización exitosa!")
+            self._console_append(console_text, f"\n✅ Conversión finalizada exitosamente\n")
+            self._console_append(console_text, f"   Formato HP-150: {detected_format}\n")
+            self._console_append(console_text, f"   Descripción: {format_description}\n")
             
             # Completar proceso exitosamente
-            progress_bar.stop()
-            on_complete(0)
+            stop_progress()
+            complete(0)
         
         def step2_convert_to_img(hp150_format='hp150'):
             """Paso 2: Convertir SCP a IMG"""
-            if cancel_requested['value']:
+            if cancel_event.is_set():
                 return
                 
-            current_step.config(text="🔄 Paso 2: Convirtiendo a formato HP-150...")
-            console_text.insert(tk.END, f"\nPaso 2: Convirtiendo SCP a IMG...\n")
-            console_text.see(tk.END)
+            set_step("🔄 Paso 2: Convirtiendo a formato HP-150...")
+            self._console_append(console_text, f"\nPaso 2: Convirtiendo SCP a IMG...\n")
             
             # Usar GreaseWeazle con el formato detectado
-            gw_path = self.config_manager.get_greasewazle_path()
             cmd = [
                 gw_path, "convert", 
                 f"--diskdef=hp150.diskdef:{hp150_format}",
@@ -2212,86 +2422,76 @@ class HP150ImageManagerExtended(HP150ImageManager):
                 img_file
             ]
             
-            console_text.insert(tk.END, f"Comando: {' '.join(cmd)}\n")
-            console_text.see(tk.END)
+            self._echo_command(console_text, cmd)
             
             try:
-                # Usar Popen para poder cancelar el proceso
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    encoding='utf-8',
-                    errors='replace'
-                )
-                
-                # Guardar proceso para cancelación
-                current_process['process'] = process
-                
-                # Esperar a que termine o se cancele
-                while process.poll() is None:
-                    if cancel_requested['value']:
-                        try:
-                            process.terminate()
-                            console_text.insert(tk.END, "\n❌ Conversión cancelada\n")
-                            console_text.see(tk.END)
-                        except:
-                            pass
-                        return
-                    # Pequeña pausa para no consumir mucha CPU
-                    import time
-                    time.sleep(0.1)
-                
-                # Verificar si fue cancelado
-                if cancel_requested['value']:
+                # La salida se muestra en la consola a medida que llega
+                # Detectar el mensaje de éxito mientras la salida pasa a la consola
+                completed_marker = {'seen': False}
+                
+                def show_output(text):
+                    if "✅ Conversión completada:" in text:
+                        completed_marker['seen'] = True
+                    self._console_append(console_text, text)
+                
+                returncode = self._run_gw_subprocess(cmd, show_output, cancel_event)
+                if returncode is None:
+                    self._console_append(console_text, "\n❌ Conversión cancelada\n")
                     return
                 
-                # Leer salida
-                stdout, stderr = process.communicate()
-                
-                console_text.insert(tk.END, stdout)
-                if stderr:
-                    console_text.insert(tk.END, f"STDERR: {stderr}")
-                console_text.see(tk.END)
-                
                 # Verificar si la conversión fue exitosa basándose en la salida, no solo en el código
                 conversion_successful = False
                 
-                if process.returncode == 0:
+                if returncode == 0:
                     conversion_successful = True
-                elif "✅ Conversión completada:" in stdout:
+                elif completed_marker['seen']:
                     # A veces el proceso devuelve código != 0 pero la conversión fue exitosa
                     conversion_successful = True
-                    console_text.insert(tk.END, "⚠️ Warning: Código de salida no-cero pero conversión exitosa\n")
+                    self._console_append(console_text, "⚠️ Warning: Código de salida no-cero pero conversión exitosa\n")
                 
                 if conversion_successful:
-                    console_text.insert(tk.END, "✅ Conversión HP-150 completada\n")
-                    current_step.config(text="✅ Proceso completado exitosamente!")
-                    progress_bar.stop()
-                    on_complete(0)  # Forzar éxito si la conversión fue exitosa
+                    self._console_append(console_text, "✅ Conversión HP-150 completada\n")
+                    set_step("✅ Proceso completado exitosamente!")
+                    stop_progress()
+                    complete(0)  # Forzar éxito si la conversión fue exitosa
                 else:
-                    console_text.insert(tk.END, f"❌ Error en conversión (código: {process.returncode})\n")
-                    progress_bar.stop()
-                    on_complete(process.returncode)
+                    self._console_append(console_text, f"❌ Error en conversión (código: {returncode})\n")
+                    stop_progress()
+                    complete(returncode)
                 
             except Exception as e:
                 try:
-                    console_text.insert(tk.END, f"❌ Error en conversión: {e}\n")
-                    console_text.see(tk.END)
+                    self._console_append(console_text, f"❌ Error en conversión: {e}\n")
                 except tk.TclError:
                     # Widget ya fue destruido, no hacer nada
                     pass
                 
-                try:
-                    progress_bar.stop()
-                except tk.TclError:
-                    pass
+                stop_progress()
                     
-                on_complete(1)
+                complete(1)
+        
+        def read_pipeline():
+            """Secuencia completa en un único hilo: lectura SCP → detección/conversión → final"""
+            return_code = step1_read_scp()
+            if return_code is None or cancel_event.is_set():
+                return
+            
+            if return_code != 0:
+                self._console_append(console_text, f"❌ Error en lectura SCP (código: {return_code})\n")
+                stop_progress()
+                complete(return_code)
+                return
+            
+            self._console_append(console_text, "✅ Lectura SCP completada\n")
+            
+            detected = step1_5_detect_format()
+            if detected is None or cancel_event.is_set():
+                return
+            
+            step2_finalize_conversion(*detected)
         
-        # Iniciar proceso en hilo separado
-        threading.Thread(target=step1_read_scp, daemon=True).start()
+        # Iniciar la secuencia en un hilo del pool
+        self._submit_io(read_pipeline)
     
     def load_image_file(self, filename):
         """Cargar archivo de imagen (usado internamente después de leer floppy)"""
@@ -2310,11 +2510,6 @@ class HP150ImageManagerExtended(HP150ImageManager):
     
     def save_floppy_project(self, scp_file, img_file):
         """Guardar proyecto de floppy (archivos SCP e IMG) permanentemente"""
-        from tkinter import filedialog
-        from datetime import datetime
-        import shutil
-        import re
-        
         # Solicitar directorio y nombre del proyecto
         output_dir = filedialog.askdirectory(
             title="Seleccionar carpeta para guardar el proyecto",
@@ -2335,7 +2530,7 @@ class HP150ImageManagerExtended(HP150ImageManager):
             return
             
         # Validar nombre del proyecto (quitar caracteres especiales)
-        project_name = re.sub(r'[^\w\-_]', '_', project_name)
+        project_name = _PROJECT_NAME_RE.sub('_', project_name)
         
         # Crear carpeta del proyecto
         project_folder = os.path.join(output_dir, project_name)
@@ -2350,35 +2545,31 @@ class HP150ImageManagerExtended(HP150ImageManager):
             else:
                 os.makedirs(project_folder, exist_ok=True)
             
-            # Copiar archivos
+            # Copiar archivos y crear el README en paralelo (destinos distintos)
             final_scp_file = os.path.join(project_folder, f"{project_name}.scp")
             final_img_file = os.path.join(project_folder, f"{project_name}.img")
+            readme_file = os.path.join(project_folder, "README.txt")
+            
+            futures = [
+                self._submit_io(shutil.copyfile, scp_file, final_scp_file),
+                self._submit_io(shutil.copyfile, img_file, final_img_file),
+                self._submit_io(self._write_project_readme, readme_file, project_name)
+            ]
+            for future in futures:
+                future.result()
             
-            shutil.copy2(scp_file, final_scp_file)
-            shutil.copy2(img_file, final_img_file)
+            # Conservar fechas y permisos de los originales (lo que añadía copy2)
+            shutil.copystat(scp_file, final_scp_file)
+            shutil.copystat(img_file, final_img_file)
+            
+            # Obtener tamaños (el stat de la imagen sirve también para recordar su origen)
+            scp_size = os.stat(final_scp_file).st_size
+            img_st = os.stat(final_img_file)
+            img_size = img_st.st_size
             
             # Actualizar la imagen actual para apuntar al archivo permanente
             self.current_image = final_img_file
-            
-            # Crear archivo README con información
-            readme_file = os.path.join(project_folder, "README.txt")
-            with open(readme_file, 'w', encoding='utf-8') as f:
-                f.write(f"Proyecto de Floppy HP-150\n")
-                f.write(f"========================\n\n")
-                f.write(f"Creado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Proyecto: {project_name}\n\n")
-                f.write(f"Archivos:\n")
-                f.write(f"• {project_name}.scp - Flujo magnético raw de GreaseWeazle\n")
-                f.write(f"  (Para análisis avanzado o re-conversión)\n\n")
-                f.write(f"• {project_name}.img - Imagen HP-150 convertida\n")
-                f.write(f"  (Para uso normal en la GUI o escritura a floppy)\n\n")
-                f.write(f"Para cargar en la GUI:\n")
-                f.write(f"  python3 run_gui.py --extended\n")
-                f.write(f"  Archivo → Abrir → {project_name}.img\n")
-            
-            # Obtener tamaños
-            scp_size = os.path.getsize(final_scp_file)
-            img_size = os.path.getsize(final_img_file)
+            self._remember_scp_source(final_scp_file, final_img_file, img_st)
             
             success_message = (
                 f"Proyecto guardado exitosamente:\n\n"
@@ -2403,11 +2594,29 @@ class HP150ImageManagerExtended(HP150ImageManager):
         except Exception as e:
             messagebox.showerror("Error", f"Error guardando proyecto: {e}")
     
+    def _write_project_readme(self, readme_file, project_name):
+        """Crear el README.txt de un proyecto de floppy"""
+        content = (
+            f"Proyecto de Floppy HP-150\n"
+            f"========================\n\n"
+            f"Creado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"Proyecto: {project_name}\n\n"
+            f"Archivos:\n"
+            f"• {project_name}.scp - Flujo magnético raw de GreaseWeazle\n"
+            f"  (Para análisis avanzado o re-conversión)\n\n"
+            f"• {project_name}.img - Imagen HP-150 convertida\n"
+            f"  (Para uso normal en la GUI o escritura a floppy)\n\n"
+            f"Para cargar en la GUI:\n"
+            f"  python3 run_gui.py --extended\n"
+            f"  Archivo → Abrir → {project_name}.img\n"
+        )
+        
+        # Una sola escritura (una codificación y un write)
+        with open(readme_file, 'w', encoding='utf-8') as f:
+            f.write(content)
+    
     def save_img_only(self, img_file):
         """Guardar solo la imagen HP-150 (sin archivo SCP)"""
-        from tkinter import filedialog
-        import shutil
-        
         # Solicitar dónde guardar la imagen
         output_file = filedialog.asksaveasfilename(
             title="Guardar imagen HP-150",
@@ -2424,8 +2633,9 @@ class HP150ImageManagerExtended(HP150ImageManager):
             return
         
         try:
-            # Copiar archivo
-            shutil.copy2(img_file, output_file)
+            # Copiar archivo (contenido con copia del kernel, luego fechas y permisos)
+            shutil.copyfile(img_file, output_file)
+            shutil.copystat(img_file, output_file)
             
             # Actualizar la imagen actual para apuntar al archivo permanente
             self.current_image = output_file
@@ -2445,56 +2655,195 @@ class HP150ImageManagerExtended(HP150ImageManager):
         except Exception as e:
             messagebox.showerror("Error", f"Error guardando imagen: {e}")
     
+    def _write_with_gw_package(self, drive, verify, image_size, console_text, current_step, on_write_complete, cancel_requested, current_process):
+        """Escribir la imagen con el paquete greaseweazle en un proceso hijo
+        
+        El proceso se puede terminar al cancelar sin dejar el drive a medias
+        dentro de la GUI, y su salida llega por el pipe como con gw.
+        """
+        # Mismo formato y pistas que elegiría write_hp150_floppy.sh; un tamaño
+        # desconocido es un error, no se adivina el formato
+        if image_size not in _WRITE_FORMATS:
+            self._console_append(
+                console_text,
+                f"❌ Tamaño de imagen no reconocido: {image_size:,} bytes\n"
+                f"   Tamaños válidos: {', '.join(f'{size:,}' for size in _WRITE_FORMATS)}\n"
+            )
+            self._flush_console(console_text)
+            on_write_complete(1)
+            return
+        fmt, tracks = _WRITE_FORMATS[image_size]
+        
+        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        cmd = [
+            sys.executable, '-c', _GW_WRITE_MAIN, 'write',
+            f'--drive={drive}',
+            '--diskdefs', os.path.join(base_dir, 'hp150.diskdef'),
+            f'--format={fmt}',
+            f'--tracks={tracks}:step=1',
+        ]
+        if not verify:
+            cmd.append('--no-verify')  # gw write verifica por defecto
+        cmd.append(self.current_image)
+        
+        current_step.config(text="💾 Escribiendo imagen al disco...")
+        self._echo_command(console_text, cmd)
+        
+        def set_step(text):
+            def apply():
+                try:
+                    current_step.config(text=text)
+                except tk.TclError:
+                    pass  # Ventana de progreso ya cerrada
+            self.root.after(0, apply)
+        
+        def write_worker():
+            try:
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    stdin=subprocess.DEVNULL,
+                    close_fds=True,
+                    bufsize=0
+                )
+            except OSError as e:
+                self._console_append(console_text, f"❌ Error: {e}\n")
+                return_code = 1
+            else:
+                current_process['process'] = process
+                self._child_processes.add(process)
+                
+                # La cancelación se atiende aunque gw no escriba nada
+                for output in iter_pipe_text(process.stdout.fileno(),
+                                              should_stop=lambda: cancel_requested['value']):
+                    self._console_append(console_text, output)
+                    label = match_write_step(output)
+                    if label:
+                        set_step(label)
+                
+                if cancel_requested['value']:
+                    try:
+                        process.terminate()
+                    except OSError:
+                        pass
+                    return
+                
+                return_code = process.wait()
+            
+            if return_code == 0:
+                self._console_append(console_text, "✅ Escritura completada exitosamente\n")
+            else:
+                self._console_append(console_text, f"❌ Error en escritura (código: {return_code})\n")
+            
+            def finish():
+                self._flush_console(console_text)
+                if return_code == 0:
+                    current_step.config(text="✅ Escritura completada!")
+                on_write_complete(return_code)
+            
+            # Volver al hilo principal para los diálogos
+            self.root.after(0, finish)
+        
+        # Hilo propio: la escritura USB es bloqueante
+        self._submit_io(write_worker)
+    
+    def _remember_scp_source(self, scp_file, img_file, img_st=None):
+        """Recordar que img_file se generó desde scp_file (para reutilizar el SCP al escribir)
+        
+        img_st permite reutilizar un os.stat de la imagen ya hecho por el llamador.
+        """
+        try:
+            if img_st is None:
+                img_st = os.stat(img_file)
+            self._scp_source = (scp_file, img_file, img_st.st_mtime_ns)
+        except OSError:
+            self._scp_source = None
+    
+    def _reusable_scp(self):
+        """SCP del que proviene la imagen actual, si la IMG no se ha modificado desde entonces"""
+        if not self._scp_source:
+            return None
+        scp_file, img_file, mtime_ns = self._scp_source
+        if img_file != self.current_image or not os.path.exists(scp_file):
+            return None
+        try:
+            if os.stat(img_file).st_mtime_ns != mtime_ns:
+                return None  # La imagen cambió: hay que volver a convertir
+        except OSError:
+            return None
+        return scp_file
+    
     def write_directly_with_greasewazle(self, drive, verify, console_text, current_step, progress_bar, on_write_complete, cancel_requested, current_process):
         """Escribir directamente con GreaseWeazle sin usar script"""
-        import subprocess
-        import threading
-        import tempfile
+        def finish(return_code):
+            # Volcar la consola y notificar en el hilo principal
+            def complete():
+                self._flush_console(console_text)
+                on_write_complete(return_code)
+            self.root.after(0, complete)
+        
+        def set_step(text):
+            # El hilo de escritura no toca widgets: la etiqueta se cambia en Tk
+            def apply():
+                try:
+                    current_step.config(text=text)
+                except tk.TclError:
+                    pass  # Ventana de progreso ya cerrada
+            self.root.after(0, apply)
         
         def write_process():
+            owned_scp = None  # SCP temporal creado aquí: se borra al salir por cualquier camino
             try:
-                # Paso 1: Convertir IMG a SCP
-                current_step.config(text="🔄 Paso 1: Convirtiendo IMG a SCP...")
-                console_text.insert(tk.END, "Paso 1: Convirtiendo IMG a formato SCP\n")
-                console_text.see(tk.END)
-                
-                # Crear archivo SCP temporal
-                temp_scp = tempfile.mktemp(suffix='.scp', dir=self.temp_dir)
-                
+                # Paso 1: Convertir IMG a SCP (si hace falta)
                 gw_path = self.config_manager.get_greasewazle_path()
-                convert_cmd = [
-                    gw_path, "convert",
-                    "--format=ibm.scan", 
-                    self.current_image,
-                    temp_scp
-                ]
-                
-                console_text.insert(tk.END, f"Comando: {' '.join(convert_cmd)}\n")
-                console_text.see(tk.END)
-                
-                # Ejecutar conversión
-                convert_process = subprocess.run(
-                    convert_cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=60
-                )
                 
-                if convert_process.returncode != 0:
-                    console_text.insert(tk.END, f"❌ Error en conversión: {convert_process.stderr}\n")
-                    on_write_complete(convert_process.returncode)
-                    return
+                # Si la imagen proviene de un SCP y no se ha modificado, escribir ese SCP directamente
+                reused_scp = self._reusable_scp()
                 
-                console_text.insert(tk.END, "✅ Conversión a SCP completada\n")
-                console_text.see(tk.END)
+                if reused_scp:
+                    temp_scp = reused_scp
+                    self._console_append(console_text, f"Paso 1: Reutilizando SCP existente: {os.path.basename(reused_scp)}\n")
+                else:
+                    set_step("🔄 Paso 1: Convirtiendo IMG a SCP...")
+                    self._console_append(console_text, "Paso 1: Convirtiendo IMG a formato SCP\n")
+                    
+                    # Crear archivo SCP temporal (nombre reservado sin carreras)
+                    with tempfile.NamedTemporaryFile(delete=False, suffix='.scp', dir=self.temp_dir) as tf:
+                        temp_scp = owned_scp = tf.name
+                    
+                    convert_cmd = [
+                        gw_path, "convert",
+                        "--format=ibm.scan", 
+                        self.current_image,
+                        temp_scp
+                    ]
+                    
+                    self._echo_command(console_text, convert_cmd)
+                    
+                    # Ejecutar conversión
+                    convert_process = subprocess.run(
+                        convert_cmd,
+                        capture_output=True,
+                        stdin=subprocess.DEVNULL,
+                        close_fds=True,
+                        text=True,
+                        timeout=60
+                    )
+                    
+                    if convert_process.returncode != 0:
+                        self._console_append(console_text, f"❌ Error en conversión: {convert_process.stderr}\n")
+                        finish(convert_process.returncode)
+                        return
+                    
+                    self._console_append(console_text, "✅ Conversión a SCP completada\n")
                 
                 if cancel_requested['value']:
                     return
                 
                 # Paso 2: Escribir SCP al floppy
-                current_step.config(text="💾 Paso 2: Escribiendo al floppy...")
-                console_text.insert(tk.END, f"\nPaso 2: Escribiendo SCP al drive {drive}\n")
-                console_text.see(tk.END)
+                set_step("💾 Paso 2: Escribiendo al floppy...")
+                self._console_append(console_text, f"\nPaso 2: Escribiendo SCP al drive {drive}\n")
                 
                 write_cmd = [
                     gw_path, "write",
@@ -2506,77 +2855,66 @@ class HP150ImageManagerExtended(HP150ImageManager):
                 if verify:
                     write_cmd.append("--verify")
                 
-                console_text.insert(tk.END, f"Comando: {' '.join(write_cmd)}\n")
-                console_text.see(tk.END)
+                self._echo_command(console_text, write_cmd)
                 
-                # Ejecutar escritura
+                # Ejecutar escritura (binario sin buffer: se lee por bloques con os.read)
                 write_process = subprocess.Popen(
                     write_cmd,
                     stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    universal_newlines=True
+                    stderr=subprocess.STDOUT,
+                    stdin=subprocess.DEVNULL,
+                    close_fds=True,
+                    bufsize=0
                 )
                 
                 current_process['process'] = write_process
                 
+                self._child_processes.add(write_process)
+                
                 # Leer salida en tiempo real
-                while True:
-                    if cancel_requested['value']:
-                        try:
-                            write_process.terminate()
-                        except:
-                            pass
-                        return
+                # Esperar con selectors: la cancelación se atiende aunque gw no escriba nada
+                for output in iter_pipe_text(write_process.stdout.fileno(),
+                                              should_stop=lambda: cancel_requested['value']):
+                    self._console_append(console_text, output)
                     
-                    output = write_process.stdout.readline()
-                    if output:
-                        console_text.insert(tk.END, output)
-                        console_text.see(tk.END)
-                        
-                        # Actualizar progreso
-                        if "Writing cylinder" in output or "Writing track" in output:
-                            current_step.config(text="💾 Escribiendo pistas al disco...")
-                    
-                    # Verificar si el proceso terminó
-                    if write_process.poll() is not None:
-                        # Leer salida restante
-                        remaining_output = write_process.stdout.read()
-                        if remaining_output:
-                            console_text.insert(tk.END, remaining_output)
-                        
-                        remaining_error = write_process.stderr.read()
-                        if remaining_error:
-                            console_text.insert(tk.END, f"STDERR: {remaining_error}")
-                        
-                        console_text.see(tk.END)
-                        break
+                    # Actualizar progreso
+                    if "Writing cylinder" in output or "Writing track" in output:
+                        set_step("💾 Escribiendo pistas al disco...")
                 
-                # Limpiar archivo temporal
-                try:
-                    if os.path.exists(temp_scp):
-                        os.remove(temp_scp)
-                except:
-                    pass
+                if cancel_requested['value']:
+                    try:
+                        write_process.terminate()
+                    except:
+                        pass
+                    return
+                
+                write_process.wait()
                 
                 # Verificar resultado
                 if write_process.returncode == 0:
-                    console_text.insert(tk.END, "✅ Escritura completada exitosamente\n")
-                    current_step.config(text="✅ Escritura completada!")
+                    self._console_append(console_text, "✅ Escritura completada exitosamente\n")
+                    set_step("✅ Escritura completada!")
                 else:
-                    console_text.insert(tk.END, f"❌ Error en escritura (código: {write_process.returncode})\n")
+                    self._console_append(console_text, f"❌ Error en escritura (código: {write_process.returncode})\n")
                 
-                on_write_complete(write_process.returncode)
+                finish(write_process.returncode)
                 
             except subprocess.TimeoutExpired:
-                console_text.insert(tk.END, "❌ Timeout en operación\n")
-                on_write_complete(1)
+                self._console_append(console_text, "❌ Timeout en operación\n")
+                finish(1)
             except Exception as e:
-                console_text.insert(tk.END, f"❌ Error: {e}\n")
-                on_write_complete(1)
+                self._console_append(console_text, f"❌ Error: {e}\n")
+                finish(1)
+            finally:
+                # Limpiar archivo temporal también al cancelar (nunca el SCP reutilizado)
+                if owned_scp:
+                    try:
+                        os.unlink(owned_scp)
+                    except OSError:
+                        pass
         
         # Ejecutar en hilo separado
-        threading.Thread(target=write_process, daemon=True).start()
+        self._submit_io(write_process)
     
     def show_greasewazle_config(self):
         """Mostrar diálogo de configuración de GreaseWeazle"""
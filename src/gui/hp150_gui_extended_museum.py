@@ -7,11 +7,24 @@ Implementaciones completas para manipulación de archivos
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog, scrolledtext
 import os
+import re
 import sys
+import json
+import selectors
+import signal
+import logging
+import mmap
 import struct
+import subprocess
 import threading
+import queue
 import tempfile
+import weakref
 import shutil
+import functools
+import contextlib
+from collections import deque
+from datetime import datetime
 from pathlib import Path
 
 # Importar HP150FAT
@@ -21,16 +34,123 @@ from src.tools.hp150_fat import HP150FAT
 # Importar el módulo base
 from src.gui.hp150_gui import HP150ImageManager
 from src.gui.app_icon import APP_ICON, SPLASH_ART, get_dialog_title, get_app_banner
+from src.gui.gui_utils import (
+    append_to_console, format_command, hex_dump, match_step, match_write_step,
+    pump_text, sanitize_filename, text_decoder,
+)
+
+logger = logging.getLogger(__name__)
+
+# Raíz del proyecto (scripts/ y src/converters/), resuelta una vez al importar
+# en lugar de depender del directorio actual en cada operación
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_SCP_CONVERTER = os.path.join(_PROJECT_DIR, "src", "converters", "scp_to_hp150_scan.py")
+
+# Botones de la GUI base cuyas funciones no están implementadas
+_UNIMPLEMENTED_BUTTONS = frozenset({
+    "Verificar Integridad",
+    "Reparar Imagen",
+    "Crear Backup",
+    "Restaurar Backup",
+    "Información Detallada"
+})
+
+# Bytes considerados texto (ASCII imprimible más tab, LF y CR)
+_TEXT_BYTES = bytes(range(32, 127)) + b'\t\n\r'
+
+@functools.lru_cache(maxsize=1)
+def _icon_paths():
+    """Rutas (icns, ico, png) del icono de la ventana, None si no existen
+
+    Los archivos se buscan una sola vez por proceso.
+    """
+    icon_dir = os.path.dirname(__file__)
+    return tuple(
+        path if os.path.exists(path) else None
+        for path in (
+            os.path.join(icon_dir, "hp150_icon.icns"),  # macOS ICNS
+            os.path.join(icon_dir, "hp150_icon.ico"),   # Windows ICO
+            os.path.join(icon_dir, "hp150_icon.png"),   # PNG fallback
+        )
+    )
+
+def _stop_process(process, grace=2.0):
+    """Terminar un proceso lanzado con start_new_session sin bloquear la GUI
+
+    En POSIX se señala al grupo entero: los scripts de escritura lanzan gw como
+    hijo, y terminar solo el shell dejaría a gw con los pipes abiertos y a los
+    hilos lectores esperando. Si en grace segundos no terminó, se fuerza.
+    """
+    if process.poll() is not None:
+        return
+    if os.name == 'posix':
+        def send(sig):
+            try:
+                os.killpg(process.pid, sig)
+            except OSError:
+                pass  # El grupo ya no existe
+        send(signal.SIGTERM)
+        force = lambda: send(signal.SIGKILL)
+    else:
+        try:
+            process.terminate()
+        except OSError:
+            return
+        force = lambda: process.poll() is None and process.kill()
+    timer = threading.Timer(grace, force)
+    timer.daemon = True
+    timer.start()
+
+def _file_size(path):
+    """Tamaño de path en bytes, 0 si no existe (un solo stat)"""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+# Tabla de str.translate que elimina los caracteres no válidos en nombres 8.3
+_INVALID_83_CHARS = str.maketrans('', '', '<>:"/\\|?*')
+
+# Condiciones que necesita cada botón de acción para estar habilitado
+_MASK_HAS_IMAGE = 0x1
+_MASK_HAS_SEL = 0x2
+_MASK_NEVER = 0x4  # Nunca se cumple: botón no implementado
 
 class HP150ImageManagerExtendedMuseum(HP150ImageManager):
     """Versión extendida del administrador con funcionalidades completas"""
     
+    # (botón, máscara requerida); vacío mientras la GUI base se construye
+    _state_buttons = ()
+    # after() pendiente de on_file_select (ver on_file_select)
+    _button_update_after = None
+    # Un hilo está escribiendo en el FAT (ver _fat_is_busy)
+    _fat_busy = False
+    
     def __init__(self, root):
+        # El modo oscuro se consulta una sola vez (la base lo usa en setup_styles)
+        self._dark_mode_cache = None
+        # get_disk_info/get_file del FAT actual; refresh_file_list lo vacía
+        self._fat_cache = {}
+        
         super().__init__(root)
         
         # Variables adicionales para funcionalidades extendidas
-        self.temp_dir = tempfile.mkdtemp(prefix="hp150_gui_")
-        self.file_editors = {}  # Ventanas de edición abiertas
+        self._temp_dir = None  # Se crea al primer uso (ver temp_dir)
+        self.batch_mode = False  # Sin confirmaciones no destructivas ni avisos (ver _confirm)
+        self._default_initialdir = os.path.expanduser("~/Desktop")  # Carpeta inicial de los diálogos
+        # Ventanas de edición abiertas; las que se destruyen desaparecen solas
+        self.file_editors = weakref.WeakValueDictionary()
+        self._console_buffers = {}  # Texto pendiente por consola (ver _console_append)
+        self._console_lock = threading.Lock()
+        self._state_buttons = [
+            (self.add_btn, _MASK_HAS_IMAGE),
+            (self.extract_btn, _MASK_HAS_IMAGE | _MASK_HAS_SEL),
+            (self.extract_all_btn, _MASK_HAS_IMAGE),
+            (self.edit_btn, _MASK_HAS_IMAGE | _MASK_HAS_SEL),
+            (self.delete_btn, _MASK_HAS_IMAGE | _MASK_HAS_SEL),
+            (self.info_btn, _MASK_NEVER),
+            (self.analyze_btn, _MASK_NEVER),
+        ]
         self.has_temp_files = False  # Indica si hay archivos temporales pendientes
         self.temp_scp_file = None  # Archivo SCP temporal
         self.temp_img_file = None  # Archivo IMG temporal
@@ -39,6 +159,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
         self.museum_catalog = {}  # Catálogo de elementos del museo
         self.museum_tree = None  # Árbol del catálogo
         self.museum_click_in_progress = False  # Evitar múltiples clicks simultáneos
+        self._widget_index = None  # Ver _get_widget_index
         
         # Configurar ventana más grande y responsiva
         self.setup_responsive_window()
@@ -55,23 +176,21 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
         # Actualizar título
         self.root.title(get_app_banner())
         
-        # Agregar botones adicionales después de que la GUI base esté construida
-        self.root.after(100, self.add_floppy_buttons)
-        
         # Agregar lógica de guardado correcta
         self.root.bind('<Command-s>', lambda e: self.save_action())
         
-        # Cargar catálogo del museo
-        self.root.after(150, self.load_museum_catalog)
-        
-        # Agregar panel del museo después de cargar el catálogo
-        self.root.after(250, self.add_museum_panel)
+        # Configurar GreaseWeazle ya mismo: el proceso corre mientras la GUI termina de construirse
+        self.reset_greaseweazle()
         
-        # Deshabilitar botones no implementados después de que la GUI esté construida
-        self.root.after(300, self.disable_unimplemented_buttons)
-        
-        # Configurar GreaseWeazle después de inicializar
-        self.root.after(350, self.reset_greaseweazle)
+        # Completar la GUI en cuanto el bucle de eventos quede libre
+        self.root.after_idle(self._deferred_init)
+    
+    def _deferred_init(self):
+        """Pasos de inicialización que necesitan la GUI base ya construida, en orden"""
+        self.add_floppy_buttons()
+        self.load_museum_catalog()
+        self.add_museum_panel()
+        self.disable_unimplemented_buttons()
     
     def setup_responsive_window(self):
         """Configurar ventana responsiva más grande"""
@@ -98,7 +217,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             # Tamaño mínimo
             self.root.minsize(1200, 800)
             
-            print(f"[DEBUG] Ventana configurada: {window_width}x{window_height} (pantalla: {screen_width}x{screen_height})")
+            logger.debug("Ventana configurada: %sx%s (pantalla: %sx%s)", window_width, window_height, screen_width, screen_height)
             
         except Exception as e:
             print(f"[WARNING] Error configurando ventana responsiva: {e}")
@@ -109,27 +228,18 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
     def setup_window_icon(self):
         """Configurar icono de la ventana"""
         try:
-            # Buscar archivos de icono en el directorio de la GUI
-            icon_dir = os.path.dirname(__file__)
-            
-            # Intentar diferentes formatos de icono
-            icon_files = [
-                os.path.join(icon_dir, "hp150_icon.ico"),  # Windows ICO
-                os.path.join(icon_dir, "hp150_icon.icns"), # macOS ICNS
-                os.path.join(icon_dir, "hp150_icon.png")   # PNG fallback
-            ]
+            # Archivos de icono en el directorio de la GUI (cacheado por proceso)
+            icns_path, ico_path, png_path = _icon_paths()
             
             icon_set = False
             
             # Para macOS, intentar usar ICNS primero
             if sys.platform == "darwin":
-                icns_path = os.path.join(icon_dir, "hp150_icon.icns")
-                if os.path.exists(icns_path):
+                if icns_path:
                     try:
                         # En macOS, tkinter no soporta ICNS directamente,
                         # pero podemos usar el PNG
-                        png_path = os.path.join(icon_dir, "hp150_icon.png")
-                        if os.path.exists(png_path):
+                        if png_path:
                             from tkinter import PhotoImage
                             icon_image = PhotoImage(file=png_path)
                             self.root.iconphoto(True, icon_image)
@@ -140,8 +250,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             
             # Intentar ICO para compatibilidad general
             if not icon_set:
-                ico_path = os.path.join(icon_dir, "hp150_icon.ico")
-                if os.path.exists(ico_path):
+                if ico_path:
                     try:
                         self.root.iconbitmap(ico_path)
                         icon_set = True
@@ -151,16 +260,18 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             
             # Si no se pudo establecer el icono, usar PNG como PhotoImage
             if not icon_set:
-                png_path = os.path.join(icon_dir, "hp150_icon.png")
-                if os.path.exists(png_path):
+                if png_path:
                     try:
                         from tkinter import PhotoImage
-                        # Redimensionar para uso como icono de ventana
-                        icon_image = PhotoImage(file=png_path)
-                        # Usar subsample para hacer más pequeño si es necesario
-                        if icon_image.width() > 32:
-                            factor = icon_image.width() // 32
-                            icon_image = icon_image.subsample(factor, factor)
+                        # Reusar la imagen ya decodificada para esta raíz
+                        icon_image = getattr(self.root, 'icon_image', None)
+                        if icon_image is None:
+                            # Redimensionar para uso como icono de ventana
+                            icon_image = PhotoImage(file=png_path)
+                            # Usar subsample para hacer más pequeño si es necesario
+                            if icon_image.width() > 32:
+                                factor = icon_image.width() // 32
+                                icon_image = icon_image.subsample(factor, factor)
                         
                         self.root.iconphoto(True, icon_image)
                         # Guardar referencia para evitar garbage collection
@@ -189,36 +300,22 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
     
     def add_floppy_buttons(self):
         """Agregar sección de Floppy a la columna derecha del panel de botones"""
-        print("[DEBUG] Ejecutando add_floppy_buttons()")
+        logger.debug("Ejecutando add_floppy_buttons()")
         
         # Buscar el panel de botones principal
-        def find_button_frame(widget, depth=0):
-            print(f"[DEBUG] Buscando en widget: {type(widget).__name__}, depth: {depth}")
-            if isinstance(widget, ttk.LabelFrame):
-                text = widget.cget('text')
-                print(f"[DEBUG] LabelFrame encontrado con texto: '{text}'")
-                if text == 'Acciones':
-                    print(f"[DEBUG] ¡Panel de Acciones encontrado!")
-                    return widget
-            
-            for child in widget.winfo_children():
-                result = find_button_frame(child, depth + 1)
-                if result:
-                    return result
-            return None
-        
-        button_frame = find_button_frame(self.root)
-        print(f"[DEBUG] button_frame encontrado: {button_frame}")
+        widget_index = self._get_widget_index()
+        button_frame = widget_index['labelframes'].get('Acciones')
+        logger.debug("button_frame encontrado: %s", button_frame)
         
         if button_frame:
-            print(f"[DEBUG] Agregando sección de Floppy a la columna derecha")
+            logger.debug("Agregando sección de Floppy a la columna derecha")
             
             # Crear sección de Floppy en la columna izquierda (row=0, column=0) - arriba de archivos
             floppy_section = ttk.LabelFrame(button_frame, text="Floppy", padding="5")
             floppy_section.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N), padx=(0, 5), pady=(0, 10))
             floppy_section.columnconfigure(0, weight=1)
             
-            print(f"[DEBUG] Sección Floppy creada en columna derecha")
+            logger.debug("Sección Floppy creada en columna derecha")
             
             # Agregar los botones de floppy
             self.read_floppy_btn = ttk.Button(
@@ -228,7 +325,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 width=14
             )
             self.read_floppy_btn.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=2)
-            print(f"[DEBUG] Botón Leer Floppy creado")
+            logger.debug("Botón Leer Floppy creado")
             
             self.write_floppy_btn = ttk.Button(
                 floppy_section, 
@@ -238,30 +335,16 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 width=14
             )
             self.write_floppy_btn.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=2)
-            print(f"[DEBUG] Botón Escribir Floppy creado")
+            self._state_buttons.append((self.write_floppy_btn, _MASK_HAS_IMAGE))
+            logger.debug("Botón Escribir Floppy creado")
             
-            print(f"[DEBUG] ✅ Botones de floppy agregados exitosamente a la columna derecha!")
+            logger.debug("✅ Botones de floppy agregados exitosamente a la columna derecha!")
         else:
-            print(f"[DEBUG] ERROR: No se encontró el panel de botones 'Acciones'")
+            logger.debug("ERROR: No se encontró el panel de botones 'Acciones'")
             # Como fallback, vamos a agregarlo directamente al frame principal
-            main_frame = None
-            
-            def find_main_frame(widget):
-                if isinstance(widget, ttk.Frame):
-                    # Buscar el frame que contiene otros LabelFrames
-                    has_labelframes = any(isinstance(child, ttk.LabelFrame) for child in widget.winfo_children())
-                    if has_labelframes:
-                        return widget
-                
-                for child in widget.winfo_children():
-                    result = find_main_frame(child)
-                    if result:
-                        return result
-                return None
-            
-            main_frame = find_main_frame(self.root)
+            main_frame = self.main_frame
             if main_frame:
-                print(f"[DEBUG] Usando main_frame como fallback")
+                logger.debug("Usando main_frame como fallback")
                 
                 # Crear panel de botones de floppy independiente
                 floppy_frame = ttk.LabelFrame(main_frame, text="Floppy", padding="10")
@@ -284,115 +367,208 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                     width=18
                 )
                 self.write_floppy_btn.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=2)
+                self._state_buttons.append((self.write_floppy_btn, _MASK_HAS_IMAGE))
                 
-                print(f"[DEBUG] Panel independiente de floppy creado")
+                logger.debug("Panel independiente de floppy creado")
     
     def reset_greaseweazle(self):
-        """Configurar y resetear GreaseWeazle al iniciar la GUI"""
-        import subprocess
-        import threading
+        """Configurar y resetear GreaseWeazle al iniciar la GUI
         
-        def do_reset():
+        Un hilo ejecuta 'gw delays' y luego 'gw reset' (el reset se intenta
+        aunque falle delays) y entrega los resultados al hilo de Tk con after(0).
+        """
+        gw_path = self.config_manager.get_greasewazle_path() or 'gw'
+        
+        def run_gw(*args):
+            """(código de salida, salida) de gw; código None si no responde a tiempo"""
             try:
-                # Paso 1: Configurar delays
-                print("⚙️ Configurando delays de GreaseWeazle...")
-                delays_result = subprocess.run(
-                    ['gw', 'delays', '--step', '20000'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                
-                if delays_result.returncode == 0:
-                    print("✅ Delays configurados exitosamente (--step 20000)")
-                else:
-                    print(f"⚠️ Warning configurando delays: {delays_result.stderr}")
-                
-                # Paso 2: Reset
-                print("🔄 Reseteando GreaseWeazle...")
-                reset_result = subprocess.run(
-                    ['gw', 'reset'],
+                result = subprocess.run(
+                    [gw_path, *args],
+                    stdin=subprocess.DEVNULL,
                     capture_output=True,
                     text=True,
                     timeout=10
                 )
-                
-                if reset_result.returncode == 0:
-                    print("✅ GreaseWeazle reseteado exitosamente")
-                else:
-                    print(f"⚠️ Warning en reset de GreaseWeazle: {reset_result.stderr}")
-                    
             except subprocess.TimeoutExpired:
-                print("⚠️ Timeout en configuración de GreaseWeazle - continuando de todos modos")
-            except subprocess.CalledProcessError as e:
-                print(f"⚠️ Error en configuración de GreaseWeazle: {e}")
-            except FileNotFoundError:
-                print("⚠️ GreaseWeazle no encontrado - ¿está instalado y en PATH?")
-            except Exception as e:
-                print(f"⚠️ Error inesperado en configuración de GreaseWeazle: {e}")
+                return None, ''
+            return result.returncode, result.stderr or result.stdout
+        
+        def do_reset():
+            try:
+                results = [('delays', run_gw('delays', '--step', '20000')),
+                           ('reset', run_gw('reset'))]
+            except OSError as e:
+                results = e
+            try:
+                self.root.after(0, self._on_greaseweazle_reset, results)
+            except (tk.TclError, RuntimeError):
+                pass  # La ventana ya se cerró
         
-        # Ejecutar reset en hilo separado para no bloquear la GUI
+        print("⚙️ Configurando delays y reseteando GreaseWeazle...")
+        # Ejecutar en hilo separado para no bloquear la GUI
         threading.Thread(target=do_reset, daemon=True).start()
     
+    def _on_greaseweazle_reset(self, results):
+        """Informar el resultado de reset_greaseweazle (en el hilo de Tk)"""
+        if isinstance(results, FileNotFoundError):
+            print("⚠️ GreaseWeazle no encontrado - ¿está instalado y en PATH?")
+            return
+        if isinstance(results, OSError):
+            print(f"⚠️ Error inesperado en configuración de GreaseWeazle: {results}")
+            return
+        
+        for step, (return_code, output) in results:
+            if return_code is None:
+                print(f"⚠️ Timeout en {step} de GreaseWeazle - continuando de todos modos")
+            elif return_code != 0:
+                print(f"⚠️ Warning en {step} de GreaseWeazle: {output.strip()}")
+            elif step == 'delays':
+                print("✅ Delays configurados exitosamente (--step 20000)")
+            else:
+                print("✅ GreaseWeazle reseteado exitosamente")
+    
+    def _get_widget_index(self):
+        """Índice de widgets por texto, construido con un único recorrido del árbol
+        
+        Guarda los LabelFrames y botones por su texto (el primero en orden de
+        profundidad, como la búsqueda recursiva anterior). El frame principal
+        no se busca: la GUI base lo guarda en self.main_frame.
+        """
+        if self._widget_index is None:
+            index = {'labelframes': {}, 'buttons': {}}
+            pending = deque([self.root])
+            while pending:
+                widget = pending.pop()
+                children = widget.winfo_children()
+                if isinstance(widget, ttk.LabelFrame):
+                    index['labelframes'].setdefault(widget.cget('text'), widget)
+                elif isinstance(widget, ttk.Button):
+                    index['buttons'].setdefault(widget.cget('text'), []).append(widget)
+                # Hijos en orden inverso: la pila los saca en el orden original
+                pending.extend(reversed(children))
+            self._widget_index = index
+        return self._widget_index
+    
     def disable_unimplemented_buttons(self):
         """Deshabilitar permanentemente botones de funciones no implementadas"""
-        def find_and_disable_buttons(widget):
-            """Buscar recursivamente botones y deshabilitarlos según el texto"""
-            if isinstance(widget, ttk.Button):
-                button_text = widget.cget('text')
-                # Lista de botones que NO están implementados
-                unimplemented_buttons = [
-                    "Verificar Integridad",
-                    "Reparar Imagen", 
-                    "Crear Backup",
-                    "Restaurar Backup",
-                    "Información Detallada"
-                ]
-                
-                if button_text in unimplemented_buttons:
-                    widget.config(state='disabled')
-                    print(f"Deshabilitando botón: {button_text}")
-            
-            # Buscar recursivamente en hijos
-            for child in widget.winfo_children():
-                find_and_disable_buttons(child)
-        
-        # Aplicar a toda la ventana
-        find_and_disable_buttons(self.root)
+        buttons = self._get_widget_index()['buttons']
+        for button_text in _UNIMPLEMENTED_BUTTONS:
+            for widget in buttons.get(button_text, ()):
+                widget.config(state='disabled')
+                print(f"Deshabilitando botón: {button_text}")
         
         # También deshabilitar el botón Analizar del toolbar si existe
         if hasattr(self, 'analyze_btn'):
             self.analyze_btn.config(state='disabled')
     
     
+    @property
+    def temp_dir(self):
+        """Directorio temporal de la sesión, creado solo si se llega a usar"""
+        if self._temp_dir is None:
+            self._temp_dir = tempfile.mkdtemp(prefix="hp150_gui_")
+        return self._temp_dir
+    
+    def _invalidate_fat_cache(self):
+        """Descartar la información cacheada del FAT (llamar tras cada escritura/borrado)"""
+        self._fat_cache.clear()
+    
+    def _fat_cached(self, key, compute):
+        """Devolver compute() memorizado por key hasta el próximo _invalidate_fat_cache"""
+        try:
+            return self._fat_cache[key]
+        except KeyError:
+            value = self._fat_cache[key] = compute()
+            return value
+    
+    def _cached_disk_info(self):
+        return self._fat_cached('disk_info', self.fat_handler.get_disk_info)
+    
+    def _cached_get_file(self, name):
+        return self._fat_cached(('file', name), lambda: self.fat_handler.get_file(name))
+    
     def update_button_states(self):
         """Actualizar estado de los botones según el contexto - Versión extendida"""
-        # Llamar al método padre primero
-        super().update_button_states()
-        
-        # Luego sobrescribir los botones que SÍ están implementados
-        has_image = self.fat_handler is not None
-        has_selection = len(self.file_tree.selection()) > 0
-        
-        # Botones que están IMPLEMENTADOS en la versión extendida (toolbar)
-        if hasattr(self, 'add_btn'):
-            self.add_btn.config(state='normal' if has_image else 'disabled')
-        if hasattr(self, 'extract_btn'):
-            self.extract_btn.config(state='normal' if (has_image and has_selection) else 'disabled')
-        if hasattr(self, 'extract_all_btn'):
-            self.extract_all_btn.config(state='normal' if has_image else 'disabled')
-        if hasattr(self, 'edit_btn'):
-            self.edit_btn.config(state='normal' if (has_image and has_selection) else 'disabled')
-        if hasattr(self, 'delete_btn'):
-            self.delete_btn.config(state='normal' if (has_image and has_selection) else 'disabled')
-        
-        # Botones que NO están implementados - siempre deshabilitados
-        if hasattr(self, 'analyze_btn'):
-            self.analyze_btn.config(state='disabled')
-        
-        # Botón de escritura de floppy - solo habilitado si hay imagen cargada
-        if hasattr(self, 'write_floppy_btn'):
-            self.write_floppy_btn.config(state='normal' if has_image else 'disabled')
+        state = 0
+        if self.fat_handler is not None and not self._fat_busy:
+            state |= _MASK_HAS_IMAGE
+        if self.file_tree.selection():
+            state |= _MASK_HAS_SEL
+        
+        for btn, required in self._state_buttons:
+            btn.config(state='normal' if (state & required) == required else 'disabled')
+    
+    def on_file_select(self, event):
+        """Manejar cambio de selección en archivo
+        
+        <<TreeviewSelect>> llega una vez por fila al moverse con las flechas o
+        arrastrar; los botones se actualizan 50 ms después del último evento.
+        """
+        if self._button_update_after is not None:
+            self.root.after_cancel(self._button_update_after)
+        self._button_update_after = self.root.after(50, self._on_file_select_settled)
+    
+    def _on_file_select_settled(self):
+        self._button_update_after = None
+        self.update_button_states()
+    
+    @contextlib.contextmanager
+    def _frozen_tree(self):
+        """Ocultar las columnas de la lista mientras se rellena (un único repintado)"""
+        columns = self.file_tree['displaycolumns']
+        self.file_tree.configure(displaycolumns=())
+        try:
+            yield
+        finally:
+            self.file_tree.configure(displaycolumns=columns)
+    
+    def refresh_file_list(self):
+        """Actualizar lista de archivos con la lista congelada durante el relleno"""
+        # Tras cargar otra imagen o modificar la actual, lo cacheado ya no vale
+        self._invalidate_fat_cache()
+        with self._frozen_tree():
+            super().refresh_file_list()
+    
+    def _confirm(self, title, message, default=True):
+        """Pedir confirmación sí/no; en modo batch devuelve default sin diálogo
+        
+        Solo para confirmaciones que no destruyen datos: borrar o reemplazar
+        archivos pregunta siempre (ver delete_file(confirm=False) para los
+        llamadores programáticos).
+        """
+        if self.batch_mode:
+            return default
+        return messagebox.askyesno(title, message)
+    
+    def _fat_is_busy(self):
+        """Avisar y devolver True si un hilo está modificando la imagen"""
+        if self._fat_busy:
+            messagebox.showwarning(
+                "Operación en curso",
+                "Espera a que termine la escritura en la imagen"
+            )
+        return self._fat_busy
+    
+    def _set_fat_busy(self, busy):
+        self._fat_busy = busy
+        self.update_button_states()
+    
+    def open_image(self):
+        if not self._fat_is_busy():
+            super().open_image()
+    
+    def save_image(self):
+        if not self._fat_is_busy():
+            super().save_image()
+    
+    def on_closing(self):
+        if not self._fat_is_busy():
+            super().on_closing()
+    
+    def _inform(self, title, message):
+        """Aviso informativo que se omite en modo batch"""
+        if not self.batch_mode:
+            messagebox.showinfo(title, message)
     
     def get_selected_file(self):
         """Obtener archivo seleccionado en la lista"""
@@ -413,12 +589,14 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
     
     def check_space_available(self, needed_space):
         """Verificar si hay espacio disponible"""
-        info = self.fat_handler.get_disk_info()
+        info = self._cached_disk_info()
         return info['free_space'] >= needed_space
     
     # Implementación completa de agregar archivo
     def add_file(self):
         """Agregar archivo a la imagen"""
+        if self._fat_is_busy():
+            return
         if not self.fat_handler:
             messagebox.showwarning("Advertencia", "No hay imagen cargada")
             return
@@ -441,7 +619,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 "Error de Espacio",
                 f"No hay suficiente espacio en el disco.\\n"
                 f"Necesario: {space_needed:,} bytes\\n"
-                f"Disponible: {self.fat_handler.get_disk_info()['free_space']:,} bytes"
+                f"Disponible: {self._cached_disk_info()['free_space']:,} bytes"
             )
             return
         
@@ -480,7 +658,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             return
         
         # Verificar si el archivo ya existe
-        existing_file = self.fat_handler.get_file(target_name.upper())
+        existing_file = self._cached_get_file(target_name.upper())
         if existing_file:
             if not messagebox.askyesno(
                 "Archivo Existente",
@@ -488,51 +666,88 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             ):
                 return
         
-        try:
-            # Leer datos del archivo origen
-            with open(source_file, 'rb') as f:
-                file_data = f.read()
-            
-            # Escribir al disco HP-150
-            if existing_file:
-                # Reemplazar archivo existente
-                if len(file_data) > existing_file.size:
-                    messagebox.showerror(
-                        "Error de Tamaño",
-                        f"El archivo nuevo ({len(file_data):,} bytes) es más grande "
-                        f"que el existente ({existing_file.size:,} bytes). "
-                        f"No se puede expandir."
-                    )
-                    return
+        # Leer y escribir en un hilo aparte; el resultado vuelve por una cola
+        target = target_name.upper()
+        result_queue = queue.Queue()
+        
+        def add_worker():
+            file_data = None
+            try:
+                # Mapear el archivo origen en vez de leerlo entero en memoria
+                # (mmap no admite archivos vacíos)
+                with open(source_file, 'rb') as f:
+                    if os.fstat(f.fileno()).st_size:
+                        file_data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    else:
+                        file_data = b''
                 
-                success = self.fat_handler.write_file(target_name.upper(), file_data)
-            else:
-                # Crear archivo nuevo
-                try:
-                    success = self.fat_handler.write_file(target_name.upper(), file_data, attr=0x20)
-                except Exception as e:
-                    messagebox.showerror("Error", f"Error creando archivo: {e}")
-                    return
+                # Escribir al disco HP-150
+                if existing_file:
+                    # Reemplazar archivo existente
+                    if len(file_data) > existing_file.size:
+                        result_queue.put(('too_big', len(file_data)))
+                        return
+                    success = self.fat_handler.write_file(target, file_data)
+                else:
+                    # Crear archivo nuevo
+                    try:
+                        success = self.fat_handler.write_file(target, file_data, attr=0x20)
+                    except Exception as e:
+                        result_queue.put(('create_error', e))
+                        return
+                
+                result_queue.put(('done', success))
+            except Exception as e:
+                result_queue.put(('error', e))
+            finally:
+                if isinstance(file_data, mmap.mmap):
+                    file_data.close()
+        
+        def poll_result():
+            """Esperar el resultado del hilo sin bloquear Tk (los diálogos solo desde aquí)"""
+            try:
+                status, value = result_queue.get_nowait()
+            except queue.Empty:
+                self.root.after(50, poll_result)
+                return
             
-            if success:
+            self._set_fat_busy(False)
+            if status in ('done', 'error'):
+                # write_file pudo tocar el FAT aunque haya fallado
+                self._invalidate_fat_cache()
+            
+            if status == 'too_big':
+                messagebox.showerror(
+                    "Error de Tamaño",
+                    f"El archivo nuevo ({value:,} bytes) es más grande "
+                    f"que el existente ({existing_file.size:,} bytes). "
+                    f"No se puede expandir."
+                )
+            elif status == 'create_error':
+                messagebox.showerror("Error", f"Error creando archivo: {value}")
+            elif status == 'error':
+                messagebox.showerror("Error", f"Error agregando archivo: {value}")
+            elif value:
                 self.set_modified(True)
                 self.refresh_file_list()
                 self.update_status(f"Archivo {target_name} agregado exitosamente")
                 messagebox.showinfo("Éxito", f"Archivo {target_name} agregado exitosamente")
             else:
                 messagebox.showerror("Error", f"Error agregando archivo {target_name}")
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Error agregando archivo: {e}")
+        
+        # Sin otras modificaciones de la imagen hasta que poll_result vea el resultado
+        self._set_fat_busy(True)
+        self.update_status(f"Agregando archivo {target_name}...")
+        threading.Thread(target=add_worker, daemon=True).start()
+        self.root.after(50, poll_result)
     
     def validate_filename_83(self, filename):
         """Validar formato de nombre 8.3"""
         if not filename:
             return False
         
-        # Verificar caracteres válidos
-        invalid_chars = '<>:"/\\|?*'
-        if any(c in filename for c in invalid_chars):
+        # Verificar caracteres válidos (translate los elimina en C)
+        if len(filename.translate(_INVALID_83_CHARS)) != len(filename):
             return False
         
         if '.' in filename:
@@ -547,6 +762,8 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
     # Implementación completa de editar archivo
     def edit_file(self):
         """Editar archivo seleccionado"""
+        if self._fat_is_busy():
+            return
         filename = self.get_selected_file()
         if not filename:
             return
@@ -556,15 +773,16 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             return
         
         # Verificar si el archivo ya está siendo editado
-        if filename in self.file_editors:
+        editor = self.file_editors.get(filename)
+        if editor is not None and editor.winfo_exists():
             # Traer ventana al frente
-            self.file_editors[filename].lift()
+            editor.lift()
             return
         
         try:
             # Leer contenido del archivo
             file_data = self.fat_handler.read_file(filename)
-            file_entry = self.fat_handler.get_file(filename)
+            file_entry = self._cached_get_file(filename)
             
             # Crear ventana de edición
             edit_window = tk.Toplevel(self.root)
@@ -579,9 +797,13 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             info_frame = ttk.LabelFrame(main_frame, text="Información del Archivo", padding="5")
             info_frame.pack(fill=tk.X, pady=(0, 10))
             
-            ttk.Label(info_frame, text=f"Archivo: {filename}").pack(anchor=tk.W)
-            ttk.Label(info_frame, text=f"Tamaño: {len(file_data):,} bytes").pack(anchor=tk.W)
-            ttk.Label(info_frame, text=f"Tamaño máximo: {file_entry.size:,} bytes").pack(anchor=tk.W)
+            ttk.Label(
+                info_frame,
+                text=f"Archivo: {filename}\n"
+                     f"Tamaño: {len(file_data):,} bytes\n"
+                     f"Tamaño máximo: {file_entry.size:,} bytes",
+                justify=tk.LEFT
+            ).pack(anchor=tk.W)
             
             # Detectar tipo de archivo
             is_text = self.is_text_file(file_data)
@@ -596,30 +818,23 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             # Registrar ventana de edición
             self.file_editors[filename] = edit_window
             
-            # Configurar cierre
-            def on_edit_close():
-                if filename in self.file_editors:
-                    del self.file_editors[filename]
-                edit_window.destroy()
-            
-            edit_window.protocol("WM_DELETE_WINDOW", on_edit_close)
-            
         except Exception as e:
             messagebox.showerror("Error", f"Error abriendo archivo {filename}: {e}")
     
     def is_text_file(self, data):
         """Detectar si un archivo es texto"""
-        try:
-            # Intentar decodificar como texto
-            data.decode('ascii')
+        # Todo ASCII: se considera texto (isascii no lanza ni copia)
+        if data.isascii():
             return True
-        except UnicodeDecodeError:
-            # Verificar si tiene muchos caracteres imprimibles
-            printable_count = sum(1 for b in data if 32 <= b <= 126 or b in [9, 10, 13])
-            return printable_count / len(data) > 0.7 if data else False
+        
+        # Verificar si tiene muchos caracteres imprimibles (translate borra los
+        # bytes de texto en C; lo que queda son los no imprimibles)
+        printable_count = len(data) - len(data.translate(None, _TEXT_BYTES))
+        return printable_count / len(data) > 0.7
     
     def create_text_editor(self, parent, window, filename, data, file_entry):
         """Crear editor de texto"""
+        
         # Frame del editor
         editor_frame = ttk.LabelFrame(parent, text="Editor de Texto", padding="5")
         editor_frame.pack(fill=tk.BOTH, expand=True)
@@ -634,18 +849,13 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
         )
         text_area.pack(fill=tk.BOTH, expand=True)
         
-        # Insertar contenido
-        try:
-            text_content = data.decode('ascii', errors='replace')
-            text_area.insert(tk.INSERT, text_content)
-        except Exception as e:
-            text_area.insert(tk.INSERT, f"Error decodificando archivo: {e}")
-        
         # Botones
         button_frame = ttk.Frame(parent)
         button_frame.pack(fill=tk.X, pady=(10, 0))
         
         def save_changes():
+            if self._fat_is_busy():
+                return
             try:
                 new_content = text_area.get('1.0', tk.END).rstrip('\\n')
                 new_data = new_content.encode('ascii', errors='replace')
@@ -663,6 +873,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                     new_data += b'\\x00' * (file_entry.size - len(new_data))
                 
                 success = self.fat_handler.write_file(filename, new_data)
+                self._invalidate_fat_cache()
                 
                 if success:
                     self.set_modified(True)
@@ -675,11 +886,35 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             except Exception as e:
                 messagebox.showerror("Error", f"Error guardando archivo: {e}")
         
-        ttk.Button(button_frame, text="💾 Guardar", command=save_changes).pack(side=tk.LEFT, padx=(0, 5))
+        save_btn = ttk.Button(button_frame, text="💾 Guardar", command=save_changes, state='disabled')
+        save_btn.pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(button_frame, text="❌ Cancelar", command=window.destroy).pack(side=tk.LEFT)
+        
+        # Insertar contenido en bloques de 16 KB cediendo el control a Tk entre
+        # uno y otro; hasta terminar el área es de solo lectura y Guardar está
+        # deshabilitado para no grabar un archivo a medio cargar
+        view = memoryview(data)
+        offsets = iter(range(0, len(view), 16384))
+        text_area.config(state=tk.DISABLED)
+        
+        def insert_next_chunk():
+            try:
+                pos = next(offsets, None)
+                text_area.config(state=tk.NORMAL)
+                if pos is None:
+                    save_btn.config(state='normal')
+                    return
+                text_area.insert(tk.END, str(view[pos:pos + 16384], 'ascii', 'replace'))
+                text_area.config(state=tk.DISABLED)
+                text_area.after_idle(insert_next_chunk)
+            except tk.TclError:
+                pass  # Ventana cerrada antes de terminar
+        
+        insert_next_chunk()
     
     def create_hex_viewer(self, parent, window, filename, data, file_entry):
         """Crear visor hexadecimal"""
+        
         # Frame del visor
         viewer_frame = ttk.LabelFrame(parent, text="Visor Hexadecimal (Solo Lectura)", padding="5")
         viewer_frame.pack(fill=tk.BOTH, expand=True)
@@ -695,12 +930,22 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
         )
         hex_area.pack(fill=tk.BOTH, expand=True)
         
-        # Generar vista hexadecimal
-        hex_content = self.generate_hex_dump(data)
+        # Generar vista hexadecimal por bloques, cediendo el control a Tk entre uno y otro
+        chunks = self.iter_hex_dump(data)
+        
+        def insert_next_chunk():
+            chunk = next(chunks, None)
+            if chunk is None:
+                return
+            try:
+                hex_area.config(state=tk.NORMAL)
+                hex_area.insert(tk.END, chunk)
+                hex_area.config(state=tk.DISABLED)
+                hex_area.after_idle(insert_next_chunk)
+            except tk.TclError:
+                pass  # Ventana cerrada antes de terminar
         
-        hex_area.config(state=tk.NORMAL)
-        hex_area.insert(tk.INSERT, hex_content)
-        hex_area.config(state=tk.DISABLED)
+        insert_next_chunk()
         
         # Botón de cerrar
         button_frame = ttk.Frame(parent)
@@ -708,30 +953,27 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
         
         ttk.Button(button_frame, text="❌ Cerrar", command=window.destroy).pack(side=tk.LEFT)
     
-    def generate_hex_dump(self, data):
-        """Generar dump hexadecimal de los datos"""
-        lines = []
-        for i in range(0, len(data), 16):
-            chunk = data[i:i+16]
-            
-            # Offset
-            offset = f"{i:08x}"
-            
-            # Bytes en hex
-            hex_bytes = ' '.join(f"{b:02x}" for b in chunk)
-            hex_bytes = hex_bytes.ljust(47)  # Pad para alinear
-            
-            # ASCII representation
-            ascii_repr = ''.join(chr(b) if 32 <= b <= 126 else '.' for b in chunk)
-            
-            lines.append(f"{offset}  {hex_bytes}  |{ascii_repr}|")
-        
-        return '\\n'.join(lines)
+    def iter_hex_dump(self, data, chunk_size=4096):
+        """Generar el dump hexadecimal por bloques de chunk_size bytes (múltiplo de 16)"""
+        for start in range(0, len(data), chunk_size):
+            text = self.generate_hex_dump(data[start:start + chunk_size], start)
+            yield text if start == 0 else '\n' + text
+    
+    def generate_hex_dump(self, data, base_offset=0):
+        """Generar dump hexadecimal de los datos (base_offset: offset del primer byte)"""
+        return hex_dump(data, base_offset)
     
     # Implementación completa de eliminar archivo
-    def delete_file(self):
-        """Eliminar archivo seleccionado"""
-        filename = self.get_selected_file()
+    def delete_file(self, filename=None, confirm=True):
+        """Eliminar archivo (por defecto el seleccionado)
+        
+        Con confirm=False no se pregunta nada, para poder borrar varios
+        archivos seguidos sin dos diálogos por archivo.
+        """
+        if self._fat_is_busy():
+            return
+        if filename is None:
+            filename = self.get_selected_file()
         if not filename:
             return
         
@@ -739,13 +981,13 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             messagebox.showwarning("Advertencia", "No hay imagen cargada")
             return
         
-        file_entry = self.fat_handler.get_file(filename)
+        file_entry = self._cached_get_file(filename)
         if not file_entry:
             messagebox.showerror("Error", f"Archivo {filename} no encontrado")
             return
         
         # Verificar si es archivo de sistema
-        if file_entry.attr & 0x04:  # System file
+        if file_entry.attr & 0x04 and confirm:  # System file
             if not messagebox.askyesno(
                 "Archivo de Sistema",
                 f"¿Estás seguro de que quieres eliminar el archivo de sistema {filename}?\\n"
@@ -753,7 +995,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             ):
                 return
         
-        if not messagebox.askyesno(
+        if confirm and not messagebox.askyesno(
             "Confirmar Eliminación",
             f"¿Estás seguro de que quieres eliminar {filename}?\\n"
             f"Esta acción no se puede deshacer."
@@ -763,12 +1005,14 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
         try:
             # Usar la función de eliminación completa
             success = self.fat_handler.delete_file(filename)
+            self._invalidate_fat_cache()
             
             if success:
                 self.set_modified(True)
                 self.refresh_file_list()
                 self.update_status(f"Archivo {filename} eliminado completamente")
-                messagebox.showinfo("Éxito", f"Archivo {filename} eliminado exitosamente")
+                if confirm:
+                    self._inform("Éxito", f"Archivo {filename} eliminado exitosamente")
             else:
                 messagebox.showerror("Error", f"Error eliminando archivo {filename}")
                 
@@ -791,18 +1035,16 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             title=f"Guardar {filename} como",
             initialfile=filename.lower(),
             filetypes=[("Todos los archivos", "*.*")],
-            initialdir=os.path.expanduser("~/Desktop")
+            initialdir=self._default_initialdir
         )
         
         if not output_file:
             return
         
         try:
-            # Leer y guardar archivo
-            file_data = self.fat_handler.read_file(filename)
-            
+            # Copiar cluster a cluster directo al destino, sin cargarlo en RAM
             with open(output_file, 'wb') as f:
-                f.write(file_data)
+                self.fat_handler.read_file_into(filename, f)
             
             self.update_status(f"Archivo {filename} extraído a {output_file}")
             messagebox.showinfo("Éxito", f"Archivo extraído exitosamente a:\n{output_file}")
@@ -826,7 +1068,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 return
             
             # Confirmar extracción
-            if not messagebox.askyesno(
+            if not self._confirm(
                 "Extraer todos los archivos",
                 f"¿Extraer {len(extractable_files)} archivos?\n\n"
                 "Se creará una carpeta con todos los archivos."
@@ -840,7 +1082,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
         # Seleccionar directorio destino
         output_dir = filedialog.askdirectory(
             title="Seleccionar carpeta de destino",
-            initialdir=os.path.expanduser("~/Desktop")
+            initialdir=self._default_initialdir
         )
         if not output_dir:
             return
@@ -898,33 +1140,76 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             close_btn = ttk.Button(main_frame, text="Cerrar", command=progress_window.destroy, state='disabled')
             close_btn.pack()
             
-            # Función para extraer archivos
+            # Los hilos solo leen y escriben archivos; los resultados vuelven a
+            # Tk por una cola (nombre, bytes escritos, error), None al final
+            result_queue = queue.Queue()
+            
+            # join(dir, '') deja el separador final una sola vez; cada ruta es
+            # entonces una concatenación en lugar de un os.path.join
+            prefix = os.path.join(extraction_dir, '')
+            tasks = [
+                (entry.full_name, prefix + sanitize_filename(entry.full_name.lower()))
+                for entry in extractable_files
+            ]
+            
+            # Función para extraer archivos (la imagen se abre una sola vez)
             def extract_files():
-                extracted = 0
-                errors = []
-                
-                for i, file_entry in enumerate(extractable_files):
+                try:
+                    with open(self.fat_handler.image_path, 'rb') as image:
+                        for filename, output_path in tasks:
+                            try:
+                                with open(output_path, 'wb') as f:
+                                    size = self.fat_handler.read_file_into(filename, f, image)
+                                result_queue.put((filename, size, None))
+                            except Exception as e:
+                                result_queue.put((filename, None, e))
+                except OSError as e:
+                    result_queue.put((os.path.basename(self.fat_handler.image_path), None, e))
+                result_queue.put(None)
+            
+            progress = {'done': 0, 'extracted': 0, 'errors': []}
+            
+            def poll_results():
+                """Actualizar la ventana con los resultados disponibles (hilo de Tk)
+                
+                Todo lo que llegó en los últimos 50 ms se vuelca de una vez: una
+                sola inserción en la lista y un solo cambio de etiqueta y barra.
+                """
+                batch = []
+                finished = False
+                while True:
                     try:
-                        current_file_label.config(text=f"Extrayendo: {file_entry.full_name}")
-                        progress_window.update_idletasks()
-                        
-                        file_data = self.fat_handler.read_file(file_entry.full_name)
-                        output_path = os.path.join(extraction_dir, file_entry.full_name.lower())
-                        
-                        with open(output_path, 'wb') as f:
-                            f.write(file_data)
-                        
-                        extracted += 1
-                        file_listbox.insert(tk.END, f"✅ {file_entry.full_name} ({len(file_data):,} bytes)")
-                        file_listbox.see(tk.END)
-                        
-                    except Exception as e:
-                        errors.append(f"{file_entry.full_name}: {e}")
-                        file_listbox.insert(tk.END, f"❌ {file_entry.full_name} (ERROR)")
-                        file_listbox.see(tk.END)
+                        item = result_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        finished = True
+                        break
                     
-                    progress_bar['value'] = i + 1
-                    progress_window.update_idletasks()
+                    filename, size, error = item
+                    if error is None:
+                        progress['extracted'] += 1
+                        batch.append(f"✅ {filename} ({size:,} bytes)")
+                    else:
+                        progress['errors'].append(f"{filename}: {error}")
+                        batch.append(f"❌ {filename} (ERROR)")
+                
+                try:
+                    if batch:
+                        progress['done'] += len(batch)
+                        current_file_label.config(text=f"Extrayendo: {filename}")
+                        file_listbox.insert(tk.END, *batch)
+                        file_listbox.see(tk.END)
+                        progress_bar['value'] = progress['done']
+                except tk.TclError:
+                    return  # Ventana cerrada
+                
+                if not finished:
+                    self.root.after(50, poll_results)
+                    return
+                
+                extracted = progress['extracted']
+                errors = progress['errors']
                 
                 # Completado
                 current_file_label.config(text=f"Completado: {extracted}/{len(extractable_files)} archivos")
@@ -945,39 +1230,24 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 messagebox.showinfo("Extracción completada", summary)
             
             # Ejecutar extracción en hilo separado
-            import threading
             threading.Thread(target=extract_files, daemon=True).start()
+            self.root.after(50, poll_results)
             
         except Exception as e:
             messagebox.showerror("Error", f"Error durante la extracción: {e}")
     
     # Sobrescribir funciones NO implementadas para deshabilitarlas
-    def verify_integrity(self):
-        """Función no implementada - deshabilitada"""
-        messagebox.showwarning("No Implementado", "Esta función no está implementada en esta versión")
-    
-    def repair_image(self):
-        """Función no implementada - deshabilitada"""
-        messagebox.showwarning("No Implementado", "Esta función no está implementada en esta versión")
-    
-    def create_backup(self):
-        """Función no implementada - deshabilitada"""
-        messagebox.showwarning("No Implementado", "Esta función no está implementada en esta versión")
-    
-    def restore_backup(self):
-        """Función no implementada - deshabilitada"""
-        messagebox.showwarning("No Implementado", "Esta función no está implementada en esta versión")
-    
-    def analyze_image(self):
+    def _not_implemented(self, *_args, **_kwargs):
         """Función no implementada - deshabilitada"""
         messagebox.showwarning("No Implementado", "Esta función no está implementada en esta versión")
     
-    def show_disk_info(self):
-        """Función no implementada - deshabilitada"""
-        messagebox.showwarning("No Implementado", "Esta función no está implementada en esta versión")
+    verify_integrity = repair_image = create_backup = _not_implemented
+    restore_backup = analyze_image = show_disk_info = _not_implemented
     
     def save_action(self):
         """Acción de guardar basada en contexto (CMD+S en macOS)"""
+        if self._fat_is_busy():
+            return
         if self.has_temp_files:
             if messagebox.askyesno("Guardar Proyecto", "¿Deseas guardar el proyecto completo con SCP e IMG?"):
                 self.save_floppy_project(self.temp_scp_file, self.temp_img_file)
@@ -988,6 +1258,8 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
 
     def save_image_as(self):
         """Sobrescribir método para manejar guardado correcto según contexto"""
+        if self._fat_is_busy():
+            return
         if not self.current_image:
             messagebox.showwarning("Advertencia", "No hay imagen cargada")
             return
@@ -1018,7 +1290,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                     ("Imágenes HP-150", "*.img"),
                     ("Todos los archivos", "*.*")
                 ],
-                initialdir=os.path.expanduser("~/Desktop")
+                initialdir=self._default_initialdir
             )
             
             if filename:
@@ -1030,7 +1302,6 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                         filename = os.path.splitext(filename)[0] + '.img'
                     
                     # Copiar archivo actual al nuevo destino
-                    import shutil
                     shutil.copy2(self.current_image, filename)
                     
                     # Actualizar imagen actual y marcar como no modificada
@@ -1049,9 +1320,13 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
 
     def on_closing_extended(self):
         """Cierre extendido con limpieza"""
+        if self._fat_is_busy():
+            return
+        
         # Cerrar editores abiertos
         for editor in list(self.file_editors.values()):
-            editor.destroy()
+            if editor.winfo_exists():
+                editor.destroy()
         
         # Verificar si hay archivos temporales sin guardar
         if self.has_temp_files and self.temp_scp_file and self.temp_img_file:
@@ -1100,17 +1375,14 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 self.save_image()
         
         # Limpiar archivos temporales
-        if os.path.exists(self.temp_dir):
-            shutil.rmtree(self.temp_dir, ignore_errors=True)
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
         
         # Cerrar aplicación
         self.root.destroy()
     
     def read_from_floppy(self):
         """Leer imagen desde floppy usando GreaseWeazle - flujo simplificado"""
-        import subprocess
-        from datetime import datetime
-        import tempfile
         
         # Diálogo simple solo para seleccionar drive - MÁS GRANDE
         dialog = tk.Toplevel(self.root)
@@ -1211,12 +1483,11 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
         def start_read():
             drive = drive_var.get()
             
-            # Crear archivos temporales
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            temp_name = f"floppy_drive_{drive}_{timestamp}"
-            
-            scp_file = os.path.join(self.temp_dir, f"{temp_name}.scp")
-            img_file = os.path.join(self.temp_dir, f"{temp_name}.img")
+            # Crear archivos temporales: mkstemp reserva un nombre único aunque se
+            # lancen dos lecturas en el mismo segundo; la IMG comparte su raíz
+            scp_fd, scp_file = tempfile.mkstemp(suffix='.scp', prefix=f"floppy_drive_{drive}_", dir=self.temp_dir)
+            os.close(scp_fd)
+            img_file = os.path.splitext(scp_file)[0] + '.img'
             
             # Cerrar diálogo y mostrar progreso
             dialog.destroy()
@@ -1237,7 +1508,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             header_frame.pack(fill=tk.X, pady=(0, 15))
             
             ttk.Label(header_frame, text="📀 Lectura de Floppy HP-150", font=('Arial', 14, 'bold')).pack()
-            ttk.Label(header_frame, text=f"Drive: {drive} → Temporal: {temp_name}", font=('Arial', 10)).pack(pady=(5, 0))
+            ttk.Label(header_frame, text=f"Drive: {drive} → Temporal: {os.path.basename(scp_file)}", font=('Arial', 10)).pack(pady=(5, 0))
             ttk.Label(header_frame, text="Los archivos se cargarán automáticamente en la GUI", font=('Arial', 9), foreground='blue').pack(pady=(0, 0))
             
             # Proceso actual
@@ -1288,7 +1559,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 cancel_requested['value'] = True
                 if current_process['process']:
                     try:
-                        current_process['process'].terminate()
+                        _stop_process(current_process['process'])
                         console_text.insert(tk.END, "\n❌ Lectura cancelada por el usuario\n")
                         console_text.see(tk.END)
                     except:
@@ -1320,8 +1591,8 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 
                 if return_code == 0:
                     # Éxito - mostrar resumen y cargar imagen
-                    scp_size = os.path.getsize(scp_file) if os.path.exists(scp_file) else 0
-                    img_size = os.path.getsize(img_file) if os.path.exists(img_file) else 0
+                    scp_size = _file_size(scp_file)
+                    img_size = _file_size(img_file)
                     
                     success_message = (
                         f"Lectura completada exitosamente\n\n"
@@ -1355,44 +1626,39 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
     
     def write_to_floppy(self):
         """Escribir imagen actual al floppy usando GreaseWeazle con detección automática de formato"""
-        import subprocess
-        
-        print("\n" + "="*80)
-        print("[DEBUG WRITE_TO_FLOPPY] INICIO DE FUNCIÓN")
-        print("="*80)
-        print(f"[DEBUG WRITE_TO_FLOPPY] current_image: {self.current_image}")
-        print(f"[DEBUG WRITE_TO_FLOPPY] Tipo de current_image: {type(self.current_image)}")
-        print(f"[DEBUG WRITE_TO_FLOPPY] Existe archivo: {os.path.exists(self.current_image) if self.current_image else 'N/A'}")
-        if self.current_image:
-            print(f"[DEBUG WRITE_TO_FLOPPY] Tamaño archivo: {os.path.getsize(self.current_image)} bytes")
-        print("="*80)
         
+        logger.debug("write_to_floppy: current_image=%s", self.current_image)
+        
+        if self._fat_is_busy():
+            return
         if not self.current_image:
-            print("[DEBUG] ERROR: No hay imagen cargada")
+            logger.debug("ERROR: No hay imagen cargada")
             messagebox.showwarning("Advertencia", "No hay imagen cargada para escribir")
             return
         
-        print(f"[DEBUG] Verificando si el archivo existe: {self.current_image}")
-        if not os.path.exists(self.current_image):
-            print(f"[DEBUG] ERROR: Archivo no existe: {self.current_image}")
+        # Un solo stat: comprueba que existe y da el tamaño que se muestra después
+        try:
+            file_size = os.stat(self.current_image).st_size
+        except FileNotFoundError:
+            logger.debug("ERROR: Archivo no existe: %s", self.current_image)
             messagebox.showerror("Error", f"El archivo de imagen no existe: {self.current_image}")
             return
         
         # Detectar formato de la imagen
         format_info = self.detect_image_format(self.current_image)
-        print(f"[DEBUG] Formato detectado: {format_info}")
+        logger.debug("Formato detectado: %s", format_info)
         
         # Determinar script y proceso según el formato
         if format_info['type'] == 'HP150_FAT':
             script_name = 'write_hp150_floppy.sh'
             process_description = 'HP-150 FAT (256 bytes/sector)'
-            print(f"[DEBUG] Usando script HP-150: {script_name}")
+            logger.debug("Usando script HP-150: %s", script_name)
         elif format_info['type'] == 'PC_FAT':
             script_name = 'write_standard_floppy.sh'
             process_description = 'FAT estándar (512 bytes/sector)'
-            print(f"[DEBUG] Usando script FAT estándar: {script_name}")
+            logger.debug("Usando script FAT estándar: %s", script_name)
         else:
-            print(f"[DEBUG] ERROR: Formato no soportado: {format_info['type']}")
+            logger.debug("ERROR: Formato no soportado: %s", format_info['type'])
             messagebox.showerror(
                 "Formato No Soportado",
                 f"No se puede escribir este tipo de imagen al floppy:\n\n"
@@ -1404,9 +1670,8 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             )
             return
         
-        file_size = os.path.getsize(self.current_image)
-        print(f"[DEBUG] Tamaño del archivo: {file_size} bytes")
-        print(f"[DEBUG] Proceso a usar: {process_description}")
+        logger.debug("Tamaño del archivo: %s bytes", file_size)
+        logger.debug("Proceso a usar: %s", process_description)
         
         # Diálogo para seleccionar drive y confirmación
         dialog = tk.Toplevel(self.root)
@@ -1441,10 +1706,12 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
         info_frame = ttk.LabelFrame(main_frame, text="Imagen a Escribir", padding="10")
         info_frame.pack(fill=tk.X, pady=(0, 10))
         
-        ttk.Label(info_frame, text=f"Archivo: {os.path.basename(self.current_image)}").pack(anchor=tk.W)
-        if os.path.exists(self.current_image):
-            size = os.path.getsize(self.current_image)
-            ttk.Label(info_frame, text=f"Tamaño: {size:,} bytes").pack(anchor=tk.W)
+        # file_size ya se leyó al validar la imagen
+        image_info = (
+            f"Archivo: {os.path.basename(self.current_image)}\n"
+            f"Tamaño: {file_size:,} bytes"
+        )
+        ttk.Label(info_frame, text=image_info, justify=tk.LEFT).pack(anchor=tk.W)
         
         # Mostrar información del formato detectado
         ttk.Label(info_frame, text=f"Formato: {format_info['name']}", foreground='blue').pack(anchor=tk.W)
@@ -1514,13 +1781,14 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             console_frame = ttk.LabelFrame(main_frame, text="Salida de GreaseWeazle", padding="10")
             console_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
             
+            dark = self.is_dark_mode()
             console_text = scrolledtext.ScrolledText(
                 console_frame,
                 height=15,
                 font=('Monaco', 9),
-                bg='#1e1e1e' if self.is_dark_mode() else '#ffffff',
-                fg='#00ff00' if self.is_dark_mode() else '#000000',
-                insertbackground='#00ff00' if self.is_dark_mode() else '#000000'
+                bg='#1e1e1e' if dark else '#ffffff',
+                fg='#00ff00' if dark else '#000000',
+                insertbackground='#00ff00' if dark else '#000000'
             )
             console_text.pack(fill=tk.BOTH, expand=True)
             
@@ -1536,7 +1804,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 cancel_requested['value'] = True
                 if current_process['process']:
                     try:
-                        current_process['process'].terminate()
+                        _stop_process(current_process['process'])
                         console_text.insert(tk.END, "\n❌ Escritura cancelada por el usuario\n")
                         console_text.see(tk.END)
                     except:
@@ -1548,16 +1816,16 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             
             def on_write_complete(return_code):
                 """Callback cuando termina la escritura"""
-                print(f"[DEBUG] on_write_complete llamado con return_code: {return_code}")
+                logger.debug("on_write_complete llamado con return_code: %s", return_code)
                 
                 try:
                     progress_window.destroy()
-                    print(f"[DEBUG] Ventana de progreso destruida")
+                    logger.debug("Ventana de progreso destruida")
                 except Exception as e:
-                    print(f"[DEBUG] Error destruyendo ventana: {e}")
+                    logger.debug("Error destruyendo ventana: %s", e)
                 
                 if return_code == 0:
-                    print(f"[DEBUG] Escritura exitosa")
+                    logger.debug("Escritura exitosa")
                     # Éxito
                     self.set_modified(False)  # Marcar como guardado
                     messagebox.showinfo(
@@ -1566,7 +1834,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                         f"El floppy está listo para usar en el HP-150"
                     )
                 else:
-                    print(f"[DEBUG] Error en escritura, código: {return_code}")
+                    logger.debug("Error en escritura, código: %s", return_code)
                     messagebox.showerror(
                         "Error de Escritura", 
                         f"Error escribiendo al floppy (código: {return_code})\n"
@@ -1574,61 +1842,29 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                     )
             
             # Ejecutar comando con consola en tiempo real
-            script_path = os.path.join(os.getcwd(), 'scripts', script_name)
-            
-            print("\n" + "#"*100)
-            print("[DEBUG WRITE COMANDO] INFORMACIÓN COMPLETA DEL COMANDO A EJECUTAR")
-            print("#"*100)
-            print(f"[DEBUG WRITE COMANDO] script_name: {script_name}")
-            print(f"[DEBUG WRITE COMANDO] script_path: {script_path}")
-            print(f"[DEBUG WRITE COMANDO] ¿Existe script?: {os.path.exists(script_path)}")
-            print(f"[DEBUG WRITE COMANDO] current_image: {self.current_image}")
-            print(f"[DEBUG WRITE COMANDO] current_image tipo: {type(self.current_image)}")
-            print(f"[DEBUG WRITE COMANDO] current_image longitud: {len(self.current_image) if self.current_image else 'N/A'}")
-            print(f"[DEBUG WRITE COMANDO] drive: {drive}")
-            print(f"[DEBUG WRITE COMANDO] drive tipo: {type(drive)}")
-            print(f"[DEBUG WRITE COMANDO] verify: {verify}")
-            print(f"[DEBUG WRITE COMANDO] verify tipo: {type(verify)}")
-            print(f"[DEBUG WRITE COMANDO] cwd: {os.getcwd()}")
-            
-            # Crear comando paso a paso para debug completo
-            cmd = []
-            cmd.append(script_path)
-            cmd.append(self.current_image)
-            cmd.append(f'--drive={drive}')
-            cmd.append('--force')
-            
-            print(f"[DEBUG WRITE COMANDO] cmd después de args básicos: {cmd}")
-            print(f"[DEBUG WRITE COMANDO] cmd[0] (script): '{cmd[0]}'")
-            print(f"[DEBUG WRITE COMANDO] cmd[1] (imagen): '{cmd[1]}'")
-            print(f"[DEBUG WRITE COMANDO] cmd[2] (drive): '{cmd[2]}'")
-            print(f"[DEBUG WRITE COMANDO] cmd[3] (force): '{cmd[3]}'")
+            script_path = os.path.join(_PROJECT_DIR, 'scripts', script_name)
             
+            # Crear comando
+            cmd = [script_path, self.current_image, f'--drive={drive}', '--force']
             if verify:
                 cmd.append('--verify')
-                print(f"[DEBUG WRITE COMANDO] cmd después de verify: {cmd}")
-                print(f"[DEBUG WRITE COMANDO] cmd[4] (verify): '{cmd[4]}'")
-            
-            print(f"\n[DEBUG WRITE COMANDO] COMANDO FINAL:")
-            print(f"[DEBUG WRITE COMANDO] Comando completo: {cmd}")
-            print(f"[DEBUG WRITE COMANDO] Comando como string: {' '.join(cmd)}")
-            print(f"[DEBUG WRITE COMANDO] Número total de argumentos: {len(cmd)}")
-            for i, arg in enumerate(cmd):
-                print(f"[DEBUG WRITE COMANDO] arg[{i}]: '{arg}' (tipo: {type(arg)})")
-            print("#"*100)
-            
-            console_text.insert(tk.END, f"[DEBUG] Script path: {script_path}\n")
-            console_text.insert(tk.END, f"[DEBUG] ¿Script existe?: {os.path.exists(script_path)}\n")
-            console_text.insert(tk.END, f"[DEBUG] Directorio actual: {os.getcwd()}\n")
-            console_text.insert(tk.END, f"Ejecutando: {' '.join(cmd)}\n")
+            
+            # Preámbulo en una sola inserción
+            preamble = f"Ejecutando: {format_command(cmd)}\n"
+            if logger.isEnabledFor(logging.DEBUG):
+                script_exists = os.path.exists(script_path)
+                logger.debug("Comando de escritura: %s (script existe: %s)", cmd, script_exists)
+                preamble = (
+                    f"[DEBUG] Script path: {script_path}\n"
+                    f"[DEBUG] ¿Script existe?: {script_exists}\n"
+                ) + preamble
+            console_text.insert(tk.END, preamble)
             console_text.see(tk.END)
             
             try:
-                print(f"[DEBUG] Iniciando run_command_with_console...")
                 self.run_command_with_console(cmd, console_text, current_step, progress_bar, on_write_complete, cancel_requested, current_process)
-                print(f"[DEBUG] run_command_with_console iniciado")
             except Exception as e:
-                print(f"[DEBUG] ERROR en run_command_with_console: {e}")
+                logger.debug("ERROR en run_command_with_console: %s", e)
                 console_text.insert(tk.END, f"ERROR iniciando comando: {e}\n")
                 console_text.see(tk.END)
                 on_write_complete(1)
@@ -1642,13 +1878,19 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
         return True  # Para indicar que se intentó la escritura
     
     def is_dark_mode(self):
-        """Detectar si macOS está en modo oscuro"""
+        """Detectar si macOS está en modo oscuro (se consulta una vez por sesión)"""
+        if self._dark_mode_cache is None:
+            self._dark_mode_cache = self._probe_dark_mode()
+        return self._dark_mode_cache
+    
+    def _probe_dark_mode(self):
+        """Consultar a macOS si el modo oscuro está activo"""
         if sys.platform == "darwin":
             try:
-                import subprocess
                 result = subprocess.run(
                     ['defaults', 'read', '-g', 'AppleInterfaceStyle'],
                     capture_output=True,
+                    stdin=subprocess.DEVNULL,
                     text=True
                 )
                 return result.returncode == 0 and 'Dark' in result.stdout
@@ -1656,160 +1898,155 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 return False
         return False
     
+    def _console_append(self, console_text, text):
+        """Agregar texto a la consola agrupando las inserciones en bloques de 50 ms
+        
+        Se puede llamar desde cualquier hilo: el volcado siempre ocurre en el de Tk.
+        """
+        with self._console_lock:
+            buf = self._console_buffers.setdefault(console_text, [])
+            buf.append(text)
+            if len(buf) > 1:
+                return  # Ya hay un volcado programado
+        try:
+            console_text.after(50, self._flush_console, console_text)
+        except tk.TclError:
+            with self._console_lock:
+                self._console_buffers.pop(console_text, None)
+    
+    def _flush_console(self, console_text):
+        """Insertar de una vez todo el texto pendiente de la consola"""
+        with self._console_lock:
+            buf = self._console_buffers.pop(console_text, None)
+        if not buf:
+            return
+        try:
+            append_to_console(console_text, "".join(buf))
+        except tk.TclError:
+            pass  # Ventana de progreso ya cerrada
+    
     def run_command_with_console(self, cmd, console_text, current_step, progress_bar, on_complete, cancel_requested=None, current_process=None):
         """Ejecutar comando mostrando salida en tiempo real en la consola"""
-        import subprocess
-        import queue
-        import threading
         
         def enqueue_output(out, queue):
-            for line in iter(out.readline, ''):
-                queue.put(line)
-            out.close()
+            pump_text(out, queue.put)
+        
+        # Proceso y lectores, disponibles cuando el proceso ya arrancó (ver spawn)
+        state = {'process': None, 'sel': None, 'readers': []}
+        
+        # Cola para la salida
+        q = queue.Queue()
+        
+        def pump_pipes():
+            """Leer lo disponible en los pipes sin bloquear (POSIX, hilo de Tk)"""
+            sel = state['sel']
+            for key, _ in sel.select(timeout=0):
+                chunk = os.read(key.fd, 65536)
+                text = key.data.decode(chunk, final=not chunk)
+                if text:
+                    q.put(text)
+                if not chunk:
+                    sel.unregister(key.fileobj)
+                    key.fileobj.close()
+        
+        def pipes_open():
+            sel = state['sel']
+            if sel is not None:
+                return bool(sel.get_map())
+            return any(t.is_alive() for t in state['readers'])
+        
+        def close_pipes():
+            sel = state['sel']
+            if sel is not None:
+                for key in list(sel.get_map().values()):
+                    key.fileobj.close()
+                sel.close()
+        
+        # Última línea incompleta, pendiente de analizar hasta que llegue su final
+        pending = {'tail': ''}
         
         def update_console():
+            process = state['process']
             try:
+                # Verificar si fue cancelado
+                if cancel_requested and cancel_requested['value']:
+                    _stop_process(process)
+                    close_pipes()
+                    return
+                
+                if state['sel'] is not None:
+                    pump_pipes()
+                
+                # Vaciar la cola de una vez: una sola inserción por tick
+                chunks = []
                 while True:
-                    # Verificar si fue cancelado
-                    if cancel_requested and cancel_requested['value']:
-                        try:
-                            process.terminate()
-                        except:
-                            pass
-                        return
-                        
                     try:
-                        line = q.get_nowait()
+                        chunks.append(q.get_nowait())
                     except queue.Empty:
-                        # Verificar si el proceso ha terminado
-                        if process.poll() is not None:
-                            # Proceso terminado, leer cualquier salida restante con cuidado
-                            try:
-                                remaining_output = process.stdout.read()
-                                if remaining_output:
-                                    console_text.insert(tk.END, remaining_output)
-                            except (ValueError, OSError):
-                                pass  # El pipe ya está cerrado
-                            
-                            try:
-                                remaining_error = process.stderr.read()
-                                if remaining_error:
-                                    console_text.insert(tk.END, "ERROR: " + remaining_error)
-                            except (ValueError, OSError):
-                                pass  # El pipe ya está cerrado
-                            
-                            console_text.see(tk.END)
-                            progress_bar.stop()
-                            
-                            # Llamar callback de completación
-                            on_complete(process.returncode)
-                            return
-                        
-                        # Programar siguiente verificación
-                        console_text.after(100, update_console)
-                        return
-                    else:
-                        # Agregar línea a la consola
-                        line_text = line  # Ya es string en modo texto
-                        console_text.insert(tk.END, line_text)
-                        console_text.see(tk.END)
-                        
-                        # Actualizar step según la salida específica del script
-                        if "Paso 1: Leyendo disco en formato SCP" in line_text:
-                            current_step.config(text="📀 Paso 1: Leyendo disco a SCP...")
-                        elif "Iniciando lectura del floppy" in line_text:
-                            current_step.config(text="🔄 Ejecutando GreaseWeazle...")
-                        elif "Reading cylinder" in line_text or "Reading track" in line_text:
-                            current_step.config(text="📀 Leyendo pistas del disco...")
-                        elif "Paso 2: Convirtiendo de SCP a IMG" in line_text:
-                            current_step.config(text="🔄 Paso 2: Convirtiendo SCP a IMG...")
-                        elif "Conversión completada exitosamente" in line_text:
-                            current_step.config(text="✅ Conversión completada!")
-                        elif "Archivo creado:" in line_text:
-                            current_step.config(text="✅ Archivo creado exitosamente!")
-                        elif "Tamaño correcto:" in line_text:
-                            current_step.config(text="✅ Proceso completado - Imagen válida!")
-                        
-                        # Para escritura
-                        elif "Paso 1: Convirtiendo IMG a formato SCP" in line_text:
-                            current_step.config(text="🔄 Paso 1: Convirtiendo IMG a SCP...")
-                        elif "Conversión completada:" in line_text:
-                            current_step.config(text="✅ Conversión a SCP completada!")
-                        elif "Paso 2: Escribiendo formato SCP al disco" in line_text:
-                            current_step.config(text="💾 Paso 2: Escribiendo SCP al disco...")
-                        elif "Iniciando escritura del floppy" in line_text:
-                            current_step.config(text="🔄 Ejecutando GreaseWeazle...")
-                        elif "Escritura completada exitosamente" in line_text:
-                            current_step.config(text="✅ Escritura completada!")
+                        break
+                
+                if chunks:
+                    text = ''.join(chunks)
+                    append_to_console(console_text, text)
+                    
+                    # Buscar el paso solo en líneas completas, una vez por bloque
+                    data = pending['tail'] + text
+                    cut = data.rfind('\n') + 1
+                    pending['tail'] = data[cut:]
+                    label = match_write_step(data[:cut])
+                    if label:
+                        current_step.config(text=label)
+                
+                # Terminado cuando el proceso salió y los pipes llegaron a EOF
+                if process.poll() is not None and not pipes_open() and q.empty():
+                    close_pipes()
+                    label = match_write_step(pending['tail'])
+                    if label:
+                        current_step.config(text=label)
+                    progress_bar.stop()
+                    
+                    # Llamar callback de completación
+                    on_complete(process.returncode)
+                    return
+                
+                # Programar siguiente verificación
+                console_text.after(100, update_console)
             except Exception as e:
                 console_text.insert(tk.END, f"Error en consola: {e}\n")
                 console_text.see(tk.END)
         
-        print(f"\n" + "*"*120)
-        print(f"[DEBUG RUN_COMMAND] INFORMACIÓN COMPLETA ANTES DE EJECUTAR")
-        print(f"*"*120)
-        print(f"[DEBUG RUN_COMMAND] cmd: {cmd}")
-        print(f"[DEBUG RUN_COMMAND] cmd tipo: {type(cmd)}")
-        print(f"[DEBUG RUN_COMMAND] cmd longitud: {len(cmd)}")
-        print(f"[DEBUG RUN_COMMAND] cwd: {os.getcwd()}")
-        
-        # Verificar cada elemento del comando
-        for i, arg in enumerate(cmd):
-            print(f"[DEBUG RUN_COMMAND] cmd[{i}]: '{arg}' (tipo: {type(arg)}, longitud: {len(arg)})")
-            if i == 0:  # Script
-                print(f"[DEBUG RUN_COMMAND]   Script existe: {os.path.exists(arg)}")
-                if os.path.exists(arg):
-                    print(f"[DEBUG RUN_COMMAND]   Script ejecutable: {os.access(arg, os.X_OK)}")
-                    print(f"[DEBUG RUN_COMMAND]   Script tamaño: {os.path.getsize(arg)} bytes")
-            elif i == 1:  # Imagen
-                print(f"[DEBUG RUN_COMMAND]   Imagen existe: {os.path.exists(arg)}")
-                if os.path.exists(arg):
-                    print(f"[DEBUG RUN_COMMAND]   Imagen tamaño: {os.path.getsize(arg)} bytes")
-        
-        # Verificar variables de entorno importantes
-        print(f"[DEBUG RUN_COMMAND] PATH: {os.environ.get('PATH', 'No definido')}")
-        print(f"[DEBUG RUN_COMMAND] PWD: {os.environ.get('PWD', 'No definido')}")
-        print(f"[DEBUG RUN_COMMAND] USER: {os.environ.get('USER', 'No definido')}")
-        print(f"*"*120)
-        
-        try:
-            # Iniciar proceso
-            print(f"[DEBUG RUN_COMMAND] Creando subprocess.Popen...")
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=os.getcwd(),
-                universal_newlines=True,  # Use text mode
-                encoding='utf-8',
-                errors='replace',  # Replace invalid UTF-8 with replacement characters
-                bufsize=1,
-                env=os.environ.copy()  # Copiar variables de entorno
-            )
-            print(f"[DEBUG RUN_COMMAND] Proceso creado exitosamente con PID: {process.pid}")
+        def start_reading(process):
+            """Conectar la salida del proceso recién creado a la consola (hilo de Tk)"""
+            logger.debug("Proceso creado exitosamente con PID: %s", process.pid)
+            state['process'] = process
             
             # Guardar proceso para cancelación
             if current_process:
                 current_process['process'] = process
             
-            # Cola para la salida
-            q = queue.Queue()
-            
-            # Hilos para leer stdout y stderr
-            threading.Thread(target=enqueue_output, args=(process.stdout, q), daemon=True).start()
-            threading.Thread(target=enqueue_output, args=(process.stderr, q), daemon=True).start()
+            if sys.platform != 'win32':
+                # En POSIX los pipes se leen desde el propio bucle de Tk, sin hilos:
+                # cada tick lee lo que el selector indique como disponible
+                sel = selectors.DefaultSelector()
+                for pipe in (process.stdout, process.stderr):
+                    sel.register(pipe, selectors.EVENT_READ, text_decoder())
+                state['sel'] = sel
+            else:
+                # select no admite pipes en Windows: un hilo lector por pipe
+                state['readers'] = [
+                    threading.Thread(target=enqueue_output, args=(process.stdout, q), daemon=True),
+                    threading.Thread(target=enqueue_output, args=(process.stderr, q), daemon=True),
+                ]
+                for reader in state['readers']:
+                    reader.start()
             
             # Iniciar actualización de consola
             update_console()
+        
+        def spawn_failed(e):
+            logger.debug("EXCEPCIÓN en run_command_with_console: %s", e, exc_info=e)
             
-        except Exception as e:
-            print(f"[DEBUG] EXCEPCIÓN en run_command_with_console: {e}")
-            print(f"[DEBUG] Tipo de excepción: {type(e)}")
-            import traceback
-            print(f"[DEBUG] Traceback: {traceback.format_exc()}")
-            
-            console_text.insert(tk.END, f"Error iniciando proceso: {e}\n")
-            console_text.insert(tk.END, f"Tipo: {type(e)}\n")
+            console_text.insert(tk.END, f"Error iniciando proceso: {e}\nTipo: {type(e)}\n")
             console_text.see(tk.END)
             
             try:
@@ -1817,20 +2054,129 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             except:
                 pass
             on_complete(1)  # Código de error
+        
+        def spawn():
+            """Crear el proceso fuera del hilo de Tk (el fork+exec del script puede tardar)"""
+            # Mientras tanto la ventana de progreso se sigue pintando
+            try:
+                # Hereda directorio actual y entorno; pipes binarios sin buffer
+                # (se leen y decodifican por bloques)
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    bufsize=0,
+                    start_new_session=True  # Grupo propio: cancelar alcanza también a gw
+                )
+            except Exception as e:
+                try:
+                    console_text.after(0, spawn_failed, e)
+                except (tk.TclError, RuntimeError):
+                    pass  # Ventana de progreso ya cerrada
+                return
+            
+            try:
+                console_text.after(0, start_reading, process)
+            except (tk.TclError, RuntimeError):
+                # Ventana cerrada mientras arrancaba: nadie leerá su salida
+                _stop_process(process)
+        
+        logger.debug("Ejecutando: %s", cmd)
+        threading.Thread(target=spawn, daemon=True).start()
     
     def run_floppy_read_sequence(self, drive, scp_file, img_file, console_text, current_step, progress_bar, on_complete, cancel_requested, current_process):
         """Ejecutar secuencia de lectura: SCP + conversión a IMG"""
-        import subprocess
-        import threading
+        
+        # Los hilos de los pasos solo lanzan procesos y encolan: texto para la
+        # consola o callables que el hilo principal ejecuta en orden (etiquetas,
+        # paso siguiente, final). drain_output vacía la cola cada 50 ms.
+        output_queue = queue.Queue()
+        emit = output_queue.put
+        state = {'done': False}
+        
+        def set_step(text):
+            emit(lambda: current_step.config(text=text))
+        
+        def drain_output():
+            """Volcar la salida pendiente en la consola (hilo principal, cada 50 ms)"""
+            if cancel_requested['value']:
+                return
+            
+            try:
+                batch = []
+                while True:
+                    try:
+                        item = output_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if not callable(item):
+                        batch.append(item)
+                        continue
+                    if batch:
+                        show_output(''.join(batch))
+                        batch = []
+                    item()
+                if batch:
+                    show_output(''.join(batch))
+            except tk.TclError:
+                return  # Ventana de progreso ya cerrada
+            
+            if not state['done']:
+                console_text.after(50, drain_output)
+        
+        def show_output(text):
+            append_to_console(console_text, text)
+            # Actualizar el paso una vez por bloque (incluye las pistas T0.0 de GreaseWeazle)
+            label = match_step(text)
+            if label:
+                current_step.config(text=label)
+        
+        def finish(return_code):
+            state['done'] = True
+            try:
+                progress_bar.stop()
+            except tk.TclError:
+                pass
+            on_complete(return_code)
+        
+        def run_step_process(cmd):
+            """Ejecutar cmd volcando su salida a la cola; código de salida o None si se canceló"""
+            # Pipes binarios sin buffer: pump_text lee y decodifica por bloques
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                stdin=subprocess.DEVNULL,
+                bufsize=0,
+                start_new_session=True  # Grupo propio (ver _stop_process)
+            )
+            
+            # Guardar proceso para cancelación
+            current_process['process'] = process
+            
+            # Un hilo por pipe vuelca la salida en la cola de la consola a medida
+            # que llega; cancelar termina el proceso y con él los pipes
+            readers = [
+                threading.Thread(target=pump_text, args=(process.stdout, emit), daemon=True),
+                threading.Thread(target=pump_text, args=(process.stderr, emit), daemon=True),
+            ]
+            for reader in readers:
+                reader.start()
+            
+            # Obtener código de salida y esperar el final de la salida
+            return_code = process.wait()
+            for reader in readers:
+                reader.join()
+            
+            return None if cancel_requested['value'] else return_code
         
         def step1_read_scp():
             """Paso 1: Leer a formato SCP"""
             if cancel_requested['value']:
                 return
                 
-            current_step.config(text="📀 Paso 1: Leyendo flujo magnético...")
-            console_text.insert(tk.END, f"Paso 1: Leyendo desde drive {drive} a SCP...\n")
-            console_text.see(tk.END)
+            set_step("📀 Paso 1: Leyendo flujo magnético...")
+            emit(f"Paso 1: Leyendo desde drive {drive} a SCP...\n")
             
             cmd = [
                 "gw", "read", 
@@ -1840,198 +2186,36 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 scp_file
             ]
             
-            console_text.insert(tk.END, f"Comando: {' '.join(cmd)}\n")
-            console_text.see(tk.END)
+            emit(f"Comando: {format_command(cmd)}\n")
             
             try:
-                # Usar subprocess.Popen para salida en tiempo real
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    encoding='utf-8',
-                    errors='replace',
-                    bufsize=1,
-                    universal_newlines=True
-                )
-                
-                # Guardar proceso para cancelación
-                current_process['process'] = process
-                
-                # Leer salida línea por línea en tiempo real (stdout y stderr)
-                import select
-                import os
-                
-                # Configurar descriptores para select
-                stdout_fd = process.stdout.fileno()
-                stderr_fd = process.stderr.fileno()
-                
-                # Hacer los pipes no bloqueantes (compatibilidad Windows/Unix)
-                try:
-                    # En Unix/Linux/macOS
-                    os.set_blocking(stdout_fd, False)
-                    os.set_blocking(stderr_fd, False)
-                except AttributeError:
-                    # En Windows, os.set_blocking no existe
-                    # Usar fcntl si está disponible, sino continuar sin modo no bloqueante
-                    try:
-                        import fcntl
-                        fcntl.fcntl(stdout_fd, fcntl.F_SETFL, os.O_NONBLOCK)
-                        fcntl.fcntl(stderr_fd, fcntl.F_SETFL, os.O_NONBLOCK)
-                    except (ImportError, OSError):
-                        # En Windows sin fcntl, usar un enfoque alternativo
-                        pass
-                
-                while True:
-                    if cancel_requested['value']:
-                        try:
-                            process.terminate()
-                        except:
-                            pass
-                        return
-                    
-                    # Verificar si el proceso terminó
-                    if process.poll() is not None:
-                        # Leer cualquier salida restante
-                        try:
-                            remaining_stdout = process.stdout.read()
-                            if remaining_stdout:
-                                console_text.insert(tk.END, remaining_stdout)
-                                console_text.see(tk.END)
-                        except:
-                            pass
-                        
-                        try:
-                            remaining_stderr = process.stderr.read()
-                            if remaining_stderr:
-                                console_text.insert(tk.END, remaining_stderr)
-                                console_text.see(tk.END)
-                        except:
-                            pass
-                        break
-                    
-                    # Usar select para verificar si hay datos disponibles
-                    try:
-                        ready, _, _ = select.select([stdout_fd, stderr_fd], [], [], 0.1)
-                        
-                        for fd in ready:
-                            if fd == stdout_fd:
-                                try:
-                                    output = process.stdout.readline()
-                                    if output:
-                                        console_text.insert(tk.END, output)
-                                        console_text.see(tk.END)
-                                        console_text.update_idletasks()
-                                        
-                                        # Actualizar progreso basado en la salida
-                                        if "Reading cylinder" in output or "Reading track" in output:
-                                            current_step.config(text="📀 Leyendo pistas del disco...")
-                                        elif "T" in output and "H" in output and "R" in output:
-                                            # Formato típico de GreaseWeazle: T0.0 R0
-                                            current_step.config(text="📀 Leyendo pistas del disco...")
-                                except:
-                                    pass
-                            
-                            elif fd == stderr_fd:
-                                try:
-                                    error_output = process.stderr.readline()
-                                    if error_output:
-                                    console_text.insert(tk.END, error_output)
-                                        console_text.see(tk.END)
-                                        console_text.update_idletasks()
-                                        
-                                        # También buscar progreso en stderr
-                                        if "Reading cylinder" in error_output or "Reading track" in error_output:
-                                            current_step.config(text="📀 Leyendo pistas del disco...")
-                                        elif "T" in error_output and "H" in error_output:
-                                            current_step.config(text="📀 Leyendo pistas del disco...")
-                                except:
-                                    pass
-                        
-                        # Si no hay datos listos, dar una pequeña pausa
-                        if not ready:
-                            import time
-                            time.sleep(0.05)
-                            
-                    except (select.error, OSError):
-                        # Si select falla, volver al método anterior
-                        try:
-                            output = process.stdout.readline()
-                            if output:
-                                console_text.insert(tk.END, output)
-                                console_text.see(tk.END)
-                                console_text.update_idletasks()
-                            elif process.poll() is not None:
-                                break
-                        except tk.TclError:
-                            break  # Widget destruido
-                        except:
-                            pass
+                return_code = run_step_process(cmd)
                 
                 # Verificar si fue cancelado antes de continuar
-                if cancel_requested['value']:
+                if return_code is None:
                     return
-                    
-                # Obtener código de salida
-                return_code = process.wait()
-                
-                # Leer stderr si hay
-                stderr_output = process.stderr.read()
-                if stderr_output:
-                    try:
-                        console_text.insert(tk.END, f"STDERR: {stderr_output}")
-                        console_text.see(tk.END)
-                    except tk.TclError:
-                        pass
                 
                 if return_code == 0:
-                    try:
-                        console_text.insert(tk.END, "✅ Lectura SCP completada\n")
-                        console_text.see(tk.END)
-                    except tk.TclError:
-                        pass
-                    # Continuar con paso 2 si no fue cancelado
-                    if not cancel_requested['value']:
-                        threading.Thread(target=step2_convert_to_img, daemon=True).start()
+                    emit("✅ Lectura SCP completada\n")
+                    step2_convert_to_img()
                 else:
-                    try:
-                        console_text.insert(tk.END, f"❌ Error en lectura SCP (código: {return_code})\n")
-                        console_text.see(tk.END)
-                    except tk.TclError:
-                        pass
-                    try:
-                        progress_bar.stop()
-                    except tk.TclError:
-                        pass
-                    on_complete(return_code)
+                    emit(f"❌ Error en lectura SCP (código: {return_code})\n")
+                    emit(lambda: finish(return_code))
                     
             except Exception as e:
-                try:
-                    console_text.insert(tk.END, f"❌ Error ejecutando GreaseWeazle: {e}\n")
-                    console_text.see(tk.END)
-                except tk.TclError:
-                    # Widget ya fue destruido, no hacer nada
-                    pass
-                
-                try:
-                    progress_bar.stop()
-                except tk.TclError:
-                    pass
-                    
-                on_complete(1)
+                emit(f"❌ Error ejecutando GreaseWeazle: {e}\n")
+                emit(lambda: finish(1))
         
         def step2_convert_to_img():
             """Paso 2: Detectar formato y convertir SCP a IMG"""
             if cancel_requested['value']:
                 return
                 
-            current_step.config(text="🔍 Paso 2: Detectando formato del disco...")
-            console_text.insert(tk.END, f"\nPaso 2: Detectando formato del disco...\n")
-            console_text.see(tk.END)
+            set_step("🔍 Paso 2: Detectando formato del disco...")
+            emit(f"\nPaso 2: Detectando formato del disco...\n")
             
             # Detectar formato del disco desde el archivo SCP
-            format_result = self.detect_scp_format(scp_file, console_text)
+            format_result = self.detect_scp_format(scp_file, console_text, log=emit)
             
             # Desempaquetar resultado
             if isinstance(format_result, tuple):
@@ -2042,14 +2226,12 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 specific_format = None
             
             if format_type == 'HP150_FAT':
-                current_step.config(text="🔄 Paso 2: Convirtiendo con parser HP-150...")
-                console_text.insert(tk.END, f"Formato detectado: HP-150 FAT (256 bytes/sector)\n")
-                console_text.insert(tk.END, f"Usando convertidor HP-150...\n")
-                console_text.see(tk.END)
+                set_step("🔄 Paso 2: Convirtiendo con parser HP-150...")
+                emit(f"Formato detectado: HP-150 FAT (256 bytes/sector)\n")
+                emit(f"Usando convertidor HP-150...\n")
                 
                 # Usar convertidor HP-150
-                converter_path = os.path.join(os.getcwd(), "src", "converters", "scp_to_hp150_scan.py")
-                cmd = ["python3", converter_path, scp_file, img_file]
+                cmd = ["python3", _SCP_CONVERTER, scp_file, img_file]
                 
             elif format_type == 'PC_FAT':
                 # Usar formato específico detectado o fallback
@@ -2065,92 +2247,42 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                     format_to_use = 'ibm.720'  # Más común para época del HP-150
                     format_desc = '720KB (baja densidad) - auto-detectado'
                 
-                current_step.config(text=f"🔄 Paso 2: Convirtiendo {format_desc}...")
-                console_text.insert(tk.END, f"Formato detectado: PC FAT {format_desc}\n")
-                console_text.insert(tk.END, f"Usando convertidor GreaseWeazle con formato {format_to_use}...\n")
-                console_text.see(tk.END)
+                set_step(f"🔄 Paso 2: Convirtiendo {format_desc}...")
+                emit(f"Formato detectado: PC FAT {format_desc}\n")
+                emit(f"Usando convertidor GreaseWeazle con formato {format_to_use}...\n")
                 
                 # Usar convertidor estándar de GreaseWeazle con formato específico
                 cmd = ["gw", "convert", f"--format={format_to_use}", scp_file, img_file]
                 
             else:
                 # Formato no reconocido, intentar HP-150 por defecto
-                current_step.config(text="⚠️ Paso 2: Formato desconocido, usando parser HP-150...")
-                console_text.insert(tk.END, f"Formato no reconocido, intentando con convertidor HP-150...\n")
-                console_text.see(tk.END)
+                set_step("⚠️ Paso 2: Formato desconocido, usando parser HP-150...")
+                emit(f"Formato no reconocido, intentando con convertidor HP-150...\n")
                 
-                converter_path = os.path.join(os.getcwd(), "src", "converters", "scp_to_hp150_scan.py")
-                cmd = ["python3", converter_path, scp_file, img_file]
+                cmd = ["python3", _SCP_CONVERTER, scp_file, img_file]
             
-            console_text.insert(tk.END, f"Comando: {' '.join(cmd)}\n")
-            console_text.see(tk.END)
+            emit(f"Comando: {format_command(cmd)}\n")
             
             try:
-                # Usar Popen para poder cancelar el proceso
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    encoding='utf-8',
-                    errors='replace'
-                )
-                
-                # Guardar proceso para cancelación
-                current_process['process'] = process
-                
-                # Esperar a que termine o se cancele
-                while process.poll() is None:
-                    if cancel_requested['value']:
-                        try:
-                            process.terminate()
-                            console_text.insert(tk.END, "\n❌ Conversión cancelada\n")
-                            console_text.see(tk.END)
-                        except:
-                            pass
-                        return
-                    # Pequeña pausa para no consumir mucha CPU
-                    import time
-                    time.sleep(0.1)
-                
-                # Verificar si fue cancelado
-                if cancel_requested['value']:
+                # Misma espera que el paso 1: sin sondeo, la cancelación termina el proceso
+                return_code = run_step_process(cmd)
+                if return_code is None:
                     return
                 
-                # Leer salida
-                stdout, stderr = process.communicate()
-                
-                console_text.insert(tk.END, stdout)
-                if stderr:
-                    console_text.insert(tk.END, f"STDERR: {stderr}")
-                console_text.see(tk.END)
-                
-                if process.returncode == 0:
-                    console_text.insert(tk.END, "✅ Conversión HP-150 completada\n")
-                    current_step.config(text="✅ Proceso completado exitosamente!")
+                if return_code == 0:
+                    emit("✅ Conversión HP-150 completada\n")
+                    set_step("✅ Proceso completado exitosamente!")
                 else:
-                    console_text.insert(tk.END, f"❌ Error en conversión (código: {process.returncode})\n")
-                
-                progress_bar.stop()
-                on_complete(process.returncode)
+                    emit(f"❌ Error en conversión (código: {return_code})\n")
+                emit(lambda: finish(return_code))
                 
             except Exception as e:
-                try:
-                    console_text.insert(tk.END, f"❌ Error en conversión: {e}\n")
-                    console_text.see(tk.END)
-                except tk.TclError:
-                    # Widget ya fue destruido, no hacer nada
-                    pass
-                
-                try:
-                    progress_bar.stop()
-                except tk.TclError:
-                    pass
-                    
-                on_complete(1)
+                emit(f"❌ Error en conversión: {e}\n")
+                emit(lambda: finish(1))
         
-        # Iniciar proceso en hilo separado
+        # Iniciar proceso en hilo separado y el volcado de su salida en este hilo
         threading.Thread(target=step1_read_scp, daemon=True).start()
+        console_text.after(50, drain_output)
     
     def load_image_file(self, filename):
         """Cargar archivo de imagen (usado internamente después de leer floppy)"""
@@ -2169,15 +2301,11 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
     
     def save_floppy_project(self, scp_file, img_file):
         """Guardar proyecto de floppy (archivos SCP e IMG) permanentemente"""
-        from tkinter import filedialog
-        from datetime import datetime
-        import shutil
-        import re
         
         # Solicitar directorio y nombre del proyecto
         output_dir = filedialog.askdirectory(
             title="Seleccionar carpeta para guardar el proyecto",
-            initialdir=os.path.expanduser("~/Desktop")
+            initialdir=self._default_initialdir
         )
         
         if not output_dir:
@@ -2256,8 +2384,6 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
     
     def save_img_only(self, img_file):
         """Guardar solo la imagen HP-150 (sin archivo SCP)"""
-        from tkinter import filedialog
-        import shutil
         
         # Solicitar dónde guardar la imagen
         output_file = filedialog.asksaveasfilename(
@@ -2267,7 +2393,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 ("Imágenes HP-150", "*.img"),
                 ("Todos los archivos", "*.*")
             ],
-            initialdir=os.path.expanduser("~/Desktop"),
+            initialdir=self._default_initialdir,
             initialfile="floppy_hp150.img"
         )
         
@@ -2328,7 +2454,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             return True
             
         except Exception as e:
-            print(f"[DEBUG] Error verificando compatibilidad de {image_path}: {e}")
+            logger.debug("Error verificando compatibilidad de %s: %s", image_path, e)
             return False
     
     def detect_image_format(self, image_path):
@@ -2411,11 +2537,11 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
     
     def load_museum_catalog(self):
         """Cargar catálogo de imágenes del museo HP agrupado por formato"""
-        print("[DEBUG] Cargando catálogo del museo...")
+        logger.debug("Cargando catálogo del museo...")
         museum_dir = os.path.join(os.getcwd(), "HP150_CONVERTED")
         
         if not os.path.exists(museum_dir):
-            print(f"[DEBUG] No se encontró directorio del museo: {museum_dir}")
+            logger.debug("No se encontró directorio del museo: %s", museum_dir)
             return
         
         # Reinicializar catálogo como diccionario de formatos
@@ -2423,6 +2549,16 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
         total_items = 0
         total_images = 0
         
+        # Formatos ya detectados en arranques anteriores, por ruta; una entrada
+        # vale mientras el tamaño y el mtime de la imagen no cambien
+        format_cache_file = self.config_manager.config_dir / "museum_formats.json"
+        try:
+            with open(format_cache_file, 'r') as f:
+                format_cache = json.load(f)
+        except (OSError, ValueError):
+            format_cache = {}
+        new_format_cache = {}
+        
         try:
             for item in os.listdir(museum_dir):
                 item_path = os.path.join(museum_dir, item)
@@ -2446,12 +2582,24 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                         if img_file.lower().endswith('.img'):
                             img_path = os.path.join(item_path, img_file)
                             total_images += 1
+                            img_st = os.stat(img_path)
                             
-                            # Detectar formato
-                            format_info = self.detect_image_format(img_path)
+                            # Detectar formato (o reutilizar el cacheado)
+                            cached = format_cache.get(img_path)
+                            if (cached and cached['size'] == img_st.st_size
+                                    and cached['mtime_ns'] == img_st.st_mtime_ns):
+                                format_info = cached['format_info']
+                            else:
+                                format_info = self.detect_image_format(img_path)
+                            if format_info['type'] != 'ERROR':
+                                new_format_cache[img_path] = {
+                                    'size': img_st.st_size,
+                                    'mtime_ns': img_st.st_mtime_ns,
+                                    'format_info': format_info
+                                }
                             format_type = format_info['type']
                             
-                            print(f"[DEBUG] {format_info['name']}: {item}/{img_file}")
+                            logger.debug("%s: %s/%s", format_info['name'], item, img_file)
                             
                             # Agrupar por formato
                             if format_type not in img_files_by_format:
@@ -2460,7 +2608,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                             img_files_by_format[format_type].append({
                                 'name': img_file,
                                 'path': img_path,
-                                'size': os.path.getsize(img_path),
+                                'size': img_st.st_size,
                                 'format_info': format_info
                             })
                     
@@ -2482,50 +2630,45 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                             'path': item_path
                         }
             
+            # Guardar la caché de formatos solo si cambió
+            if new_format_cache != format_cache:
+                try:
+                    with open(format_cache_file, 'w') as f:
+                        json.dump(new_format_cache, f)
+                except OSError as e:
+                    logger.debug("No se pudo guardar la caché de formatos: %s", e)
+            
             # Estadísticas
             total_software = sum(len(fmt['software']) for fmt in self.museum_catalog.values())
             supported_formats = sum(1 for fmt in self.museum_catalog.values() if fmt['format_info']['supported'])
             total_formats = len(self.museum_catalog)
             
-            print(f"[DEBUG] Catálogo cargado:")
-            print(f"[DEBUG]   - {total_items} directorios de software")
-            print(f"[DEBUG]   - {total_images} imágenes de disco")
-            print(f"[DEBUG]   - {total_formats} formatos detectados")
-            print(f"[DEBUG]   - {supported_formats} formatos soportados")
+            logger.debug("Catálogo cargado:")
+            logger.debug("  - %s directorios de software", total_items)
+            logger.debug("  - %s imágenes de disco", total_images)
+            logger.debug("  - %s formatos detectados", total_formats)
+            logger.debug("  - %s formatos soportados", supported_formats)
             
             # Mostrar desglose por formato
             for format_type, format_data in self.museum_catalog.items():
                 software_count = len(format_data['software'])
                 image_count = sum(len(sw['images']) for sw in format_data['software'].values())
                 supported = "✅" if format_data['format_info']['supported'] else "❌"
-                print(f"[DEBUG]   {supported} {format_data['format_info']['name']}: {software_count} software, {image_count} imágenes")
+                logger.debug("  %s %s: %s software, %s imágenes", supported, format_data['format_info']['name'], software_count, image_count)
             
         except Exception as e:
-            print(f"[DEBUG] Error cargando catálogo: {e}")
+            logger.debug("Error cargando catálogo: %s", e)
     
     def add_museum_panel(self):
         """Agregar panel del catálogo del museo HP"""
-        print("[DEBUG] Agregando panel del museo...")
+        logger.debug("Agregando panel del museo...")
         
         if not self.museum_catalog:
-            print("[DEBUG] No hay catálogo del museo para mostrar")
+            logger.debug("No hay catálogo del museo para mostrar")
             return
         
         # Buscar el frame principal
-        def find_main_frame(widget):
-            if isinstance(widget, ttk.Frame):
-                # Buscar el frame que contiene otros LabelFrames
-                has_labelframes = any(isinstance(child, ttk.LabelFrame) for child in widget.winfo_children())
-                if has_labelframes:
-                    return widget
-            
-            for child in widget.winfo_children():
-                result = find_main_frame(child)
-                if result:
-                    return result
-            return None
-        
-        main_frame = find_main_frame(self.root)
+        main_frame = self.main_frame
         if main_frame:
             # Reconfigurar el layout para 4 columnas balanceadas
             # Columna 0: Panel de botones (fijo)
@@ -2603,16 +2746,16 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             # Eventos
             self.museum_tree.bind('<Double-1>', self.on_museum_item_double_click)
             
-            print(f"[DEBUG] Panel del museo agregado exitosamente")
+            logger.debug("Panel del museo agregado exitosamente")
         else:
-            print(f"[DEBUG] No se pudo encontrar el frame principal")
+            logger.debug("No se pudo encontrar el frame principal")
     
     def populate_museum_tree(self):
         """Poblar el árbol del catálogo del museo organizado por formato"""
         if not self.museum_tree:
             return
         
-        print(f"[DEBUG] Poblando árbol del museo con {len(self.museum_catalog)} formatos")
+        logger.debug("Poblando árbol del museo con %s formatos", len(self.museum_catalog))
         
         # Limpiar árbol existente
         for item in self.museum_tree.get_children():
@@ -2634,7 +2777,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 icon = "✅" if format_info['supported'] else "❌"
                 format_name = f"{icon} {format_info['name']}"
                 
-                print(f"[DEBUG] Agregando formato: {format_name} ({software_count} software, {total_images} imágenes)")
+                logger.debug("Agregando formato: %s (%s software, %s imágenes)", format_name, software_count, total_images)
                 
                 # Agregar nodo del formato
                 format_node = self.museum_tree.insert(
@@ -2663,7 +2806,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                         software_icon = "📦"
                         software_tags = ('software',)
                     
-                    print(f"[DEBUG]   - Agregando software: {title} ({disk_count} discos)")
+                    logger.debug("  - Agregando software: %s (%s discos)", title, disk_count)
                     
                     # Agregar nodo del software
                     software_node = self.museum_tree.insert(
@@ -2696,18 +2839,17 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                             tags=disk_tags
                         )
                         
-                        print(f"[DEBUG]     - Disco: {disk_display_name} -> {img_data['path']}")
+                        logger.debug("    - Disco: %s -> %s", disk_display_name, img_data['path'])
                     
                     # Si solo hay un disco soportado, también guardar la ruta en el elemento del software
                     if disk_count == 1 and format_info['supported']:
                         # Actualizar el software con la ruta del único disco
                         self.museum_tree.item(software_node, values=(year, f"{disk_count} discos", software_data['images'][0]['path']))
-                        print(f"[DEBUG]     - Software actualizado con ruta única: {software_data['images'][0]['path']}")
+                        logger.debug("    - Software actualizado con ruta única: %s", software_data['images'][0]['path'])
                     
             except Exception as e:
-                print(f"[DEBUG] ERROR agregando formato {format_type}: {e}")
-                import traceback
-                print(f"[DEBUG] Traceback: {traceback.format_exc()}")
+                logger.debug("ERROR agregando formato %s: %s", format_type, e)
+                logger.debug("Traceback", exc_info=True)
                 continue  # Continuar con el siguiente formato
         
         # Configurar estilos adaptativos
@@ -2731,22 +2873,22 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
         self.museum_tree.tag_configure('software_unsupported', foreground=unsupported_color, font=('Arial', 10))
         self.museum_tree.tag_configure('disk_unsupported', foreground=unsupported_color, font=('Arial', 9))
         
-        print(f"[DEBUG] Árbol poblado con {len(self.museum_tree.get_children())} elementos visibles")
+        logger.debug("Árbol poblado con %s elementos visibles", len(self.museum_tree.get_children()))
     
-    def detect_scp_format(self, scp_file, console_text=None):
-        """Detectar formato del disco desde archivo SCP usando GreaseWeazle"""
-        import subprocess
-        import tempfile
-        import os
+    def detect_scp_format(self, scp_file, console_text=None, log=None):
+        """Detectar formato del disco desde archivo SCP usando GreaseWeazle
+        
+        log recibe los mensajes para la consola (por defecto _console_append).
+        """
+        if log is None:
+            log = functools.partial(self._console_append, console_text)
         
         try:
             # Primero intentar usar GreaseWeazle info para obtener información del disco
             info_cmd = ["gw", "info", scp_file]
             
             if console_text:
-                console_text.insert(tk.END, f"Analizando formato con: {' '.join(info_cmd)}\n")
-                console_text.see(tk.END)
-                console_text.update_idletasks()
+                log(f"Analizando formato con: {format_command(info_cmd)}\n")
             
             result = subprocess.run(
                 info_cmd,
@@ -2756,11 +2898,9 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
             )
             
             if console_text:
-                console_text.insert(tk.END, f"Salida gw info:\n{result.stdout}\n")
+                log(f"Salida gw info:\n{result.stdout}\n")
                 if result.stderr:
-                    console_text.insert(tk.END, f"Errores gw info:\n{result.stderr}\n")
-                console_text.see(tk.END)
-                console_text.update_idletasks()
+                    log(f"Errores gw info:\n{result.stderr}\n")
             
             # Analizar la salida para determinar el formato
             info_output = result.stdout.lower()
@@ -2780,16 +2920,13 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                     detected_format = 'ibm.auto'
                 
                 if console_text:
-                    console_text.insert(tk.END, f"Detectado formato IBM/PC: {detected_format}\n")
-                    console_text.see(tk.END)
+                    log(f"Detectado formato IBM/PC: {detected_format}\n")
                 
                 return ('PC_FAT', detected_format)
             
             # Si no hay información clara, intentar detectar por conversiones de prueba
             if console_text:
-                console_text.insert(tk.END, "No se detectó formato IBM directo, probando conversiones...\n")
-                console_text.see(tk.END)
-                console_text.update_idletasks()
+                log("No se detectó formato IBM directo, probando conversiones...\n")
             
             # Crear archivo temporal para pruebas
             with tempfile.NamedTemporaryFile(suffix='.img', delete=False) as temp_img:
@@ -2805,9 +2942,7 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 
                 for format_name, format_desc in formats_to_try:
                     if console_text:
-                        console_text.insert(tk.END, f"Probando conversión {format_desc}: {format_name}\n")
-                        console_text.see(tk.END)
-                        console_text.update_idletasks()
+                        log(f"Probando conversión {format_desc}: {format_name}\n")
                     
                     convert_cmd = ["gw", "convert", f"--format={format_name}", scp_file, temp_img_path]
                     
@@ -2828,21 +2963,18 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                                 bytes_per_sector = struct.unpack('<H', boot_sector[11:13])[0]
                                 if bytes_per_sector == 512:
                                     if console_text:
-                                        console_text.insert(tk.END, f"✅ Conversión {format_desc} exitosa - formato PC FAT detectado\n")
-                                        console_text.see(tk.END)
+                                        log(f"✅ Conversión {format_desc} exitosa - formato PC FAT detectado\n")
                                     return ('PC_FAT', format_name)
                         except:
                             pass
                     else:
                         if console_text:
-                            console_text.insert(tk.END, f"❌ Conversión {format_desc} falló\n")
-                            console_text.see(tk.END)
+                            log(f"❌ Conversión {format_desc} falló\n")
                 
                 # Si todas las conversiones IBM fallan, asumir HP-150
                 if console_text:
-                    console_text.insert(tk.END, "Todas las conversiones IBM fallaron\n")
-                    console_text.insert(tk.END, "Asumiendo formato HP-150 FAT\n")
-                    console_text.see(tk.END)
+                    log("Todas las conversiones IBM fallaron\n")
+                    log("Asumiendo formato HP-150 FAT\n")
                 return ('HP150_FAT', None)
                 
             finally:
@@ -2854,29 +2986,26 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
         
         except subprocess.TimeoutExpired:
             if console_text:
-                console_text.insert(tk.END, "Timeout en detección de formato - asumiendo HP-150\n")
-                console_text.see(tk.END)
+                log("Timeout en detección de formato - asumiendo HP-150\n")
             return ('HP150_FAT', None)
         except Exception as e:
             if console_text:
-                console_text.insert(tk.END, f"Error en detección de formato: {e}\n")
-                console_text.insert(tk.END, "Asumiendo formato HP-150 FAT por defecto\n")
-                console_text.see(tk.END)
+                log(f"Error en detección de formato: {e}\n")
+                log("Asumiendo formato HP-150 FAT por defecto\n")
             return ('HP150_FAT', None)
         
         # Por defecto, asumir HP-150
         if console_text:
-            console_text.insert(tk.END, "No se pudo determinar formato - asumiendo HP-150 FAT\n")
-            console_text.see(tk.END)
+            log("No se pudo determinar formato - asumiendo HP-150 FAT\n")
         return ('HP150_FAT', None)
     
     def on_museum_item_double_click(self, event):
         """Manejar doble click en elemento del museo"""
-        print("[DEBUG] Doble click detectado en museo")
+        logger.debug("Doble click detectado en museo")
         
         # Evitar múltiples clicks simultáneos
         if self.museum_click_in_progress:
-            print("[DEBUG] Click ya en progreso, ignorando")
+            logger.debug("Click ya en progreso, ignorando")
             return
         
         self.museum_click_in_progress = True
@@ -2884,38 +3013,38 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
         try:
             selected = self.museum_tree.selection()
             if not selected:
-                print("[DEBUG] No hay selección")
+                logger.debug("No hay selección")
                 return
             
             item = selected[0]
             item_text = self.museum_tree.item(item, 'text')
             item_tags = self.museum_tree.item(item, 'tags')
             
-            print(f"[DEBUG] Item seleccionado: {item_text}, tags: {item_tags}")
+            logger.debug("Item seleccionado: %s, tags: %s", item_text, item_tags)
             
             # Obtener la ruta del archivo desde la columna file_path (tercera columna, índice 2)
             item_values = self.museum_tree.item(item, 'values')
-            print(f"[DEBUG] item_values: {item_values}")
+            logger.debug("item_values: %s", item_values)
             
             file_path = ''
             if len(item_values) >= 3:
                 file_path = item_values[2]  # file_path está en el índice 2
             
-            print(f"[DEBUG] file_path inicial: '{file_path}'")
+            logger.debug("file_path inicial: '%s'", file_path)
             
             if not file_path or file_path.strip() == '':
                 # Si no hay ruta directa, verificar si es un elemento padre
                 children = self.museum_tree.get_children(item)
-                print(f"[DEBUG] Hijos encontrados: {len(children)}")
+                logger.debug("Hijos encontrados: %s", len(children))
                 if children:
                     # Tiene hijos, seleccionar el primero
                     child_values = self.museum_tree.item(children[0], 'values')
                     if len(child_values) >= 3:
                         file_path = child_values[2]
-                    print(f"[DEBUG] file_path del primer hijo: '{file_path}'")
+                    logger.debug("file_path del primer hijo: '%s'", file_path)
             
             if not file_path:
-                print("[DEBUG] ERROR: No se pudo obtener file_path")
+                logger.debug("ERROR: No se pudo obtener file_path")
                 messagebox.showwarning(
                     "Error",
                     "No se pudo determinar la ruta del archivo de imagen."
@@ -2923,14 +3052,14 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 return
             
             if not os.path.exists(file_path):
-                print(f"[DEBUG] ERROR: Archivo no existe: {file_path}")
+                logger.debug("ERROR: Archivo no existe: %s", file_path)
                 messagebox.showerror(
                     "Archivo no encontrado",
                     f"El archivo no existe:\n{file_path}"
                 )
                 return
             
-            print(f"[DEBUG] Archivo válido encontrado: {file_path}")
+            logger.debug("Archivo válido encontrado: %s", file_path)
             
             # Confirmar carga
             if not messagebox.askyesno(
@@ -2940,11 +3069,11 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 f"Archivo: {os.path.basename(file_path)}\n\n"
                 f"Esto cerrará la imagen actual si hay una abierta."
             ):
-                print("[DEBUG] Usuario canceló la carga")
+                logger.debug("Usuario canceló la carga")
                 return
             
             try:
-                print(f"[DEBUG] Intentando cargar imagen: {file_path}")
+                logger.debug("Intentando cargar imagen: %s", file_path)
                 
                 # Cargar la imagen
                 self.load_image_file(file_path)
@@ -2952,23 +3081,21 @@ class HP150ImageManagerExtendedMuseum(HP150ImageManager):
                 # Actualizar información en el status
                 self.update_status(f"Imagen del museo cargada: {os.path.basename(file_path)}")
                 
-                print(f"[DEBUG] Imagen cargada exitosamente")
+                logger.debug("Imagen cargada exitosamente")
                 
                 # No mostrar diálogo adicional - la carga ya es suficiente confirmación
                 
             except Exception as load_error:
-                print(f"[DEBUG] ERROR cargando imagen: {load_error}")
-                import traceback
-                print(f"[DEBUG] Traceback: {traceback.format_exc()}")
+                logger.debug("ERROR cargando imagen: %s", load_error)
+                logger.debug("Traceback", exc_info=True)
                 messagebox.showerror(
                     "Error",
                     f"Error cargando imagen del museo:\n{load_error}"
                 )
                 
         except Exception as e:
-            print(f"[DEBUG] ERROR cargando imagen: {e}")
-            import traceback
-            print(f"[DEBUG] Traceback: {traceback.format_exc()}")
+            logger.debug("ERROR cargando imagen: %s", e)
+            logger.debug("Traceback", exc_info=True)
             messagebox.showerror(
                 "Error",
                 f"Error cargando imagen del museo:\n{e}"
@@ -5,6 +5,8 @@ Script para iniciar fácilmente la interfaz gráfica
 """
 
 import sys
+import logging
+import os
 import tkinter as tk
 from pathlib import Path
 
@@ -17,6 +19,12 @@ sys.path.insert(0, str(src_dir))
 def main():
     """Función principal para ejecutar la GUI"""
     
+    # Mensajes de depuración de la GUI solo con HP150_DEBUG=1
+    logging.basicConfig(
+        level=logging.DEBUG if os.environ.get('HP150_DEBUG') == '1' else logging.INFO,
+        format='%(levelname)s: %(message)s'
+    )
+    
     # Verificar si se debe usar la GUI extendida o básica
     if len(sys.argv) > 1 and sys.argv[1] == "--extended":
         # GUI extendida con más funcionalidades
@@ -196,6 +196,43 @@ class HP150FAT:
         
         return data[:entry.size]
     
+    def read_file_into(self, filename: str, out_fileobj, image=None) -> int:
+        """Escribe el contenido de un archivo en out_fileobj cluster a cluster
+        
+        image permite reutilizar una imagen ya abierta en 'rb' (p. ej. al
+        extraer varios archivos seguidos). Devuelve los bytes escritos.
+        """
+        entry = self.get_file(filename)
+        if not entry:
+            raise FileNotFoundError(f"File {filename} not found")
+        
+        if image is None:
+            with open(self.image_path, 'rb') as f:
+                return self.read_file_into(filename, out_fileobj, f)
+        
+        current_cluster = entry.cluster
+        remaining_size = entry.size
+        written = 0
+        
+        while current_cluster < 0xFF0 and remaining_size > 0:
+            cluster_offset = self.data_start + (current_cluster - 2) * self.cluster_size
+            image.seek(cluster_offset)
+            
+            cluster_data = image.read(min(self.cluster_size, remaining_size))
+            if not cluster_data:
+                break  # Cadena fuera de la imagen
+            out_fileobj.write(cluster_data)
+            written += len(cluster_data)
+            remaining_size -= len(cluster_data)
+            
+            # Siguiente cluster en la FAT
+            if current_cluster < len(self._fat_table):
+                current_cluster = self._fat_table[current_cluster]
+            else:
+                break
+        
+        return written
+    
     def write_file(self, filename: str, data: bytes, attr: int = 0x20) -> bool:
         """Escribe un archivo (simplificado - solo archivos que ya existen)"""
         entry = self.get_file(filename)
@@ -206,18 +243,19 @@ class HP150FAT:
             # Por simplicidad, no soportamos expandir archivos por ahora
             raise ValueError(f"File too large. Max size: {entry.size}, provided: {len(data)}")
         
-        # Escribir datos en clusters existentes
+        # Escribir datos en clusters existentes (data puede ser bytes, mmap o
+        # cualquier objeto con buffer; memoryview evita copiar cada cluster)
         current_cluster = entry.cluster
-        remaining_data = data
+        pos = 0
         
-        with open(self.image_path, 'r+b') as f:
-            while current_cluster < 0xFF0 and remaining_data:
+        with open(self.image_path, 'r+b') as f, memoryview(data) as view:
+            while current_cluster < 0xFF0 and pos < len(view):
                 cluster_offset = self.data_start + (current_cluster - 2) * self.cluster_size
                 f.seek(cluster_offset)
                 
-                to_write = min(self.cluster_size, len(remaining_data))
-                f.write(remaining_data[:to_write])
-                remaining_data = remaining_data[to_write:]
+                to_write = min(self.cluster_size, len(view) - pos)
+                f.write(view[pos:pos + to_write])
+                pos += to_write
                 
                 if current_cluster < len(self._fat_table):
                     current_cluster = self._fat_table[current_cluster]
@@ -293,8 +331,8 @@ class HP150FAT:
         fat_ext = ext_part.upper().ljust(3)[:3]
         
         # Escribir datos en clusters
-        with open(self.image_path, 'r+b') as f:
-            remaining_data = data
+        with open(self.image_path, 'r+b') as f, memoryview(data) as view:
+            pos = 0
             
             for i, cluster in enumerate(free_clusters[:clusters_needed]):
                 # Calcular offset del cluster
@@ -302,15 +340,13 @@ class HP150FAT:
                 f.seek(cluster_offset)
                 
                 # Escribir datos del cluster
-                to_write = min(self.cluster_size, len(remaining_data))
-                cluster_data = remaining_data[:to_write]
+                to_write = min(self.cluster_size, len(view) - pos)
+                f.write(view[pos:pos + to_write])
+                pos += to_write
                 
                 # Rellenar con ceros si es necesario
-                if len(cluster_data) < self.cluster_size:
-                    cluster_data += b'\x00' * (self.cluster_size - len(cluster_data))
-                
-                f.write(cluster_data)
-                remaining_data = remaining_data[to_write:]
+                if to_write < self.cluster_size:
+                    f.write(b'\x00' * (self.cluster_size - to_write))
                 
                 # Actualizar FAT
                 if i < len(free_clusters) - 1: